@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Optional
 
-import httpx
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from app.data.beaches import BEACHES
+from app.services import ai_report, beach_day_store, report_cache
+from app.services.ai_report import OpenAIBusy, OpenAIError
+from app.services.ee_calls import DeadlineExceeded, EEUnavailable
+from app.services.tr_time import tr_today
+
 
 router = APIRouter(prefix="/api/ai", tags=["ai"])
 
@@ -22,86 +30,137 @@ def _get_required_env(name: str) -> str:
     return value
 
 
+def _busy(e: OpenAIBusy) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+async def _stored_for_payload(beach: Dict[str, Any], key: str) -> Optional[str]:
+    """Today's pre-generated report, if it was generated from this exact payload."""
+
+    beach_id = beach.get("id")
+    if not isinstance(beach_id, str) or beach_id not in BEACHES or not beach_day_store.enabled():
+        return None
+    stored = await asyncio.to_thread(ai_report.stored_report, beach_id, tr_today().isoformat())
+    if stored is None or stored.get("key") != key:
+        return None
+    await report_cache.put(key, stored["report"])
+    return stored["report"]
+
+
+async def _cached_report(beach: Dict[str, Any], key: str) -> Optional[str]:
+    cached = await report_cache.get(key, record=False)
+    if cached is None:
+        cached = await _stored_for_payload(beach, key)
+    report_cache.record_lookup(cached is not None)
+    return cached
+
+
+@router.get("/beach-report")
+async def beach_report_for_beach(
+    beach_id: str = Query(..., description="Beach identifier (e.g. konyaalti)"),
+    days: int = Query(ai_report.REPORT_DAYS, ge=1, le=30),
+):
+    """Report for a beach's last `days` days of data.
+
+    For the default window this is normally the report pre-generated by the
+    daily refresh, so a store read; on a miss the report is generated once and
+    stored for everyone else. Without stored data (store disabled, refresh not
+    run yet) the input is computed on Earth Engine.
+    """
+
+    if beach_id not in BEACHES:
+        raise HTTPException(status_code=404, detail="Beach not found")
+    api_key = _get_required_env("OPENAI_API_KEY")
+
+    try:
+        result = await ai_report.report_for_beach(
+            beach_id, tr_today(), days=days, api_key=api_key, model=ai_report.configured_model()
+        )
+    except OpenAIBusy as e:
+        raise _busy(e)
+    except OpenAIError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Earth Engine request timed out")
+    except EEUnavailable:
+        raise HTTPException(status_code=503, detail="Earth Engine unavailable")
+
+    return {"report": result["report"] or "Analiz şu anda üretilemedi.", "cached": result["cached"]}
+
+
 @router.post("/beach-report")
 async def beach_report(payload: BeachReportRequest):
     """Generate a short Turkish report for the given beach payload.
 
     We keep the OpenAI key on the server (never in the frontend).
+    Reports are cached per (payload, model, prompt version) until the next
+    TR-midnight refresh.
     """
 
     api_key = _get_required_env("OPENAI_API_KEY")
-    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-
-    beach = payload.beach
-
-    system = (
-                    """
-            Sen bir çevresel veri analisti ve seyahat yazarı gibisin.
-            Görevin: verilen sahil verilerine dayanarak KISA, DOĞAL ve
-            birbirinden FARKLI metinler üretmek.
-
-            ZORUNLU KURALLAR:
-            - Sadece verilen verileri kullan.
-            - Veri yoksa açıkça belirt.
-            - Sayı uydurma, sebep uydurma.
-            - Aynı sahil için yazıların dili tekrar etmemeli.
-            - Aynı öneri kalıplarını tekrar etme (örn: "sabah daha uygun").
-
-            STİL:
-            - İnsan yazmış gibi, akıcı Türkçe
-            - Teknik terimleri sadeleştir ama yok etme
-            - Her raporda vurgu farklı olsun (bazen rüzgâr, bazen su, bazen konfor)
-
-            ÇIKIŞ:
-            - 3–5 cümle
-            - Son cümle: tek, net, özgül bir öneri
-            """
-    )
+    model = ai_report.configured_model()
+
+    key = ai_report.cache_key(payload.beach, model)
+    cached = await _cached_report(payload.beach, key)
+    if cached is not None:
+        return {"report": cached, "cached": True}
+
+    try:
+        text = await ai_report.generate_coalesced(key, payload.beach, api_key=api_key, model=model)
+    except OpenAIBusy as e:
+        raise _busy(e)
+    except OpenAIError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    if text:
+        await report_cache.put(key, text)
+
+    return {"report": text or "Analiz şu anda üretilemedi.", "cached": False}
 
-    user = (
-        "Aşağıdaki sahil verilerini analiz et ve turistler için 3-5 cümlelik kısa bir rapor yaz. "
-        "Yüzme/güneşlenme için uygunluk, su kalitesi, hava kalitesi ve sıcaklığa odaklan. "
-        "Son cümlede 1 net öneri ver (örn. ‘Sabah saatleri daha uygun’).\n\n"
-        f"DATA: {beach}"
-    )
 
-    # OpenAI Responses API
-    url = "https://api.openai.com/v1/responses"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-    body = {
-        "model": model,
-        "input": [
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        "temperature": 0.4,
-        "max_output_tokens": 220,
-    }
-
-    timeout = httpx.Timeout(20.0)
-    async with httpx.AsyncClient(timeout=timeout) as client:
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/beach-report/stream")
+async def beach_report_stream(payload: BeachReportRequest):
+    """Streaming variant of /beach-report (server-sent events).
+
+    Events: "delta" {"text"} as tokens arrive, then "done" {"report", "cached"},
+    or "error" {"detail"} if OpenAI fails mid-way. A cached report is sent as a
+    single delta.
+    """
+
+    api_key = _get_required_env("OPENAI_API_KEY")
+    model = ai_report.configured_model()
+    key = ai_report.cache_key(payload.beach, model)
+    if ai_report.limiter().queue_full():
+        raise _busy(OpenAIBusy("Too many AI report requests queued; try again shortly"))
+
+    async def _events() -> AsyncIterator[str]:
+        cached = await _cached_report(payload.beach, key)
+        if cached is not None:
+            yield _sse("delta", {"text": cached})
+            yield _sse("done", {"report": cached, "cached": True})
+            return
+
+        parts: list[str] = []
         try:
-            resp = await client.post(url, headers=headers, json=body)
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=502, detail=f"OpenAI request failed: {e}")
-
-    if resp.status_code >= 400:
-        raise HTTPException(status_code=502, detail=f"OpenAI error {resp.status_code}: {resp.text}")
-
-    data = resp.json()
-
-    # Response shape: output_text is usually present; fallback to parsing output blocks.
-    text = data.get("output_text")
-    if not text:
-        output = data.get("output") or []
-        chunks: list[str] = []
-        for item in output:
-            for c in item.get("content", []) or []:
-                if c.get("type") in ("output_text", "text"):
-                    chunks.append(c.get("text") or "")
-        text = "\n".join([c for c in chunks if c]).strip()
-
-    return {"report": text or "Analiz şu anda üretilemedi."}
+            async with ai_report.limiter().slot():
+                async for delta in ai_report.stream(payload.beach, api_key=api_key, model=model):
+                    parts.append(delta)
+                    yield _sse("delta", {"text": delta})
+        except OpenAIError as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+
+        text = "".join(parts).strip()
+        if text:
+            await report_cache.put(key, text)
+        yield _sse("done", {"report": text or "Analiz şu anda üretilemedi.", "cached": False})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        # No proxy buffering, so each event reaches the browser as it is produced.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
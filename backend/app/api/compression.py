@@ -0,0 +1,149 @@
+"""
+gzip / brotli compression for HTTP responses.
+
+Plain ASGI middleware: buffers a response that arrives in a single body
+message and compresses it when the client accepts it, the content type is
+textual and the body is at least COMPRESSION_MIN_BYTES. Streaming responses
+(several body messages, e.g. server-sent events) and responses that already
+carry a Content-Encoding are passed through untouched.
+
+Brotli (a hard dependency, see requirements.txt) is used when the client
+accepts it; otherwise gzip.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import brotli
+
+from app.config.env import env_int
+
+
+_COMPRESSIBLE_PREFIXES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/manifest+json",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _enabled() -> bool:
+    return os.getenv("COMPRESSION_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+
+# Offered codings, in server preference order.
+ENCODINGS: Tuple[str, ...] = ("br", "gzip")
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}."""
+
+    out: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[coding] = q
+    return out
+
+
+def choose_encoding(accept_encoding: str, offered: Sequence[str]) -> Optional[str]:
+    """Best of `offered` (in server preference order) that the client accepts."""
+
+    accepted = accepted_encodings(accept_encoding)
+    best: Optional[str] = None
+    best_q = 0.0
+    for coding in offered:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=env_int("COMPRESSION_BROTLI_QUALITY", 5, 0, 11))
+    return gzip.compress(body, compresslevel=env_int("COMPRESSION_GZIP_LEVEL", 6, 1, 9), mtime=0)
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for k, v in headers:
+        if k.lower() == name:
+            return v
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+        self.min_bytes = env_int("COMPRESSION_MIN_BYTES", 1024, 0, 1 << 30)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not _enabled():
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for k, v in scope.get("headers") or []:
+            if k == b"accept-encoding":
+                accept = v.decode("latin-1")
+                break
+        encoding = choose_encoding(accept, ENCODINGS) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        passthrough = False
+
+        async def _send(message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                # Hold the headers until we know whether the body gets compressed.
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough or start is None:
+                await send(message)
+                return
+
+            headers = list(start.get("headers") or [])
+            body = message.get("body", b"")
+            content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+            if (
+                message.get("more_body", False)
+                or _header(headers, b"content-encoding") is not None
+                or len(body) < self.min_bytes
+                or not content_type.startswith(_COMPRESSIBLE_PREFIXES)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+            headers.append((b"content-encoding", encoding.encode("ascii")))
+            headers.append((b"content-length", str(len(compressed)).encode("ascii")))
+            vary = _header(headers, b"vary")
+            if vary is None:
+                headers.append((b"vary", b"Accept-Encoding"))
+            elif b"accept-encoding" not in vary.lower():
+                headers = [(k, v) for k, v in headers if k.lower() != b"vary"]
+                headers.append((b"vary", vary + b", Accept-Encoding"))
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, _send)
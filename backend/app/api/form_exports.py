@@ -0,0 +1,165 @@
+"""
+Token-protected exports of the form submissions for organizers.
+
+    GET /api/forms/export/volunteers?format=csv&beach_id=konyaalti&preferred_date=2025-08-01
+    GET /api/forms/export/newsletter?format=ndjson
+    (header X-Export-Token: $EXPORT_TOKEN)
+
+Rows are streamed page by page with keyset pagination (SQLite: `id > last`,
+Firestore: `start_after(last document)`), so memory use does not grow with
+the table and no page is re-scanned. Works for both FORMS_STORAGE backends.
+CSV cells starting with =, +, - or @ get a leading ' so spreadsheet apps
+don't evaluate submitted text as a formula.
+"""
+
+from __future__ import annotations
+
+import csv
+import hmac
+import io
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from app.api.forms import _forms_storage, _get_firestore_client, _get_pool
+
+
+router = APIRouter(prefix="/api/forms/export", tags=["forms"])
+
+# ip / user_agent are stored for abuse handling and are not exported.
+_VOLUNTEER_COLUMNS = ("id", "created_at", "name", "email", "phone", "beach_id", "preferred_date", "message")
+_NEWSLETTER_COLUMNS = ("id", "created_at", "email")
+
+_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _require_export_token(token: str | None) -> None:
+    expected = (os.getenv("EXPORT_TOKEN") or "").strip()
+    if not expected:
+        raise HTTPException(status_code=501, detail="Export token not configured")
+    if not token or not hmac.compare_digest(token.strip().encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+
+def _page_size() -> int:
+    try:
+        return max(1, int(os.getenv("EXPORT_PAGE_SIZE", "500")))
+    except ValueError:
+        return 500
+
+
+def _sqlite_pages(table: str, columns: Sequence[str], filters: Dict[str, str]) -> Iterator[List[Tuple[Any, ...]]]:
+    where = "".join(f" AND {name} = ?" for name in filters)
+    sql = f"SELECT {', '.join(columns)} FROM {table} WHERE id > ?{where} ORDER BY id LIMIT ?"
+    page_size = _page_size()
+    last_id = 0
+    while True:
+        # A pooled connection per page: nothing is held while the client reads.
+        with _get_pool().connection() as conn:
+            rows = [tuple(r) for r in conn.execute(sql, (last_id, *filters.values(), page_size))]
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1][0]
+
+
+def _firestore_pages(collection: str, columns: Sequence[str], filters: Dict[str, str]) -> Iterator[List[Tuple[Any, ...]]]:
+    client = _get_firestore_client()
+    query = client.collection(collection)
+    for name, value in filters.items():
+        query = query.where(filter=FieldFilter(name, "==", value))
+    query = query.order_by("__name__")
+    page_size = _page_size()
+    last = None
+    while True:
+        page = query.start_after(last) if last is not None else query
+        snaps = list(page.limit(page_size).stream())
+        if not snaps:
+            return
+        rows = []
+        for snap in snaps:
+            data = snap.to_dict() or {}
+            rows.append(tuple(snap.id if c == "id" else data.get(c) for c in columns))
+        yield rows
+        if len(snaps) < page_size:
+            return
+        last = snaps[-1]
+
+
+# A cell starting with one of these is run as a formula by spreadsheet apps.
+_FORMULA_PREFIXES = ("=", "+", "-", "@")
+
+
+def _csv_cell(value: Any) -> Any:
+    # Form fields are user input: neutralize formulas (CSV injection) with a leading quote.
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunks(columns: Sequence[str], pages: Iterator[List[Tuple[Any, ...]]]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for rows in pages:
+        writer.writerows([_csv_cell(v) for v in row] for row in rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _ndjson_chunks(columns: Sequence[str], pages: Iterator[List[Tuple[Any, ...]]]) -> Iterator[str]:
+    for rows in pages:
+        yield "".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows)
+
+
+def _export(name: str, columns: Sequence[str], fmt: str, filters: Dict[str, Optional[str]]) -> StreamingResponse:
+    active = {k: v for k, v in filters.items() if v}
+    if _forms_storage() == "firestore":
+        pages = _firestore_pages(name, columns, active)
+    else:
+        pages = _sqlite_pages(name, columns, active)
+
+    chunks = _csv_chunks(columns, pages) if fmt == "csv" else _ndjson_chunks(columns, pages)
+    # Sync generator: Starlette iterates it in the threadpool, so storage calls don't block the loop.
+    return StreamingResponse(
+        chunks,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{fmt}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.get("/volunteers")
+def export_volunteers(
+    x_export_token: str | None = Header(None, alias="X-Export-Token"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    beach_id: Optional[str] = Query(None, max_length=64),
+    preferred_date: Optional[str] = Query(None, max_length=32),
+):
+    _require_export_token(x_export_token)
+    return _export(
+        "volunteer_signups",
+        _VOLUNTEER_COLUMNS,
+        format,
+        {"beach_id": beach_id, "preferred_date": preferred_date},
+    )
+
+
+@router.get("/newsletter")
+def export_newsletter(
+    x_export_token: str | None = Header(None, alias="X-Export-Token"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+):
+    _require_export_token(x_export_token)
+    return _export("newsletter_signups", _NEWSLETTER_COLUMNS, format, {})
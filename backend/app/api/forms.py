@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+import math
 import os
 import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, EmailStr, Field
 
+from app.config.env import env_int
+from app.services import memory_firestore
+from app.services.group_commit import GroupCommitQueue, QueueFull
+from app.services.rate_limit import RecentKeys, SlidingWindowLimiter, hash_key
+from app.services.sqlite_pool import SQLitePool
+
 
 router = APIRouter(prefix="/api/forms", tags=["forms"])
 
@@ -22,14 +32,30 @@ def _firestore_project() -> Optional[str]:
     return os.getenv("FIRESTORE_PROJECT") or os.getenv("GOOGLE_CLOUD_PROJECT")
 
 
+_firestore_client = None
+_firestore_lock = threading.Lock()
+
+
 def _get_firestore_client():
+    """One Firestore client per process (it holds a gRPC channel; cheap to share)."""
+
+    global _firestore_client
+    if _firestore_client is not None:
+        return _firestore_client
+
+    if memory_firestore.selected():
+        return memory_firestore.shared()
+
     try:
         from google.cloud import firestore  # type: ignore
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Firestore client not available: {e}")
 
-    project = _firestore_project()
-    return firestore.Client(project=project) if project else firestore.Client()
+    with _firestore_lock:
+        if _firestore_client is None:
+            project = _firestore_project()
+            _firestore_client = firestore.Client(project=project) if project else firestore.Client()
+        return _firestore_client
 
 
 def _db_path() -> str:
@@ -38,24 +64,57 @@ def _db_path() -> str:
     return os.getenv("DB_PATH", default_path)
 
 
-def _connect() -> sqlite3.Connection:
-    db_path = _db_path()
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    # timeout helps avoid 'database is locked' on brief concurrent writes.
-    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
-    conn.row_factory = sqlite3.Row
+def _synchronous() -> str:
+    # Writes are group-committed, so the per-commit fsync of FULL is affordable.
+    value = os.getenv("FORMS_DB_SYNCHRONOUS", "FULL").strip().upper()
+    return value if value in {"OFF", "NORMAL", "FULL", "EXTRA"} else "FULL"
+
+
+_pool: Optional[SQLitePool] = None
+_pool_lock = threading.Lock()
 
-    # Reasonable defaults for a small demo app.
-    # WAL improves concurrent read/write behavior.
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    conn.execute("PRAGMA foreign_keys=ON")
-    return conn
+
+def _get_pool() -> SQLitePool:
+    """Process-wide pool for the forms DB (WAL, FORMS_DB_SYNCHRONOUS, foreign_keys=ON)."""
+
+    global _pool
+    db_path = _db_path()
+    with _pool_lock:
+        if _pool is None or _pool.path != db_path:
+            if _pool is not None:
+                _pool.close()
+            pragmas = ("PRAGMA journal_mode=WAL", f"PRAGMA synchronous={_synchronous()}", "PRAGMA foreign_keys=ON")
+            _pool = SQLitePool(db_path, size=env_int("FORMS_DB_POOL_SIZE", 4, minimum=1), pragmas=pragmas)
+        return _pool
+
+
+def _close_db() -> None:
+    global _pool
+    _close_queues()
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+# Kept as constants so each pooled connection's statement cache reuses them.
+_INSERT_VOLUNTEER = """
+    INSERT INTO volunteer_signups (
+      created_at, ip, user_agent, name, email, phone, beach_id, preferred_date, message
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# An existing address is reported as created=False without failing the batch.
+# Only the email conflict is ignored; any other constraint still raises.
+_INSERT_NEWSLETTER = """
+    INSERT INTO newsletter_signups (created_at, ip, user_agent, email)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(email) DO NOTHING
+"""
 
 
 def _init_db() -> None:
-    conn = _connect()
-    try:
+    with _get_pool().connection() as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS volunteer_signups (
@@ -83,9 +142,14 @@ def _init_db() -> None:
             )
             """
         )
+        # Per-event exports filter on beach and date (see api/form_exports.py).
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_volunteer_signups_beach_date
+              ON volunteer_signups (beach_id, preferred_date)
+            """
+        )
         conn.commit()
-    finally:
-        conn.close()
 
 
 class VolunteerSignupIn(BaseModel):
@@ -101,125 +165,277 @@ class NewsletterSignupIn(BaseModel):
     email: EmailStr
 
 
+# ---------------------------------------------------------------------------
+# Group-committed writes
+# ---------------------------------------------------------------------------
+
+_VOLUNTEER_FIELDS = ("created_at", "ip", "user_agent", "name", "email", "phone", "beach_id", "preferred_date", "message")
+_NEWSLETTER_FIELDS = ("created_at", "ip", "user_agent", "email")
+
+
+@dataclass
+class _Signup:
+    kind: str  # "volunteer" | "newsletter"
+    doc_id: str  # Firestore document id
+    doc: Dict[str, Any]
+
+
+def _flush_sqlite(items: List[_Signup]) -> List[bool]:
+    """Insert the batch in one transaction; result per item is "created"."""
+
+    results: List[bool] = []
+    with _get_pool().connection() as conn:
+        for item in items:
+            if item.kind == "volunteer":
+                conn.execute(_INSERT_VOLUNTEER, tuple(item.doc[f] for f in _VOLUNTEER_FIELDS))
+                results.append(True)
+            else:
+                cur = conn.execute(_INSERT_NEWSLETTER, tuple(item.doc[f] for f in _NEWSLETTER_FIELDS))
+                results.append(cur.rowcount == 1)
+        conn.commit()
+    return results
+
+
+def _already_exists(e: Exception) -> bool:
+    # Firestore raises AlreadyExists; don't depend on class import.
+    msg = str(e)
+    return "AlreadyExists" in msg or "already exists" in msg
+
+
+def _flush_firestore(items: List[_Signup]) -> List[bool]:
+    """Write the batch with one Firestore commit; result per item is "created"."""
+
+    client = _get_firestore_client()
+    refs = []
+    results: List[bool] = []
+    seen = set()
+    batch = client.batch()
+    for item in items:
+        ref = client.collection(f"{item.kind}_signups").document(item.doc_id)
+        refs.append(ref)
+        if item.kind == "volunteer":
+            batch.set(ref, item.doc)
+            results.append(True)
+        elif item.doc_id in seen:
+            # Same address twice in one batch: only the first one is a new signup.
+            results.append(False)
+        else:
+            seen.add(item.doc_id)
+            # create() fails if already exists (gives us idempotency like UNIQUE).
+            batch.create(ref, item.doc)
+            results.append(True)
+
+    try:
+        batch.commit()
+        return results
+    except Exception as e:
+        if not _already_exists(e):
+            raise
+
+    # Some address was already subscribed and the batch is atomic, so nothing
+    # was written: fall back to one write per item.
+    for i, (item, ref) in enumerate(zip(items, refs)):
+        if item.kind == "volunteer":
+            ref.set(item.doc)
+        elif results[i]:
+            if ref.get().exists:
+                results[i] = False
+                continue
+            try:
+                ref.create(item.doc)
+            except Exception as e:
+                if not _already_exists(e):
+                    raise
+                results[i] = False
+    return results
+
+
+def _sqlite_item_error(e: BaseException) -> bool:
+    return isinstance(e, sqlite3.IntegrityError)
+
+
+def _firestore_item_error(e: BaseException) -> bool:
+    # A rejected document; don't depend on the google.api_core class import.
+    return _already_exists(e) or type(e).__name__ == "InvalidArgument"
+
+
+_queues: Dict[str, GroupCommitQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def _get_queue(storage: str) -> GroupCommitQueue:
+    with _queues_lock:
+        q = _queues.get(storage)
+        if q is None:
+            q = GroupCommitQueue(
+                f"forms_{storage}",
+                _flush_firestore if storage == "firestore" else _flush_sqlite,
+                window_s=env_int("FORMS_BATCH_WINDOW_MS", 5, minimum=0) / 1000.0,
+                max_batch=env_int("FORMS_BATCH_MAX", 256, minimum=1),
+                max_pending=env_int("FORMS_QUEUE_MAX", 10000, minimum=1),
+                is_item_error=_firestore_item_error if storage == "firestore" else _sqlite_item_error,
+            )
+            _queues[storage] = q
+        return q
+
+
+def _close_queues() -> None:
+    with _queues_lock:
+        queues = list(_queues.values())
+        _queues.clear()
+    for q in queues:
+        q.close()
+
+
+async def _write(storage: str, item: _Signup) -> bool:
+    """Queue `item` and wait until its batch is committed."""
+
+    try:
+        future = _get_queue(storage).submit(item)
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Too many submissions right now; please try again shortly")
+    # Shielded: a departing client must not cancel a write that is already queued.
+    return await asyncio.shield(asyncio.wrap_future(future))
+
+
+def _client_ip(request: Request) -> Optional[str]:
+    # Behind a proxy that sets X-Forwarded-For (e.g. Cloud Run) the peer is the proxy.
+    # Each trusted proxy appends the address it saw, so count from the right: the
+    # leftmost entries come from the client and can be anything.
+    if os.getenv("FORMS_TRUST_FORWARDED_FOR", "0").strip().lower() in {"1", "true", "yes", "on"}:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",")]
+        forwarded = [part for part in forwarded if part]
+        if forwarded:
+            hops = env_int("FORMS_TRUSTED_PROXY_HOPS", 1, minimum=1)
+            return forwarded[-min(hops, len(forwarded))]
+    return request.client.host if request.client else None
+
+
+def _client_info(request: Request) -> Tuple[Optional[str], Optional[str]]:
+    return (_client_ip(request), request.headers.get("user-agent"))
+
+
+# ---------------------------------------------------------------------------
+# Abuse guards (in memory, per process): checked before any storage I/O
+# ---------------------------------------------------------------------------
+
+_ip_limiter = SlidingWindowLimiter(env_int("FORMS_RATE_IP_PER_MIN", 20, minimum=1), 60.0)
+_email_limiter = SlidingWindowLimiter(env_int("FORMS_RATE_EMAIL_PER_HOUR", 5, minimum=1), 3600.0)
+# Addresses stored recently; a repeat is answered created=False without a write.
+_recent_newsletter = RecentKeys(
+    env_int("FORMS_NEWSLETTER_DEDUP_TTL_S", 86400, minimum=0),
+    max_keys=env_int("FORMS_NEWSLETTER_DEDUP_SIZE", 50000, minimum=1),
+)
+
+
+def _rate_limit_enabled() -> bool:
+    return os.getenv("FORMS_RATE_LIMIT_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _check_rate(ip: Optional[str], email_key: str) -> None:
+    """429 if this IP or this (hashed) email submitted too often recently."""
+
+    if not _rate_limit_enabled():
+        return
+    for limiter, key in ((_ip_limiter, ip), (_email_limiter, email_key)):
+        if not key:
+            continue
+        wait_s = limiter.hit(key)
+        if wait_s:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many submissions; please try again later",
+                headers={"Retry-After": str(math.ceil(wait_s))},
+            )
+
+
 @router.on_event("startup")
 def _startup_init_db() -> None:
     if _forms_storage() == "sqlite":
         _init_db()
 
 
+@router.on_event("shutdown")
+def _shutdown_close_db() -> None:
+    _close_db()
+
+
 @router.post("/volunteer")
-def create_volunteer_signup(payload: VolunteerSignupIn, request: Request):
+async def create_volunteer_signup(payload: VolunteerSignupIn, request: Request):
     storage = _forms_storage()
+    ip, user_agent = _client_info(request)
+    _check_rate(ip, hash_key(str(payload.email)))
+    item = _Signup(
+        kind="volunteer",
+        doc_id=uuid.uuid4().hex[:20],
+        doc={
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "ip": ip,
+            "user_agent": user_agent,
+            "name": payload.name,
+            "email": str(payload.email),
+            "phone": payload.phone,
+            "beach_id": payload.beachId,
+            "preferred_date": payload.date,
+            "message": payload.message,
+        },
+    )
+
     if storage == "firestore":
         try:
-            client = _get_firestore_client()
-            now = datetime.now(timezone.utc).isoformat()
-            doc = {
-                "created_at": now,
-                "ip": request.client.host if request.client else None,
-                "user_agent": request.headers.get("user-agent"),
-                "name": payload.name,
-                "email": str(payload.email),
-                "phone": payload.phone,
-                "beach_id": payload.beachId,
-                "preferred_date": payload.date,
-                "message": payload.message,
-            }
-            client.collection("volunteer_signups").add(doc)
+            await _write(storage, item)
             return {"ok": True}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Firestore error: {e}")
 
     try:
-        conn = _connect()
-        now = datetime.now(timezone.utc).isoformat()
-        conn.execute(
-            """
-            INSERT INTO volunteer_signups (
-              created_at, ip, user_agent, name, email, phone, beach_id, preferred_date, message
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                now,
-                request.client.host if request.client else None,
-                request.headers.get("user-agent"),
-                payload.name,
-                str(payload.email),
-                payload.phone,
-                payload.beachId,
-                payload.date,
-                payload.message,
-            ),
-        )
-        conn.commit()
+        await _write(storage, item)
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
     return {"ok": True}
 
 
 @router.post("/newsletter")
-def create_newsletter_signup(payload: NewsletterSignupIn, request: Request):
+async def create_newsletter_signup(payload: NewsletterSignupIn, request: Request):
     storage = _forms_storage()
+    ip, user_agent = _client_info(request)
+    # One normalized address for the dedup/rate keys and the stored row, so
+    # "A@x.org" and "a@x.org" are the same subscriber everywhere.
+    email = str(payload.email).strip().lower()
+    email_hash = hash_key(email)
+    # A repeat signup is answered without a write, so it doesn't use up the rate limit.
+    if email_hash in _recent_newsletter:
+        return {"ok": True, "created": False}
+    _check_rate(ip, email_hash)
+    now = datetime.now(timezone.utc).isoformat()
+
     if storage == "firestore":
+        item = _Signup(
+            kind="newsletter",
+            doc_id=email,
+            doc={"created_at": now, "ip": ip, "user_agent": user_agent, "email": email},
+        )
         try:
-            client = _get_firestore_client()
-            now = datetime.now(timezone.utc).isoformat()
-            email_key = str(payload.email).strip().lower()
-            ref = client.collection("newsletter_signups").document(email_key)
-
-            # create() fails if already exists (gives us idempotency like UNIQUE).
-            try:
-                ref.create(
-                    {
-                        "created_at": now,
-                        "ip": request.client.host if request.client else None,
-                        "user_agent": request.headers.get("user-agent"),
-                        "email": email_key,
-                    }
-                )
-                created = True
-            except Exception as e:
-                # Firestore raises AlreadyExists; don't depend on class import.
-                msg = str(e)
-                created = False if ("AlreadyExists" in msg or "already exists" in msg) else False
-
+            created = await _write(storage, item)
+            _recent_newsletter.add(email_hash)
             return {"ok": True, "created": created}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Firestore error: {e}")
 
+    item = _Signup(
+        kind="newsletter",
+        doc_id="",
+        doc={"created_at": now, "ip": ip, "user_agent": user_agent, "email": email},
+    )
     try:
-        conn = _connect()
-        now = datetime.now(timezone.utc).isoformat()
-        try:
-            conn.execute(
-                """
-                INSERT INTO newsletter_signups (created_at, ip, user_agent, email)
-                VALUES (?, ?, ?, ?)
-                """,
-                (
-                    now,
-                    request.client.host if request.client else None,
-                    request.headers.get("user-agent"),
-                    str(payload.email),
-                ),
-            )
-            conn.commit()
-            created = True
-        except sqlite3.IntegrityError:
-            # already subscribed
-            created = False
+        created = await _write(storage, item)
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"DB error: {e}")
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+    _recent_newsletter.add(email_hash)
 
     return {"ok": True, "created": created}
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Query, HTTPException, Header
+from fastapi import APIRouter, Query, HTTPException, Header, Request, Response
+from fastapi.routing import APIRoute
+import asyncio
 import json
 import logging
 import os
+import time
+from functools import partial
+from threading import Lock
+from app.api.responses import FastJSONResponse
 from app.services.oisst import get_sst_for_beach
 from app.data.beaches import BEACHES
 from app.services.chlorophyll import get_chlorophyll_for_beach
@@ -14,15 +20,14 @@ from app.services.waste_risk import get_waste_risk_for_beach
 from app.services.timeseries import get_beach_summary
 from app.services.daily_refresh import refresh_beach
 from app.services.tr_time import current_refresh_window, tr_today
-from app.services import beach_day_store
+from app.services.timing import stage
+from app.services import ai_report, beach_day_store, ee_priority, profiling, series_engine, telemetry
+from app.services.ee_calls import DeadlineExceeded, EEUnavailable
+from app.services import ee_executor
+from app.services.ee_executor import default_timeout_s, run_ee
 from datetime import date, datetime, timedelta, timezone
 
 
-router = APIRouter(
-    prefix="/api/metrics",
-    tags=["metrics"]
-)
-
 logger = logging.getLogger("uvicorn.error")
 
 
@@ -34,7 +39,156 @@ def _require_refresh_token(token: str | None) -> None:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
-def _assemble_series_from_store(beach_id: str, days: int, end_day: date) -> dict:
+class _ProfilingRoute(APIRoute):
+    """Adds `?profile=1` to every metrics route (admin only, X-Refresh-Token).
+
+    The EE work of the request runs under cProfile; the merged profile is
+    saved under PROFILE_DIR and its summary is returned in a "profile" key.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def _handler(request: Request) -> Response:
+            if request.query_params.get("profile", "").strip().lower() not in {"1", "true", "yes", "on"}:
+                return await handler(request)
+
+            _require_refresh_token(request.headers.get("X-Refresh-Token"))
+            with profiling.session() as session:
+                response = await handler(request)
+            report = session.report()
+            logger.info("[profile] %s %s saved to %s", request.method, request.url.path, report["path"])
+
+            try:
+                body = json.loads(response.body)
+            except (AttributeError, ValueError):
+                return response
+            if not isinstance(body, dict):
+                body = {"result": body}
+            body["profile"] = report
+            return FastJSONResponse(body, status_code=response.status_code)
+
+        return _handler
+
+
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["metrics"],
+    route_class=_ProfilingRoute,
+    default_response_class=FastJSONResponse,
+)
+
+
+async def _run_ee(fn, *args, **kwargs):
+    """Run blocking EE-backed work on the dedicated EE executor with the request deadline."""
+
+    try:
+        return await run_ee(fn, *args, timeout_s=default_timeout_s(), **kwargs)
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Earth Engine request timed out")
+    except EEUnavailable:
+        # Distinct from "no_data": EE is throttling or down, nothing was stored.
+        raise HTTPException(status_code=503, detail="Earth Engine unavailable")
+
+
+def _serve_stale_default() -> bool:
+    return os.getenv("SERVE_STALE_ENABLED", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+
+_STORED_FIELDS = [
+    "sst_celsius",
+    "turbidity_ndti",
+    "chlorophyll",
+    "no2_mol_m2",
+    "air_quality",
+    "wqi",
+    "waste_risk_percent",
+]
+
+# How far back to look for a stored day to stand in for missing ones.
+_STALE_LOOKBACK_DAYS = 5
+
+
+def _day_list(days: int, end_day: date) -> list:
+    return [(end_day - timedelta(days=(days - 1 - i))).isoformat() for i in range(days)]
+
+
+def _compute_missing_days(beach_id: str, days: int, end_day: date) -> None:
+    """Compute the range on EE and store only the days that are still missing."""
+
+    day_list = _day_list(days, end_day)
+    computed = get_beach_summary(beach_id=beach_id, days=days, end_day=end_day)
+    by_date = {r.get("date"): r for r in computed.get("series") or []}
+    existing = beach_day_store.get_days(beach_id, day_list)
+    beach_day_store.upsert_days(
+        beach_id,
+        {d: by_date[d] for d, doc in zip(day_list, existing) if doc is None and d in by_date},
+    )
+
+
+_revalidating: set = set()
+_revalidating_lock = Lock()
+
+
+def _revalidate_in_background(beach_id: str, days: int, end_day: date) -> None:
+    # One revalidation per (beach, range) at a time; later stale hits just serve.
+    key = (beach_id, days, end_day.isoformat())
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+
+    def _done(fut) -> None:
+        with _revalidating_lock:
+            _revalidating.discard(key)
+        if not fut.cancelled() and fut.exception() is not None:
+            logger.warning("beach-summary revalidation failed beach_id=%s: %s", beach_id, fut.exception())
+
+    # Refresh class: queued behind visitors' EE calls, on the batch pool.
+    ee_executor.submit(_compute_missing_days, beach_id, days, end_day, priority=ee_priority.REFRESH).add_done_callback(_done)
+
+
+def _stale_placeholder(day: str, prev: dict | None) -> dict:
+    """Stand-in for a day that is not stored yet: carry the last stored day forward."""
+
+    row: dict = {"date": day}
+    sources: dict = {}
+    for field in _STORED_FIELDS:
+        value = None if prev is None else prev.get(field)
+        row[field] = value
+        sources[field] = "missing" if value is None else "stale"
+    if row["air_quality"] is None:
+        row["air_quality"] = "unknown"
+    row["sources"] = sources
+    return row
+
+
+def _fill_with_placeholders(beach_id: str, day_list: list, docs: list) -> list:
+    prev = None
+    if docs and docs[0] is None:
+        first = date.fromisoformat(day_list[0])
+        prior_days = [(first - timedelta(days=i)).isoformat() for i in range(_STALE_LOOKBACK_DAYS, 0, -1)]
+        prev = next((d for d in reversed(beach_day_store.get_days(beach_id, prior_days)) if d is not None), None)
+
+    out = []
+    for day, doc in zip(day_list, docs):
+        if doc is not None:
+            prev = doc
+            out.append(doc)
+        else:
+            out.append(_stale_placeholder(day, prev))
+    return out
+
+
+def _assemble_series_from_store(beach_id: str, days: int, end_day: date, allow_stale: bool = False) -> dict:
+    """Serve the stored daily series.
+
+    Missing days are computed on EE before answering, unless `allow_stale` is
+    set: then they are filled with placeholders (last stored day carried
+    forward, sources marked "stale"), computed in the background, and the
+    response is flagged with cache.stale.
+    """
+
     if not beach_day_store.enabled():
         # Local/dev fallback: compute directly.
         refresh = current_refresh_window(datetime.now(timezone.utc))
@@ -43,42 +197,41 @@ def _assemble_series_from_store(beach_id: str, days: int, end_day: date) -> dict
             "snapshot_date": refresh.snapshot_date,
             "timezone": refresh.timezone,
             "next_refresh_at": refresh.next_refresh_at,
+            "stale": False,
         }
         return computed
 
     # Build list of requested days.
-    day_list = [(end_day - timedelta(days=(days - 1 - i))).isoformat() for i in range(days)]
+    day_list = _day_list(days, end_day)
     docs = beach_day_store.get_days(beach_id, day_list)
 
-    # If anything is missing, compute on-demand and store the missing docs.
+    missing = sum(1 for d in docs if d is None)
+    telemetry.CACHE_LOOKUPS.inc(len(docs) - missing, cache="day_store", result="hit")
+    telemetry.CACHE_LOOKUPS.inc(missing, cache="day_store", result="miss")
+
+    stale = False
     if any(d is None for d in docs):
-        computed = get_beach_summary(beach_id=beach_id, days=days, end_day=end_day)
-        computed_series = computed.get("series") or []
-        by_date = {r.get("date"): r for r in computed_series}
-        for d in day_list:
-            if beach_day_store.get_day(beach_id, d) is None:
-                row = by_date.get(d)
-                if row is not None:
-                    beach_day_store.upsert_day(beach_id, d, row)
-        docs = beach_day_store.get_days(beach_id, day_list)
-
-    series = [d for d in docs if d is not None]
-
-    # Compute averages.
-    def _mean(xs):
-        nums = [v for v in xs if isinstance(v, (int, float))]
-        return None if not nums else sum(nums) / len(nums)
-
-    averages = {
-        "sst_celsius": (lambda v: None if v is None else round(v, 2))(_mean([r.get("sst_celsius") for r in series])),
-        "turbidity_ndti": (lambda v: None if v is None else round(v, 4))(_mean([r.get("turbidity_ndti") for r in series])),
-        "chlorophyll": (lambda v: None if v is None else round(v, 4))(_mean([r.get("chlorophyll") for r in series])),
-        "no2_mol_m2": _mean([r.get("no2_mol_m2") for r in series]),
-        "wqi": (lambda v: None if v is None else round(v, 1))(_mean([r.get("wqi") for r in series])),
-        "waste_risk_percent": (lambda v: None if v is None else round(v, 1))(
-            _mean([r.get("waste_risk_percent") for r in series])
-        ),
-    }
+        if allow_stale:
+            docs = _fill_with_placeholders(beach_id, day_list, docs)
+            _revalidate_in_background(beach_id, days, end_day)
+            stale = True
+        else:
+            # Compute on-demand and store the missing docs.
+            _compute_missing_days(beach_id, days, end_day)
+            docs = beach_day_store.get_days(beach_id, day_list)
+
+    with stage("assemble"):
+        return _series_response(beach_id, days, [d for d in docs if d is not None], stale)
+
+
+def _is_placeholder(row: dict) -> bool:
+    sources = row.get("sources") or {}
+    return bool(sources) and all(src in ("stale", "missing") for src in sources.values())
+
+
+def _series_response(beach_id: str, days: int, series: list, stale: bool) -> dict:
+    # Placeholders repeat the last stored day; counting them would skew the averages towards it.
+    averages = series_engine.series_averages([r for r in series if not _is_placeholder(r)])
 
     refresh = current_refresh_window(datetime.now(timezone.utc))
 
@@ -109,11 +262,12 @@ def _assemble_series_from_store(beach_id: str, days: int, end_day: date) -> dict
             "snapshot_date": refresh.snapshot_date,
             "timezone": refresh.timezone,
             "next_refresh_at": refresh.next_refresh_at,
+            "stale": stale,
         },
     }
 
 @router.get("/sst")
-def get_sst(
+async def get_sst(
     beach_id: str = Query(..., description="Beach identifier (e.g. konyaalti)"),
     days: int = Query(7, ge=1, le=30)
 ):
@@ -121,7 +275,7 @@ def get_sst(
         raise HTTPException(status_code=404, detail="Beach not found")
 
     beach = BEACHES[beach_id]
-    sst = get_sst_for_beach(beach_id, days=days)
+    sst = await _run_ee(get_sst_for_beach, beach_id, days=days)
 
     if sst is None:
         return {
@@ -147,8 +301,7 @@ def get_sst(
         }
     }
 
-@router.get("/sst/all")
-def get_sst_all(days: int = Query(7, ge=1, le=30)):
+def _sst_all(days: int) -> list:
     results = []
 
     for beach_id, beach in BEACHES.items():
@@ -160,6 +313,13 @@ def get_sst_all(days: int = Query(7, ge=1, le=30)):
             "sst_celsius": None if sst is None else round(sst, 2)
         })
 
+    return results
+
+
+@router.get("/sst/all")
+async def get_sst_all(days: int = Query(7, ge=1, le=30)):
+    results = await _run_ee(_sst_all, days)
+
     return {
         "metric": "sea_surface_temperature",
         "unit": "celsius",
@@ -170,7 +330,7 @@ def get_sst_all(days: int = Query(7, ge=1, le=30)):
 
 
 @router.get("/chlorophyll")
-def get_chlorophyll(
+async def get_chlorophyll(
     beach_id: str = Query(..., description="Beach identifier (e.g. konyaalti)"),
     days: int = Query(7, ge=1, le=30)
 ):
@@ -178,7 +338,7 @@ def get_chlorophyll(
         raise HTTPException(status_code=404, detail="Beach not found")
 
     beach = BEACHES[beach_id]
-    value = get_chlorophyll_for_beach(beach_id, days=days)
+    value = await _run_ee(get_chlorophyll_for_beach, beach_id, days=days)
 
     if value is None:
         raise HTTPException(status_code=204, detail="No data available")
@@ -195,7 +355,7 @@ def get_chlorophyll(
     }
 
 @router.get("/turbidity")
-def get_turbidity(
+async def get_turbidity(
     beach_id: str = Query(...),
     days: int = Query(7, ge=1, le=30)
 ):
@@ -203,7 +363,7 @@ def get_turbidity(
         raise HTTPException(status_code=404, detail="Beach not found")
 
     beach = BEACHES[beach_id]
-    turbidity = get_turbidity_for_beach(beach_id, days)
+    turbidity = await _run_ee(get_turbidity_for_beach, beach_id, days)
     if turbidity is None:
         return {"metric":"turbidity","unit":"relative_index","days":days,
                 "data":{"id":beach_id,"name":beach["name"],"turbidity":None,"status":"no_data"}}
@@ -222,7 +382,7 @@ def get_turbidity(
 
 
 @router.get("/wqi")
-def get_wqi(
+async def get_wqi(
     beach_id: str,
     days: int = 7
 ):
@@ -230,7 +390,9 @@ def get_wqi(
         raise HTTPException(status_code=404, detail="Beach not found")
 
     try:
-        result = calculate_wqi(beach_id, days)
+        result = await _run_ee(calculate_wqi, beach_id, days)
+    except HTTPException:
+        raise
     except Exception:
         return {
             "metric": "water_quality_index",
@@ -257,11 +419,11 @@ def get_wqi(
 
 
 @router.get("/air-quality")
-def get_air_quality(beach_id: str, days: int = 7):
+async def get_air_quality(beach_id: str, days: int = 7):
     if beach_id not in BEACHES:
         raise HTTPException(status_code=404, detail="Beach not found")
 
-    result = get_air_quality_for_beach(beach_id, days=days)
+    result = await _run_ee(get_air_quality_for_beach, beach_id, days=days)
 
     return {
         "metric": "air_quality",
@@ -277,14 +439,14 @@ def get_air_quality(beach_id: str, days: int = 7):
 
 
 @router.get("/waste-risk")
-def get_waste_risk(
+async def get_waste_risk(
     beach_id: str = Query(..., description="Beach identifier (e.g. konyaalti)"),
     days: int = Query(30, ge=1, le=90),
 ):
     if beach_id not in BEACHES:
         raise HTTPException(status_code=404, detail="Beach not found")
 
-    result = get_waste_risk_for_beach(beach_id, days=days)
+    result = await _run_ee(get_waste_risk_for_beach, beach_id, days=days)
     if result is None:
         return {
             "metric": "waste_accumulation_risk",
@@ -311,7 +473,7 @@ def get_waste_risk(
 
 
 @router.get("/beach-summary")
-def beach_summary(
+async def beach_summary(
     beach_id: str = Query(..., description="Beach identifier (e.g. konyaalti)"),
     days: int = Query(7, ge=1, le=30),
     debug: bool = Query(False, description="If true, logs computed metrics to server console"),
@@ -319,22 +481,37 @@ def beach_summary(
         False,
         description="If true, recomputes and revises last days before serving (expensive). Prefer /admin/refresh.",
     ),
+    stale: bool | None = Query(
+        None,
+        description="If true, answer from the store immediately and compute missing days in the background "
+        "(default: SERVE_STALE_ENABLED).",
+    ),
 ):
     if beach_id not in BEACHES:
         raise HTTPException(status_code=404, detail="Beach not found")
 
+    allow_stale = _serve_stale_default() if stale is None else stale
+
     try:
         end_day = tr_today()
 
         # By default, serve the stored daily snapshot series. Missing days are
-        # computed on-demand inside _assemble_series_from_store.
+        # computed inside _assemble_series_from_store (on-demand, or in the
+        # background when serving stale).
         #
         # IMPORTANT: We intentionally do not revise on every request; revisions
         # should be triggered by a daily scheduler calling /admin/refresh.
         if refresh:
-            refresh_beach(beach_id, as_of_day=end_day, days=days, revise_days=5)
+            await _run_ee(refresh_beach, beach_id, as_of_day=end_day, days=days, revise_days=5)
 
-        value = _assemble_series_from_store(beach_id, days=days, end_day=end_day)
+        if allow_stale and beach_day_store.enabled():
+            # Only a store read: keep it off the EE executor so EE load can't delay it.
+            value = await asyncio.to_thread(
+                profiling.run_profiled,
+                partial(_assemble_series_from_store, beach_id, days, end_day, True),
+            )
+        else:
+            value = await _run_ee(_assemble_series_from_store, beach_id, days, end_day)
         if debug:
             logger.info(
                 "[debug] beach-summary served from daily store beach_id=%s days=%s\n%s",
@@ -342,20 +519,13 @@ def beach_summary(
                 days,
                 json.dumps(value, ensure_ascii=False, indent=2),
             )
-        return value
+        # Already JSON-native: returning the response skips jsonable_encoder.
+        return FastJSONResponse(value)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/admin/refresh")
-def admin_refresh(
-    x_refresh_token: str | None = Header(None, alias="X-Refresh-Token"),
-    days: int = Query(7, ge=1, le=30),
-    revise_days: int = Query(5, ge=0, le=30),
-):
-    _require_refresh_token(x_refresh_token)
-
-    as_of = tr_today()
+def _refresh_all_beaches(as_of: date, days: int, revise_days: int) -> list:
     results = []
     for beach_id in BEACHES.keys():
         try:
@@ -372,10 +542,31 @@ def admin_refresh(
         except Exception:
             continue
 
+    return results
+
+
+@router.post("/admin/refresh")
+async def admin_refresh(
+    x_refresh_token: str | None = Header(None, alias="X-Refresh-Token"),
+    days: int = Query(7, ge=1, le=30),
+    revise_days: int = Query(5, ge=0, le=30),
+):
+    _require_refresh_token(x_refresh_token)
+
+    as_of = tr_today()
+    # Batch job: runs on the EE executor without a request deadline.
+    t0 = time.monotonic()
+    results = await run_ee(_refresh_all_beaches, as_of, days, revise_days, priority=ee_priority.REFRESH)
+    telemetry.REFRESH_SECONDS.observe(time.monotonic() - t0, job="admin")
+
+    # Pre-generate today's AI reports from the refreshed snapshot.
+    reports = await ai_report.pregenerate_all(as_of)
+
     return {
         "ok": True,
         "as_of_day": as_of.isoformat(),
         "days": days,
         "revise_days": revise_days,
         "results": results,
+        "ai_reports": reports,
     }
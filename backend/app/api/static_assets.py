@@ -0,0 +1,153 @@
+"""
+Static frontend serving from an index built at startup.
+
+Every file under the static directory is recorded once (size, mtime, media
+type, precompressed `.br` / `.gz` siblings written by
+`python -m app.tools.precompress`), so a request is a dict lookup plus the
+file read: no path resolution or exists()/is_file() calls, and only indexed
+files can be served.
+
+- Hashed Vite assets (`assets/name-<hash>.js`) get a one-year `immutable`
+  Cache-Control; other files a short max-age.
+- `index.html` (also the SPA fallback) is held in memory, together with its
+  compressed variants, and re-read from disk after INDEX_HTML_TTL_S.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+
+from fastapi.responses import FileResponse, Response
+
+from app.config.env import env_float
+from app.api.compression import ENCODINGS, choose_encoding, compress
+
+
+# Vite: assets/<name>-<hash>.<ext>; the hash is 8+ base64url characters.
+_HASHED_RE = re.compile(r"(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+_IMMUTABLE = "public, max-age=31536000, immutable"
+_SHORT = "public, max-age=3600"
+# The SPA shell must be revalidated so clients pick up new asset hashes.
+_INDEX = "no-cache"
+
+_VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class _Asset:
+    path: str
+    stat: os.stat_result
+    media_type: str
+    cache_control: str
+    variants: Dict[str, "_Variant"] = field(default_factory=dict)
+
+
+@dataclass
+class _Variant:
+    path: str
+    stat: os.stat_result
+
+
+@dataclass
+class _IndexHtml:
+    loaded_at: float
+    body: bytes
+    encoded: Dict[str, bytes]
+
+
+class StaticAssets:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._lock = Lock()
+        self._assets: Optional[Dict[str, _Asset]] = None
+        self._index: Optional[_IndexHtml] = None
+
+    # -- index ------------------------------------------------------------
+
+    def build(self) -> int:
+        """(Re)scan the static directory; returns the number of indexed files."""
+
+        assets: Dict[str, _Asset] = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            names = set(filenames)
+            for name in filenames:
+                # Precompressed siblings are attached to their original below.
+                if any(name.endswith(s) and name[: -len(s)] in names for s in _VARIANT_SUFFIXES.values()):
+                    continue
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, self.root).replace(os.sep, "/")
+                asset = _Asset(
+                    path=full,
+                    stat=os.stat(full),
+                    media_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+                    cache_control=_IMMUTABLE if _HASHED_RE.search(rel) else _SHORT,
+                )
+                for encoding, suffix in _VARIANT_SUFFIXES.items():
+                    if name + suffix in names:
+                        variant_path = full + suffix
+                        asset.variants[encoding] = _Variant(path=variant_path, stat=os.stat(variant_path))
+                assets[rel] = asset
+
+        with self._lock:
+            self._assets = assets
+            self._index = None
+        return len(assets)
+
+    def _lookup(self, rel: str) -> Optional[_Asset]:
+        if self._assets is None:
+            self.build()
+        return self._assets.get(rel)
+
+    # -- responses --------------------------------------------------------
+
+    def _index_html(self) -> _IndexHtml:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._index
+        if cached is not None and now - cached.loaded_at < env_float("INDEX_HTML_TTL_S", 60.0):
+            return cached
+
+        body = (self.root / "index.html").read_bytes()
+        encoded = {encoding: compress(body, encoding) for encoding in ENCODINGS}
+        fresh = _IndexHtml(loaded_at=now, body=body, encoded=encoded)
+        with self._lock:
+            self._index = fresh
+        return fresh
+
+    def index_response(self, accept_encoding: str) -> Response:
+        index = self._index_html()
+        headers = {"Cache-Control": _INDEX, "Vary": "Accept-Encoding"}
+        encoding = choose_encoding(accept_encoding, tuple(index.encoded)) if accept_encoding else None
+        if encoding is None:
+            return Response(index.body, media_type="text/html", headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(index.encoded[encoding], media_type="text/html", headers=headers)
+
+    def response(self, rel: str, accept_encoding: str) -> Response:
+        """The file at `rel`, or the SPA shell if no such file is indexed."""
+
+        if rel in ("", "index.html"):
+            return self.index_response(accept_encoding)
+
+        asset = self._lookup(rel)
+        if asset is None:
+            return self.index_response(accept_encoding)
+
+        headers = {"Cache-Control": asset.cache_control}
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+            encoding = choose_encoding(accept_encoding, tuple(asset.variants)) if accept_encoding else None
+            if encoding is not None:
+                variant = asset.variants[encoding]
+                headers["Content-Encoding"] = encoding
+                return FileResponse(variant.path, stat_result=variant.stat, media_type=asset.media_type, headers=headers)
+
+        return FileResponse(asset.path, stat_result=asset.stat, media_type=asset.media_type, headers=headers)
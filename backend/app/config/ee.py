@@ -10,9 +10,18 @@ Bu dosya:
 import ee
 import os
 
+from app.services import ee_backend
+
 
 _DEFAULT_EE_PROJECT = "sahiller-bizimle-temiz-481410"
 
+# "not_initialized" | "initialized" | "failed" | "fake" (reported by /health).
+_status = "not_initialized"
+
+
+def earth_engine_status() -> str:
+    return _status
+
 
 def initialize_earth_engine():
     """
@@ -26,13 +35,23 @@ def initialize_earth_engine():
     - Service Account veya ortam değişkeni kullanılabilir
     """
 
+    global _status
+
+    if ee_backend.fake() is not None:
+        # EE_BACKEND=fake: no credentials or network needed.
+        _status = "fake"
+        print("Earth Engine: using local fake backend (EE_BACKEND=fake).")
+        return
+
     project = (os.getenv("EE_PROJECT") or os.getenv("GOOGLE_CLOUD_PROJECT") or _DEFAULT_EE_PROJECT).strip()
 
     try:
         # Eğer EE zaten initialize edildiyse hata vermez
         ee.Initialize(project=project)
+        _status = "initialized"
         print(f"Earth Engine initialized successfully (project={project}).")
     except Exception as e:
+        _status = "failed"
         print("Earth Engine initialization failed.")
         print("Project:", project)
         print("Error:", e)
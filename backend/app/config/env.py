@@ -0,0 +1,27 @@
+"""
+Numeric settings from environment variables.
+
+A missing or unparsable value falls back to the default; parsed values are
+clamped to [minimum, maximum].
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+
+def env_int(name: str, default: int, minimum: int = 0, maximum: Optional[int] = None) -> int:
+    try:
+        value = max(minimum, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+    return value if maximum is None else min(maximum, value)
+
+
+def env_float(name: str, default: float, minimum: float = 0.0, maximum: Optional[float] = None) -> float:
+    try:
+        value = max(minimum, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+    return value if maximum is None else min(maximum, value)
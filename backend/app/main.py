@@ -9,6 +9,8 @@ Bu dosya:
 
 import asyncio
 import importlib.metadata as _importlib_metadata
+import json
+import logging
 import os
 from pathlib import Path
 
@@ -32,15 +34,20 @@ except Exception:
     # dotenv is optional; environment variables may be provided by the host.
     pass
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from app.config.ee import initialize_earth_engine
+from fastapi.responses import PlainTextResponse
+from app.config.ee import earth_engine_status, initialize_earth_engine
 from app.api.metrics import router as metrics_router
 from app.api.ai import router as ai_router
 from app.api.forms import router as forms_router
+from app.api.form_exports import router as form_exports_router
+from app.api.forms import _close_db as close_forms_db
 from app.api.forms import _init_db as init_forms_db
+from app.api.compression import CompressionMiddleware
+from app.api.static_assets import StaticAssets
 from app.services.daily_refresh_loop import daily_refresh_loop
+from app.services import beach_day_store, ee_executor, ee_priority, ee_resilience, openai_client, report_cache, telemetry, timing
 
 app = FastAPI(
     title="Sahiller Bizimle Temiz API",
@@ -68,13 +75,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for larger textual responses (COMPRESSION_MIN_BYTES); streams pass through.
+app.add_middleware(CompressionMiddleware)
+
+_timing_logger = logging.getLogger("uvicorn.error")
+
+
+def _timing_log_enabled() -> bool:
+    return os.getenv("TIMING_LOG_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+
+@app.middleware("http")
+async def request_timing(request: Request, call_next):
+    """Per-request stage breakdown: Server-Timing header + one JSON log line for API calls."""
+
+    timings = timing.start_request()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        stages = timings.close()
+        total_ms = timings.total_ms()
+        route = request.scope.get("route")
+        telemetry.HTTP_REQUEST_SECONDS.observe(
+            total_ms / 1000.0,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+        if _timing_log_enabled() and request.url.path.startswith("/api/"):
+            _timing_logger.info(
+                json.dumps(
+                    {
+                        "event": "request_timing",
+                        "method": request.method,
+                        "path": request.url.path,
+                        "status": status,
+                        "duration_ms": round(total_ms, 2),
+                        "stages": stages,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+
+    response.headers["Server-Timing"] = timing.server_timing_header(stages, total_ms)
+    return response
+
 @app.on_event("startup")
 async def startup_event():
     """
     Uygulama ayağa kalkarken bir kez çalışır.
     Earth Engine bağlantısını burada başlatıyoruz.
     """
-    initialize_earth_engine()
+    try:
+        initialize_earth_engine()
+    except Exception:
+        # Keep serving the site and forms; /health reports earth_engine="failed".
+        pass
+
+    # One pooled OpenAI client for the app's lifetime.
+    await openai_client.startup()
 
     # Ensure local DB tables exist for form submissions.
     # (APIRouter startup hooks may not run in every hosting setup.)
@@ -93,9 +154,17 @@ async def startup_event():
         revise_days = 5
     asyncio.create_task(daily_refresh_loop(days=days, revise_days=revise_days))
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Drop queued EE work; running getInfo calls finish on their own.
+    ee_executor.shutdown()
+    await openai_client.shutdown()
+    close_forms_db()
+
 app.include_router(metrics_router)
 app.include_router(ai_router)
 app.include_router(forms_router)
+app.include_router(form_exports_router)
 
 @app.get("/health")
 def health_check():
@@ -103,33 +172,51 @@ def health_check():
     Basit sağlık kontrolü.
     Frontend ve deploy testleri için kullanılır.
     """
+    ee_state = earth_engine_status()
+    if ee_state in {"initialized", "fake"} and ee_resilience.breaker().state == ee_resilience.CircuitBreaker.OPEN:
+        ee_state = "unavailable"
+    store_state = beach_day_store.status()
+
     return {
-        "status": "ok",
+        "status": "ok" if ee_state in {"initialized", "fake"} and store_state != "error" else "degraded",
         "service": "backend",
-        "earth_engine": "initialized"
+        "earth_engine": ee_state,
+        "earth_engine_circuit": ee_resilience.breaker().state,
+        "store": store_state,
+        "ee_queue": ee_priority.queue_depths(),
+        "ai_report_cache": report_cache.stats(),
     }
 
+
+@app.get("/metrics")
+def prometheus_metrics(request: Request):
+    """Prometheus text-format metrics. Protected by METRICS_TOKEN (Bearer) when set."""
+
+    expected = (os.getenv("METRICS_TOKEN") or "").strip()
+    if expected and request.headers.get("authorization", "").strip() != f"Bearer {expected}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return PlainTextResponse(telemetry.render(), media_type="text/plain; version=0.0.4")
+
 # In Cloud Run we can serve the built frontend from backend/static (copied by Dockerfile).
 # IMPORTANT: add this AFTER /api routes, otherwise it would intercept them.
 _static_dir = Path(__file__).resolve().parents[1] / "static"
 _index_html = _static_dir / "index.html"
 if _static_dir.exists() and _index_html.exists():
+    # Files are indexed once at startup; only indexed paths can be served.
+    _static_assets = StaticAssets(_static_dir)
+
+    @app.on_event("startup")
+    def _index_static_assets() -> None:
+        _static_assets.build()
+
     @app.get("/")
-    def web_index():
-        return FileResponse(str(_index_html))
+    def web_index(request: Request):
+        return _static_assets.index_response(request.headers.get("accept-encoding", ""))
 
-    # SPA + static file handler: serve file if it exists, otherwise fallback to index.html
+    # SPA + static file handler: serve file if it is indexed, otherwise fallback to index.html
     @app.get("/{full_path:path}")
-    def web_fallback(full_path: str):
+    def web_fallback(full_path: str, request: Request):
         if full_path.startswith("api/") or full_path == "api":
             raise HTTPException(status_code=404, detail="Not Found")
 
-        candidate = (_static_dir / full_path).resolve()
-        # Prevent path traversal
-        if _static_dir not in candidate.parents and candidate != _static_dir:
-            raise HTTPException(status_code=404, detail="Not Found")
-
-        if candidate.exists() and candidate.is_file():
-            return FileResponse(str(candidate))
-
-        return FileResponse(str(_index_html))
+        return _static_assets.response(full_path, request.headers.get("accept-encoding", ""))
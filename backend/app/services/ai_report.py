@@ -0,0 +1,455 @@
+"""
+AI beach reports: prompt, OpenAI Responses API calls and daily pre-generation.
+
+The HTTP endpoints live in `api/ai.py`. During the daily refresh
+`pregenerate_all` builds each beach's report payload from the stored
+snapshot, generates the reports in a bounded concurrent batch and stores them
+on that day's document ("ai_report"), so visitors get a store read instead of
+a model call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config.env import env_float, env_int
+from app.data.beaches import BEACHES
+from app.services import beach_day_store, openai_client, report_cache, telemetry
+from app.services.ee_executor import default_timeout_s, run_ee
+from app.services.timeseries import get_beach_summary
+
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class OpenAIError(Exception):
+    """OpenAI could not be reached or answered with an error."""
+
+
+class OpenAIBusy(OpenAIError):
+    """Too many OpenAI calls queued, or no slot freed up within the queue timeout."""
+
+
+def configured_api_key() -> Optional[str]:
+    return os.getenv("OPENAI_API_KEY") or None
+
+
+# Bump when the prompts change so cached reports are not reused across versions.
+PROMPT_VERSION = "1"
+
+_SYSTEM_PROMPT = """
+            Sen bir çevresel veri analisti ve seyahat yazarı gibisin.
+            Görevin: verilen sahil verilerine dayanarak KISA, DOĞAL ve
+            birbirinden FARKLI metinler üretmek.
+
+            ZORUNLU KURALLAR:
+            - Sadece verilen verileri kullan.
+            - Veri yoksa açıkça belirt.
+            - Sayı uydurma, sebep uydurma.
+            - Aynı sahil için yazıların dili tekrar etmemeli.
+            - Aynı öneri kalıplarını tekrar etme (örn: "sabah daha uygun").
+
+            STİL:
+            - İnsan yazmış gibi, akıcı Türkçe
+            - Teknik terimleri sadeleştir ama yok etme
+            - Her raporda vurgu farklı olsun (bazen rüzgâr, bazen su, bazen konfor)
+
+            ÇIKIŞ:
+            - 3–5 cümle
+            - Son cümle: tek, net, özgül bir öneri
+            """
+
+
+def _user_prompt(beach: Dict[str, Any]) -> str:
+    return (
+        "Aşağıdaki sahil verilerini analiz et ve turistler için 3-5 cümlelik kısa bir rapor yaz. "
+        "Yüzme/güneşlenme için uygunluk, su kalitesi, hava kalitesi ve sıcaklığa odaklan. "
+        "Son cümlede 1 net öneri ver (örn. ‘Sabah saatleri daha uygun’).\n\n"
+        f"DATA: {beach}"
+    )
+
+
+def configured_model() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+
+def _responses_url() -> str:
+    # OpenAI Responses API (OPENAI_BASE_URL points at a compatible server, e.g. a local stub).
+    base_url = (os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").strip().rstrip("/")
+    return f"{base_url}/responses"
+
+
+def _request_body(model: str, beach: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "model": model,
+        "input": [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": _user_prompt(beach)},
+        ],
+        "temperature": 0.4,
+        "max_output_tokens": 220,
+    }
+
+
+def _auth_headers(api_key: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+
+
+def _extract_text(data: Dict[str, Any]) -> str:
+    # Response shape: output_text is usually present; fallback to parsing output blocks.
+    text = data.get("output_text")
+    if not text:
+        output = data.get("output") or []
+        chunks: list[str] = []
+        for item in output:
+            for c in item.get("content", []) or []:
+                if c.get("type") in ("output_text", "text"):
+                    chunks.append(c.get("text") or "")
+        text = "\n".join([c for c in chunks if c]).strip()
+    return text or ""
+
+
+async def generate(beach: Dict[str, Any], *, api_key: str, model: str) -> str:
+    """Ask OpenAI for a report; returns "" if the response had no text."""
+
+    headers = _auth_headers(api_key)
+
+    # Shared pooled client (keep-alive, HTTP/2 when available); see services/openai_client.py.
+    client = openai_client.get_client()
+    try:
+        resp = await client.post(_responses_url(), headers=headers, json=_request_body(model, beach))
+    except httpx.RequestError as e:
+        raise OpenAIError(f"OpenAI request failed: {e}")
+
+    if resp.status_code >= 400:
+        raise OpenAIError(f"OpenAI error {resp.status_code}: {resp.text}")
+
+    try:
+        payload = resp.json()
+    except ValueError:
+        raise OpenAIError(f"OpenAI returned invalid JSON: {resp.text[:200]}") from None
+    return _extract_text(payload)
+
+
+async def stream(beach: Dict[str, Any], *, api_key: str, model: str) -> AsyncIterator[str]:
+    """Yield report text deltas from the streaming Responses API.
+
+    Raises OpenAIError on transport errors, HTTP errors, malformed events and
+    error events.
+    """
+
+    body = {**_request_body(model, beach), "stream": True}
+    client = openai_client.get_client()
+    try:
+        async with client.stream("POST", _responses_url(), headers=_auth_headers(api_key), json=body) as resp:
+            if resp.status_code >= 400:
+                detail = (await resp.aread()).decode("utf-8", "replace")
+                raise OpenAIError(f"OpenAI error {resp.status_code}: {detail}")
+
+            # SSE: we only need the "data:" lines; each carries its event type.
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if not data or data == "[DONE]":
+                    continue
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    raise OpenAIError(f"OpenAI stream sent invalid JSON: {data[:200]}") from None
+                if not isinstance(event, dict):
+                    continue
+                kind = event.get("type")
+                if kind == "response.output_text.delta":
+                    delta = event.get("delta") or ""
+                    if delta:
+                        yield delta
+                elif kind in ("error", "response.failed"):
+                    error = event.get("error") or (event.get("response") or {}).get("error") or {}
+                    raise OpenAIError(f"OpenAI stream error: {error.get('message') or event.get('message') or kind}")
+    except httpx.RequestError as e:
+        raise OpenAIError(f"OpenAI request failed: {e}")
+
+
+def cache_key(beach: Dict[str, Any], model: str) -> str:
+    return report_cache.cache_key(beach, model=model, prompt_version=PROMPT_VERSION)
+
+
+# ---------------------------------------------------------------------------
+# Concurrency limit and request coalescing
+# ---------------------------------------------------------------------------
+
+
+class _Limiter:
+    """Global cap on in-flight OpenAI calls with a bounded, timed wait queue."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._capacity = 0
+        self.running = 0
+        self.waiting = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one loop; rebuild if the app runs on a new one.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._sem is None:
+            self._loop = loop
+            self._capacity = env_int("OPENAI_MAX_INFLIGHT", 8, minimum=1)
+            self._sem = asyncio.Semaphore(self._capacity)
+            self.running = 0
+            self.waiting = 0
+        return self._sem
+
+    def queue_full(self) -> bool:
+        self._semaphore()
+        # `waiting` covers callers that have not reached the semaphore yet too.
+        return self.running + self.waiting >= self._capacity + env_int("OPENAI_MAX_QUEUE", 32, minimum=0)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        sem = self._semaphore()
+        if self.queue_full():
+            raise OpenAIBusy("Too many AI report requests queued; try again shortly")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(sem.acquire(), timeout=env_float("OPENAI_QUEUE_TIMEOUT_S", 10.0))
+        except asyncio.TimeoutError:
+            raise OpenAIBusy("Timed out waiting for an AI report slot; try again shortly") from None
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            sem.release()
+
+
+_limiter = _Limiter()
+
+
+def limiter() -> _Limiter:
+    return _limiter
+
+
+_inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+
+def _forget(key: str, task: "asyncio.Future[str]") -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark the exception retrieved even if every waiter went away.
+    if not task.cancelled():
+        task.exception()
+
+
+async def generate_coalesced(key: str, beach: Dict[str, Any], *, api_key: str, model: str) -> str:
+    """`generate`, deduplicated by cache key and bounded by the global limiter.
+
+    Concurrent requests for the same payload share one upstream call. Raises
+    OpenAIBusy when the wait queue is full or the wait times out.
+    """
+
+    task = _inflight.get(key)
+    if task is not None:
+        OPENAI_COALESCED.inc()
+    else:
+        async def _run() -> str:
+            async with _limiter.slot():
+                return await generate(beach, api_key=api_key, model=model)
+
+        task = asyncio.ensure_future(_run())
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _forget(key, t))
+
+    # A disconnecting client must not cancel the call others are waiting on.
+    return await asyncio.shield(task)
+
+
+def _collect_openai_calls() -> Dict[Tuple[str, ...], float]:
+    return {("running",): float(_limiter.running), ("queued",): float(_limiter.waiting)}
+
+
+telemetry.register(
+    telemetry.Gauge("openai_calls", "OpenAI calls by state (running / queued).", ["state"], _collect_openai_calls)
+)
+OPENAI_COALESCED = telemetry.register(
+    telemetry.Counter("openai_coalesced_total", "AI report requests that joined an identical in-flight call.")
+)
+
+
+# ---------------------------------------------------------------------------
+# Daily pre-generation
+# ---------------------------------------------------------------------------
+
+# Days of data behind a report; the pre-generated, stored report uses this window.
+REPORT_DAYS = 7
+
+_PAYLOAD_FIELDS = ("sst_celsius", "turbidity_ndti", "chlorophyll", "no2_mol_m2", "air_quality", "wqi", "waste_risk_percent")
+
+
+def pregenerate_enabled() -> bool:
+    return os.getenv("AI_PREGENERATE_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _mean(values: List[Any], digits: Optional[int]) -> Optional[float]:
+    nums = [v for v in values if isinstance(v, (int, float))]
+    if not nums:
+        return None
+    m = sum(nums) / len(nums)
+    return m if digits is None else round(m, digits)
+
+
+def _payload_from_rows(beach_id: str, series: List[Dict[str, Any]]) -> Dict[str, Any]:
+    beach = BEACHES[beach_id]
+    latest = series[-1]
+    return {
+        "id": beach_id,
+        "name": beach["name"],
+        "date": latest.get("date"),
+        "latest": {f: latest.get(f) for f in _PAYLOAD_FIELDS},
+        "averages": {
+            "days": len(series),
+            "sst_celsius": _mean([r.get("sst_celsius") for r in series], 2),
+            "wqi": _mean([r.get("wqi") for r in series], 1),
+            "no2_mol_m2": _mean([r.get("no2_mol_m2") for r in series], None),
+            "waste_risk_percent": _mean([r.get("waste_risk_percent") for r in series], 1),
+        },
+    }
+
+
+def report_payload(beach_id: str, as_of_day: date, days: int = REPORT_DAYS) -> Optional[Dict[str, Any]]:
+    """Report input for a beach built from its stored daily snapshot (None if nothing is stored)."""
+
+    if not beach_day_store.enabled():
+        return None
+    day_list = [(as_of_day - timedelta(days=days - 1 - i)).isoformat() for i in range(days)]
+    series = [d for d in beach_day_store.get_days(beach_id, day_list) if d is not None]
+    if not series:
+        return None
+    return _payload_from_rows(beach_id, series)
+
+
+def computed_payload(beach_id: str, as_of_day: date, days: int = REPORT_DAYS) -> Dict[str, Any]:
+    """Same report input computed from Earth Engine (store disabled or the days not stored yet)."""
+
+    series = get_beach_summary(beach_id, days=days, end_day=as_of_day)["series"]
+    return _payload_from_rows(beach_id, series)
+
+
+def stored_report(beach_id: str, day: str) -> Optional[Dict[str, Any]]:
+    """The report stored on a day document: {"key", "report", "model", ...} or None."""
+
+    doc = beach_day_store.get_day(beach_id, day)
+    report = (doc or {}).get("ai_report")
+    return report if isinstance(report, dict) and report.get("report") else None
+
+
+def store_report(beach_id: str, day: str, key: str, text: str, model: str) -> None:
+    beach_day_store.upsert_day(
+        beach_id,
+        day,
+        {
+            "ai_report": {
+                "key": key,
+                "report": text,
+                "model": model,
+                "prompt_version": PROMPT_VERSION,
+                "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            }
+        },
+    )
+
+
+async def report_for_beach(
+    beach_id: str,
+    as_of_day: date,
+    *,
+    days: int = REPORT_DAYS,
+    api_key: str,
+    model: str,
+    compute_missing: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """Report for the beach's last `days` days, generating it if needed.
+
+    Built from the stored daily snapshot when there is one; only the default
+    window's report is stored on the day document. Without stored days (store
+    disabled, refresh not run yet) the input is computed on Earth Engine
+    instead, unless `compute_missing` is False, and the report is kept in the
+    report cache only.
+
+    Returns {"report", "cached", "key"}; None if nothing is stored and
+    `compute_missing` is False.
+    """
+
+    payload = await asyncio.to_thread(report_payload, beach_id, as_of_day, days)
+    store = payload is not None and days == REPORT_DAYS
+    if payload is None:
+        if not compute_missing:
+            return None
+        payload = await run_ee(computed_payload, beach_id, as_of_day, days, timeout_s=default_timeout_s())
+    key = cache_key(payload, model)
+    day = as_of_day.isoformat()
+
+    cached = await report_cache.get(key, record=False)
+    if cached is not None:
+        report_cache.record_lookup(True)
+        return {"report": cached, "cached": True, "key": key}
+
+    stored = await asyncio.to_thread(stored_report, beach_id, day) if store else None
+    hit = stored is not None and stored.get("key") == key
+    report_cache.record_lookup(hit)
+    if hit:
+        await report_cache.put(key, stored["report"])
+        return {"report": stored["report"], "cached": True, "key": key}
+
+    text = await generate_coalesced(key, payload, api_key=api_key, model=model)
+    if text:
+        if store:
+            await asyncio.to_thread(store_report, beach_id, day, key, text, model)
+        await report_cache.put(key, text)
+    return {"report": text, "cached": False, "key": key}
+
+
+async def pregenerate_all(as_of_day: date) -> Dict[str, int]:
+    """Generate (or confirm) the day's report for every beach; returns outcome counts."""
+
+    api_key = configured_api_key()
+    if not pregenerate_enabled() or not api_key or not beach_day_store.enabled():
+        return {"skipped": len(BEACHES)}
+
+    model = configured_model()
+    semaphore = asyncio.Semaphore(env_int("AI_PREGENERATE_CONCURRENCY", 4, minimum=1))
+
+    async def _one(beach_id: str) -> str:
+        async with semaphore:
+            result = await report_for_beach(beach_id, as_of_day, api_key=api_key, model=model, compute_missing=False)
+        if result is None:
+            return "no_data"
+        if result["cached"]:
+            return "unchanged"
+        return "generated" if result["report"] else "empty"
+
+    outcomes: Dict[str, int] = {}
+    results = await asyncio.gather(*[_one(b) for b in BEACHES], return_exceptions=True)
+    for beach_id, r in zip(BEACHES, results):
+        if isinstance(r, BaseException):
+            logger.warning("AI report pre-generation failed beach_id=%s: %s", beach_id, r)
+            r = "error"
+        outcomes[r] = outcomes.get(r, 0) + 1
+    logger.info("AI report pre-generation for %s: %s", as_of_day.isoformat(), outcomes)
+    return outcomes
@@ -1,6 +1,9 @@
 import ee
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Optional
+from app.services import ee_backend
+from app.services.ee_calls import EECallError, get_info
 from app.utils.geo import get_beach_buffer
 
 import os
@@ -24,13 +27,8 @@ def _fmt_ymd(dt: datetime) -> str:
     return dt.strftime("%Y-%m-%d")
 
 
-def _no2_mean_for_range(
-    dataset_id: str,
-    band: str,
-    geometry: ee.Geometry,
-    start_date: str,
-    end_date: str,
-) -> Optional[float]:
+def _query_no2(dataset_id: str, band: str, beach_id: str, start_date: str, end_date: str) -> Optional[dict]:
+    geometry = get_beach_buffer(beach_id, buffer_m=3000)
     collection = (
         ee.ImageCollection(dataset_id)
         .select(band)
@@ -39,8 +37,10 @@ def _no2_mean_for_range(
     )
 
     try:
-        if collection.size().getInfo() == 0:
+        if get_info(collection.size(), dataset="S5P") == 0:
             return None
+    except EECallError:
+        raise
     except Exception:
         return None
 
@@ -53,20 +53,40 @@ def _no2_mean_for_range(
     )
 
     try:
-        v = stats.get(band).getInfo()
+        return {band: get_info(stats.get(band), dataset="S5P")}
+    except EECallError:
+        raise
     except Exception:
         return None
 
+
+def _no2_mean_for_range(
+    dataset_id: str,
+    band: str,
+    beach_id: str,
+    start_date: str,
+    end_date: str,
+) -> Optional[float]:
+    stats = ee_backend.region_stats(
+        "S5P", dataset_id, beach_id, start_date, end_date, [band],
+        query=partial(_query_no2, dataset_id, band, beach_id, start_date, end_date),
+    )
+    v = None if stats is None else stats.get(band)
     return None if v is None else float(v)
 
 
+# NO2 column density (mol/m²) class limits: below GOOD is "good", below MODERATE "moderate".
+NO2_GOOD_BELOW = 0.00003
+NO2_MODERATE_BELOW = 0.00006
+
+
 def classify_no2(no2_value: Optional[float]) -> str:
     if no2_value is None:
         return "unknown"
 
-    if no2_value < 0.00003:
+    if no2_value < NO2_GOOD_BELOW:
         return "good"
-    elif no2_value < 0.00006:
+    elif no2_value < NO2_MODERATE_BELOW:
         return "moderate"
     return "poor"
 
@@ -83,12 +103,10 @@ def get_air_quality_for_beach(beach_id: str, days: int = 7) -> dict:
 
 
 def get_air_quality_for_beach_in_range(beach_id: str, start_date: str, end_date: str) -> dict:
-    geometry = get_beach_buffer(beach_id, buffer_m=3000)
-
     # Try OFFL first (more stable), then NRTI (lower latency) if enabled.
-    no2 = _no2_mean_for_range(_NO2_OFFL_COLLECTION, _NO2_OFFL_BAND, geometry, start_date, end_date)
+    no2 = _no2_mean_for_range(_NO2_OFFL_COLLECTION, _NO2_OFFL_BAND, beach_id, start_date, end_date)
     if no2 is None and _FILL_GAPS_ENABLED:
-        no2 = _no2_mean_for_range(_NO2_NRTI_COLLECTION, _NO2_NRTI_BAND, geometry, start_date, end_date)
+        no2 = _no2_mean_for_range(_NO2_NRTI_COLLECTION, _NO2_NRTI_BAND, beach_id, start_date, end_date)
 
     # If still missing and we're on a narrow daily window, widen by ±1 day once.
     if no2 is None and _FILL_GAPS_ENABLED:
@@ -101,9 +119,9 @@ def get_air_quality_for_beach_in_range(beach_id: str, start_date: str, end_date:
         if start is not None and end is not None and (end - start) <= timedelta(days=1):
             widened_start = _fmt_ymd(start - timedelta(days=1))
             widened_end = _fmt_ymd(end + timedelta(days=1))
-            no2 = _no2_mean_for_range(_NO2_NRTI_COLLECTION, _NO2_NRTI_BAND, geometry, widened_start, widened_end)
+            no2 = _no2_mean_for_range(_NO2_NRTI_COLLECTION, _NO2_NRTI_BAND, beach_id, widened_start, widened_end)
             if no2 is None:
-                no2 = _no2_mean_for_range(_NO2_OFFL_COLLECTION, _NO2_OFFL_BAND, geometry, widened_start, widened_end)
+                no2 = _no2_mean_for_range(_NO2_OFFL_COLLECTION, _NO2_OFFL_BAND, beach_id, widened_start, widened_end)
 
     return {
         "no2": no2,
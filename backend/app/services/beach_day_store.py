@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from google.cloud import firestore
 
+from app.services import memory_firestore, telemetry
+from app.services.timing import stage
+
 
 def _enabled() -> bool:
     return os.getenv("FIRESTORE_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
@@ -19,6 +24,10 @@ def _collection_name() -> str:
     return os.getenv("FIRESTORE_COLLECTION", "beach_day_metrics").strip() or "beach_day_metrics"
 
 
+def _lease_collection_name() -> str:
+    return os.getenv("FIRESTORE_LEASE_COLLECTION", "refresh_leases").strip() or "refresh_leases"
+
+
 def _project() -> Optional[str]:
     p = os.getenv("EE_PROJECT") or os.getenv("GOOGLE_CLOUD_PROJECT") or os.getenv("GCP_PROJECT")
     return p.strip() if isinstance(p, str) and p.strip() else None
@@ -32,11 +41,53 @@ def _get_client() -> firestore.Client:
     if _client is not None:
         return _client
 
+    if memory_firestore.selected():
+        _client = memory_firestore.shared()
+        return _client
+
     project = _project()
     _client = firestore.Client(project=project) if project else firestore.Client()
     return _client
 
 
+def client() -> firestore.Client:
+    """The shared Firestore client (also used by other small collections, e.g. the AI report cache)."""
+
+    return _get_client()
+
+
+def use_client(client) -> None:
+    """Install a client (e.g. `memory_firestore.Client()`); None reverts to the default."""
+
+    global _client
+    _client = client
+
+
+# Outcome of the last store operation, for /health ("unknown" until first use).
+_last_status = "unknown"
+
+
+def status() -> str:
+    return "disabled" if not _enabled() else _last_status
+
+
+@contextmanager
+def _op(kind: str, docs: int = 1) -> Iterator[None]:
+    """Time a store round-trip and record it in telemetry."""
+
+    global _last_status
+    with stage(f"store_{kind}"):
+        try:
+            yield
+        except Exception:
+            _last_status = "error"
+            telemetry.STORE_OPERATIONS.inc(op=kind, outcome="error")
+            raise
+    _last_status = "ok"
+    telemetry.STORE_OPERATIONS.inc(op=kind, outcome="ok")
+    telemetry.STORE_DOCUMENTS.inc(docs, op=kind)
+
+
 def _doc_id(beach_id: str, day: str) -> str:
     return f"{beach_id}:{day}"
 
@@ -45,7 +96,8 @@ def get_day(beach_id: str, day: str) -> Optional[Dict[str, Any]]:
     if not _enabled():
         return None
 
-    doc = _get_client().collection(_collection_name()).document(_doc_id(beach_id, day)).get()
+    with _op("read"):
+        doc = _get_client().collection(_collection_name()).document(_doc_id(beach_id, day)).get()
     if not doc.exists:
         return None
     data = doc.to_dict() or {}
@@ -61,16 +113,157 @@ def upsert_day(beach_id: str, day: str, payload: Dict[str, Any]) -> None:
 
     now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
     doc_ref = _get_client().collection(_collection_name()).document(_doc_id(beach_id, day))
-    doc_ref.set(
-        {
-            **payload,
-            "beach_id": beach_id,
-            "date": day,
-            "updated_at": now,
-        },
-        merge=True,
-    )
+    with _op("write"):
+        doc_ref.set(
+            {
+                **payload,
+                "beach_id": beach_id,
+                "date": day,
+                "updated_at": now,
+            },
+            merge=True,
+        )
 
 
 def get_days(beach_id: str, days: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
-    return [get_day(beach_id, d) for d in days]
+    day_list = list(days)
+    if not _enabled() or not day_list:
+        return [None for _ in day_list]
+
+    # One batched read instead of a round-trip per day.
+    collection = _get_client().collection(_collection_name())
+    refs = [collection.document(_doc_id(beach_id, d)) for d in day_list]
+    by_id: Dict[str, Dict[str, Any]] = {}
+    with _op("read", docs=len(refs)):
+        for doc in _get_client().get_all(refs):
+            if doc.exists:
+                by_id[doc.id] = doc.to_dict() or {}
+
+    out: List[Optional[Dict[str, Any]]] = []
+    for d in day_list:
+        data = by_id.get(_doc_id(beach_id, d))
+        if data is not None:
+            data.setdefault("beach_id", beach_id)
+            data.setdefault("date", d)
+        out.append(data)
+    return out
+
+
+# Firestore limits a write batch to 500 operations.
+_MAX_BATCH_WRITES = 500
+
+
+def upsert_days(beach_id: str, rows: Dict[str, Dict[str, Any]]) -> None:
+    """Upsert many day documents (day -> payload) using batched writes."""
+
+    if not _enabled() or not rows:
+        return
+
+    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    client = _get_client()
+    collection = client.collection(_collection_name())
+    items = list(rows.items())
+    for i in range(0, len(items), _MAX_BATCH_WRITES):
+        batch = client.batch()
+        for day, payload in items[i : i + _MAX_BATCH_WRITES]:
+            batch.set(
+                collection.document(_doc_id(beach_id, day)),
+                {
+                    **payload,
+                    "beach_id": beach_id,
+                    "date": day,
+                    "updated_at": now,
+                },
+                merge=True,
+            )
+        with _op("write", docs=len(items[i : i + _MAX_BATCH_WRITES])):
+            batch.commit()
+
+
+def _now_iso(now: datetime) -> str:
+    return now.isoformat().replace("+00:00", "Z")
+
+
+def _run_transaction(client: Any, fn: Any) -> Any:
+    if isinstance(client, memory_firestore.Client):
+        with client.transaction() as transaction:
+            return fn(transaction)
+    return firestore.transactional(fn)(client.transaction())
+
+
+def acquire_lease(name: str, holder: str, ttl_s: float) -> Optional[str]:
+    """Try to take (or renew) a named lease in Firestore; returns its token.
+
+    Returns None if another holder owns an unexpired lease, or if the lease
+    was already marked completed. Runs in a transaction so only one instance
+    wins a race.
+    """
+
+    if not _enabled():
+        return None
+
+    client = _get_client()
+    ref = client.collection(_lease_collection_name()).document(name)
+
+    def _take(transaction: firestore.Transaction) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        snap = ref.get(transaction=transaction)
+        if snap.exists:
+            data = snap.to_dict() or {}
+            if data.get("completed"):
+                return None
+            expires_at = data.get("expires_at")
+            try:
+                expires = datetime.fromisoformat(str(expires_at).replace("Z", "+00:00"))
+            except ValueError:
+                expires = now
+            if data.get("holder") != holder and expires > now:
+                return None
+
+        token = uuid.uuid4().hex
+        transaction.set(
+            ref,
+            {
+                "holder": holder,
+                "token": token,
+                "acquired_at": _now_iso(now),
+                "expires_at": _now_iso(now + timedelta(seconds=ttl_s)),
+                "completed": False,
+            },
+        )
+        return token
+
+    return _run_transaction(client, _take)
+
+
+def _update_own_lease(name: str, holder: str, token: str, fields: Dict[str, Any]) -> bool:
+    # Only the current holder may touch the lease: after expiry another instance may own it.
+    if not _enabled():
+        return False
+
+    client = _get_client()
+    ref = client.collection(_lease_collection_name()).document(name)
+
+    def _update(transaction: firestore.Transaction) -> bool:
+        snap = ref.get(transaction=transaction)
+        data = (snap.to_dict() or {}) if snap.exists else {}
+        if data.get("holder") != holder or data.get("token") != token or data.get("completed"):
+            return False
+        transaction.set(ref, fields, merge=True)
+        return True
+
+    return _run_transaction(client, _update)
+
+
+def complete_lease(name: str, holder: str, token: str) -> bool:
+    """Mark a lease as done so no other instance repeats the work."""
+
+    now = datetime.now(timezone.utc)
+    return _update_own_lease(name, holder, token, {"completed": True, "completed_at": _now_iso(now)})
+
+
+def release_lease(name: str, holder: str, token: str) -> bool:
+    """Expire an unfinished lease now and record the failure, so it can be retaken."""
+
+    now = datetime.now(timezone.utc)
+    return _update_own_lease(name, holder, token, {"expires_at": _now_iso(now), "failed_at": _now_iso(now)})
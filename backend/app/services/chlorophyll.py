@@ -1,19 +1,25 @@
 import ee
 from datetime import datetime, timedelta
+from functools import partial
+from app.services import ee_backend
+from app.services.ee_calls import get_info
 from app.utils.geo import get_beach_buffer
 
 
-def get_chlorophyll_for_beach_in_range(beach_id: str, start_date: str, end_date: str) -> float:
+OLCI_COLLECTION = "COPERNICUS/S3/OLCI"
+
+
+def _query_chlorophyll(beach_id: str, start_date: str, end_date: str):
     geometry = get_beach_buffer(beach_id)
 
     collection = (
-        ee.ImageCollection("COPERNICUS/S3/OLCI")
+        ee.ImageCollection(OLCI_COLLECTION)
         .filterDate(start_date, end_date)
         .filterBounds(geometry)
         .select("Oa08_radiance")  # chlorophyll-related band
     )
 
-    if collection.size().getInfo() == 0:
+    if get_info(collection.size(), dataset="OLCI") == 0:
         return None
 
     image = collection.mean()
@@ -29,7 +35,15 @@ def get_chlorophyll_for_beach_in_range(beach_id: str, start_date: str, end_date:
     if value is None:
         return None
 
-    return ee.Number(value).getInfo()
+    return {"Oa08_radiance": get_info(ee.Number(value), dataset="OLCI")}
+
+
+def get_chlorophyll_for_beach_in_range(beach_id: str, start_date: str, end_date: str) -> float:
+    stats = ee_backend.region_stats(
+        "OLCI", OLCI_COLLECTION, beach_id, start_date, end_date, ["Oa08_radiance"],
+        query=partial(_query_chlorophyll, beach_id, start_date, end_date),
+    )
+    return None if stats is None else stats.get("Oa08_radiance")
 
 
 def get_chlorophyll_for_beach(beach_id: str, days: int = 7) -> float:
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
 from app.data.beaches import BEACHES
-from app.services import beach_day_store
+from app.services import beach_day_store, telemetry
 from app.services.timeseries import get_beach_summary
 
 
@@ -74,27 +75,50 @@ class RefreshResult:
     created_docs: int
 
 
-def refresh_beach(beach_id: str, *, as_of_day: date, days: int = 7, revise_days: int = 5) -> RefreshResult:
-    summary = get_beach_summary(beach_id=beach_id, days=max(days, revise_days), end_day=as_of_day)
-    series: List[Dict[str, Any]] = summary.get("series") or []
+def store_series(beach_id: str, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Merge computed rows into the day store with one batched read and write.
 
-    # Only consider the tail for revision.
-    tail = series[-revise_days:] if revise_days > 0 else []
+    Returns (created, updated) document counts.
+    """
+
+    if not rows:
+        return 0, 0
+
+    existing_docs = beach_day_store.get_days(beach_id, [row["date"] for row in rows])
 
-    updated = 0
     created = 0
+    updated = 0
+    writes: Dict[str, Dict[str, Any]] = {}
 
-    for row in tail:
-        day = row["date"]
-        existing = beach_day_store.get_day(beach_id, day)
+    for row, existing in zip(rows, existing_docs):
         merged, changed = merge_if_improved(existing, row)
-
         if existing is None:
             created += 1
-            beach_day_store.upsert_day(beach_id, day, merged)
+            writes[row["date"]] = merged
         elif changed:
             updated += 1
-            beach_day_store.upsert_day(beach_id, day, merged)
+            writes[row["date"]] = merged
+
+    beach_day_store.upsert_days(beach_id, writes)
+    return created, updated
+
+
+def refresh_beach(beach_id: str, *, as_of_day: date, days: int = 7, revise_days: int = 5) -> RefreshResult:
+    t0 = time.monotonic()
+    try:
+        return _refresh_beach(beach_id, as_of_day=as_of_day, days=days, revise_days=revise_days)
+    finally:
+        telemetry.REFRESH_SECONDS.observe(time.monotonic() - t0, job="beach")
+
+
+def _refresh_beach(beach_id: str, *, as_of_day: date, days: int, revise_days: int) -> RefreshResult:
+    summary = get_beach_summary(beach_id=beach_id, days=max(days, revise_days), end_day=as_of_day)
+    series: List[Dict[str, Any]] = summary.get("series") or []
+
+    # Only consider the tail for revision.
+    tail = series[-revise_days:] if revise_days > 0 else []
+
+    created, updated = store_series(beach_id, tail)
 
     return RefreshResult(
         beach_id=beach_id,
@@ -106,6 +130,7 @@ def refresh_beach(beach_id: str, *, as_of_day: date, days: int = 7, revise_days:
 
 
 def refresh_all(*, as_of_day: date, days: int = 7, revise_days: int = 5) -> List[RefreshResult]:
+    t0 = time.monotonic()
     results: List[RefreshResult] = []
     for beach_id in BEACHES.keys():
         try:
@@ -113,4 +138,5 @@ def refresh_all(*, as_of_day: date, days: int = 7, revise_days: int = 5) -> List
         except Exception:
             # Keep going if one beach fails.
             continue
+    telemetry.REFRESH_SECONDS.observe(time.monotonic() - t0, job="all")
     return results
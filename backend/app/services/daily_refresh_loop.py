@@ -1,17 +1,77 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import os
+import random
 from datetime import datetime, timezone
 
+from app.config.env import env_float
+from app.services import ai_report, ee_priority, refresh_lease
 from app.services.daily_refresh import refresh_all
+from app.services.ee_executor import run_ee
 from app.services.tr_time import next_tr_midnight_utc, tr_today
 
 
+logger = logging.getLogger("uvicorn.error")
+
+
 def _loop_enabled() -> bool:
     return os.getenv("DAILY_REFRESH_LOOP_ENABLED", "0").strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _jitter_s() -> float:
+    # Spread instances out so they don't all hit the lease/EE at TR midnight.
+    return random.uniform(0.0, env_float("REFRESH_JITTER_S", 60.0))
+
+
+def _lease_ttl_s() -> float:
+    return env_float("REFRESH_LEASE_TTL_S", 1800.0)
+
+
+def _retry_delay_s(failures: int) -> float:
+    # Exponential backoff after failed runs, never longer than the lease TTL.
+    base = env_float("REFRESH_RETRY_BASE_S", 30.0)
+    return min(_lease_ttl_s(), base * (2 ** (failures - 1))) + _jitter_s()
+
+
+async def _refresh_once(days: int, revise_days: int) -> bool:
+    """Refresh today's snapshot if this instance wins the day's lease.
+
+    Blocking work runs off the event loop: lease I/O in a worker thread, the
+    refresh itself on the bounded EE executor (no request deadline). A failed
+    refresh hands the lease back before re-raising, so the retry does not
+    wait for it to expire. AI reports are pre-generated after the lease is
+    completed, so OpenAI latency never holds it.
+    """
+
+    as_of = tr_today()
+    lease_name = f"daily-refresh:{as_of.isoformat()}"
+
+    token = await asyncio.to_thread(refresh_lease.acquire, lease_name, _lease_ttl_s())
+    if token is None:
+        return False
+
+    try:
+        await run_ee(
+            refresh_all,
+            as_of_day=as_of,
+            days=days,
+            revise_days=revise_days,
+            priority=ee_priority.REFRESH,
+        )
+    except BaseException:
+        await asyncio.to_thread(refresh_lease.release, lease_name, token)
+        raise
+
+    if not await asyncio.to_thread(refresh_lease.complete, lease_name, token):
+        logger.warning("Daily refresh lease %s expired before completion; another instance may repeat it", lease_name)
+
+    # Reports are built from the fresh snapshot, so visitors get a store read.
+    await ai_report.pregenerate_all(as_of)
+    return True
+
+
 async def daily_refresh_loop(days: int = 7, revise_days: int = 5) -> None:
     """Best-effort background loop.
 
@@ -22,19 +82,26 @@ async def daily_refresh_loop(days: int = 7, revise_days: int = 5) -> None:
     if not _loop_enabled():
         return
 
+    failures = 0
     while True:
         try:
-            # Small delay after startup.
-            await asyncio.sleep(0.5)
+            # Small jittered delay after startup / midnight.
+            await asyncio.sleep(0.5 + _jitter_s())
 
-            # Refresh immediately once.
-            refresh_all(as_of_day=tr_today(), days=days, revise_days=revise_days)
+            # Refresh once per TR day; other instances skip while the lease is held.
+            refreshed = await _refresh_once(days=days, revise_days=revise_days)
+            failures = 0
 
             # Sleep until next TR midnight.
             next_midnight = next_tr_midnight_utc(datetime.now(timezone.utc))
             sleep_s = max(0.0, (next_midnight - datetime.now(timezone.utc)).total_seconds())
+            if not refreshed:
+                # Re-check after the lease TTL in case the holder died mid-refresh.
+                sleep_s = min(sleep_s, _lease_ttl_s())
             await asyncio.sleep(sleep_s + 0.25)
         except asyncio.CancelledError:
             raise
         except Exception:
-            await asyncio.sleep(2.0)
+            failures += 1
+            logger.exception("Daily refresh failed (attempt %d)", failures)
+            await asyncio.sleep(_retry_delay_s(failures))
@@ -0,0 +1,278 @@
+"""
+Pluggable Earth Engine access layer.
+
+`EE_BACKEND=live` (default) uses the real Earth Engine API. `EE_BACKEND=fake`
+swaps in `FakeEEBackend`, a deterministic local stand-in that serves
+synthetic (or recorded) per-day values per dataset and beach, so the services,
+`get_beach_summary`, refresh and the endpoints run without credentials or
+network (tests, benchmarks, load tests).
+
+Services keep their fallback logic (OFFL -> NRTI, Sentinel-2 -> Landsat,
+widened windows) and fetch every region statistic through `region_stats`,
+handing it their live EE query; the fake answers the same question from its
+own data, so no service needs a branch of its own. Each fake query costs the
+same two round-trips as the live code (collection size, then reduceRegion) and
+goes through `ee_calls.get_info`, so priority, deadlines, timing and metrics
+behave as in production. The EE rate
+limiter is skipped: fake calls use no quota.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import time
+from datetime import date, timedelta
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.config.env import env_float
+from app.services.ee_calls import get_info
+
+
+def backend_name() -> str:
+    return (os.getenv("EE_BACKEND") or "live").strip().lower()
+
+
+# Per collection: probability that a day has a usable image, and per band the
+# (mean, seasonal amplitude, noise) of the synthetic signal, in the units the
+# live reduceRegion returns.
+_DATASET_PROFILES: Dict[str, Dict[str, Any]] = {
+    "NOAA/CDR/OISST/V2_1": {"coverage": 1.0, "bands": {"sst": (2300.0, 400.0, 40.0)}},
+    "COPERNICUS/S3/OLCI": {"coverage": 0.8, "bands": {"Oa08_radiance": (60.0, 20.0, 10.0)}},
+    "COPERNICUS/S2_SR_HARMONIZED": {
+        "coverage": 0.35,
+        "bands": {"NDTI": (0.02, 0.04, 0.03), "NDVI": (0.05, 0.08, 0.05), "MNDWI": (0.15, 0.1, 0.08)},
+    },
+    "LANDSAT/LC08/C02/T1_L2": {
+        "coverage": 0.2,
+        "bands": {"NDVI": (0.06, 0.08, 0.05), "MNDWI": (0.12, 0.1, 0.08)},
+    },
+    "COPERNICUS/S5P/OFFL/L3_NO2": {
+        "coverage": 0.85,
+        "bands": {"tropospheric_NO2_column_number_density": (3.5e-5, 1.0e-5, 0.8e-5)},
+    },
+    "COPERNICUS/S5P/NRTI/L3_NO2": {
+        "coverage": 0.9,
+        "bands": {"NO2_column_number_density": (3.6e-5, 1.0e-5, 0.9e-5)},
+    },
+}
+_DEFAULT_PROFILE: Dict[str, Any] = {"coverage": 0.5, "bands": {}}
+
+
+def _unit(*parts: str) -> float:
+    """Deterministic pseudo-random number in [0, 1) for the given key."""
+
+    digest = hashlib.sha256("|".join(parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / float(1 << 64)
+
+
+def _days(start_date: str, end_date: str) -> List[date]:
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)  # exclusive, like ee filterDate
+    return [start + timedelta(days=i) for i in range(max(0, (end - start).days))]
+
+
+class _FakeComputed:
+    """Stands in for an ee.ComputedObject; `getInfo` is one fake round-trip."""
+
+    # Not sent to EE, so `ee_calls` skips the rate limiter for it.
+    uses_ee_quota = False
+
+    def __init__(self, backend: "FakeEEBackend", dataset: str, fn: Callable[[], Any]) -> None:
+        self._backend = backend
+        self._dataset = dataset
+        self._fn = fn
+
+    def getInfo(self) -> Any:
+        return self._backend._round_trip(self._dataset, self._fn)
+
+
+class FakeEEBackend:
+    def __init__(
+        self,
+        *,
+        latency_s: float = 0.0,
+        missing_rate: float = 0.0,
+        missing: Optional[Callable[[str, str, date], bool]] = None,
+        recording: Optional[Dict[str, Any]] = None,
+        seed: str = "0",
+    ) -> None:
+        self.latency_s = latency_s
+        self.missing_rate = missing_rate
+        # missing(collection_id, beach_id, day) -> True forces "no image" that day.
+        self.missing = missing
+        # {collection_id: {band: {beach_id: {YYYY-MM-DD: value | null}}}}
+        self.recording = recording or {}
+        self.seed = seed
+        self._lock = Lock()
+        self._round_trips: Dict[str, int] = {}
+
+    # -- accounting -------------------------------------------------------
+
+    def _round_trip(self, dataset: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._round_trips[dataset] = self._round_trips.get(dataset, 0) + 1
+        if self.latency_s > 0:
+            time.sleep(self.latency_s)
+        return fn()
+
+    def round_trips(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._round_trips)
+
+    def total_round_trips(self) -> int:
+        with self._lock:
+            return sum(self._round_trips.values())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._round_trips.clear()
+
+    # -- data -------------------------------------------------------------
+
+    def _recorded(self, collection_id: str, band: str, beach_id: str, day: date) -> Tuple[bool, Optional[float]]:
+        by_beach = ((self.recording.get(collection_id) or {}).get(band) or {}).get(beach_id) or {}
+        key = day.isoformat()
+        if key in by_beach:
+            v = by_beach[key]
+            return True, None if v is None else float(v)
+        return False, None
+
+    def _has_image(self, collection_id: str, beach_id: str, day: date) -> bool:
+        if self.missing is not None and self.missing(collection_id, beach_id, day):
+            return False
+        coverage = (_DATASET_PROFILES.get(collection_id) or _DEFAULT_PROFILE)["coverage"]
+        coverage *= max(0.0, 1.0 - self.missing_rate)
+        return _unit(self.seed, "cov", collection_id, beach_id, day.isoformat()) < coverage
+
+    def _value(self, collection_id: str, band: str, beach_id: str, day: date) -> Optional[float]:
+        found, v = self._recorded(collection_id, band, beach_id, day)
+        if found:
+            return v
+        params = ((_DATASET_PROFILES.get(collection_id) or _DEFAULT_PROFILE)["bands"]).get(band)
+        if params is None:
+            return None
+        mean, amplitude, noise = params
+        season = math.sin(2.0 * math.pi * (day.timetuple().tm_yday - 105) / 365.25)
+        jitter = _unit(self.seed, "val", collection_id, band, beach_id, day.isoformat()) * 2.0 - 1.0
+        return mean + amplitude * season + noise * jitter
+
+    def _image_days(self, collection_id: str, beach_id: str, start_date: str, end_date: str) -> List[date]:
+        return [d for d in _days(start_date, end_date) if self._has_image(collection_id, beach_id, d)]
+
+    def region_stats(
+        self,
+        dataset: str,
+        collection_id: str,
+        beach_id: str,
+        start_date: str,
+        end_date: str,
+        bands: Sequence[str],
+        query: Optional[Callable[[], Any]] = None,
+    ) -> Optional[Dict[str, Optional[float]]]:
+        """Mean of each band over the days with images; None if the collection is empty.
+
+        Mirrors the live pattern: `collection.size().getInfo()` then
+        `reduceRegion(...).getInfo()`. `query` (the live EE version) is unused.
+        """
+
+        image_days = self._image_days(collection_id, beach_id, start_date, end_date)
+        size = get_info(_FakeComputed(self, dataset, lambda: len(image_days)), dataset=dataset)
+        if size == 0:
+            return None
+
+        def _reduce() -> Dict[str, Optional[float]]:
+            out: Dict[str, Optional[float]] = {}
+            for band in bands:
+                vals = [v for v in (self._value(collection_id, band, beach_id, d) for d in image_days) if v is not None]
+                out[band] = None if not vals else sum(vals) / len(vals)
+            return out
+
+        return get_info(_FakeComputed(self, dataset, _reduce), dataset=dataset)
+
+
+class LiveEEBackend:
+    """Live Earth Engine: runs the query the service built."""
+
+    def region_stats(
+        self,
+        dataset: str,
+        collection_id: str,
+        beach_id: str,
+        start_date: str,
+        end_date: str,
+        bands: Sequence[str],
+        query: Optional[Callable[[], Any]] = None,
+    ) -> Optional[Dict[str, Optional[float]]]:
+        if query is None:
+            raise ValueError(f"No live EE query given for {dataset}")
+        return query()
+
+
+_LIVE = LiveEEBackend()
+
+
+def _from_env() -> FakeEEBackend:
+    recording: Dict[str, Any] = {}
+    path = (os.getenv("EE_FAKE_RECORDING") or "").strip()
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            recording = json.load(f)
+    return FakeEEBackend(
+        latency_s=env_float("EE_FAKE_LATENCY_S", 0.0),
+        missing_rate=min(1.0, env_float("EE_FAKE_MISSING_RATE", 0.0)),
+        recording=recording,
+        seed=os.getenv("EE_FAKE_SEED", "0"),
+    )
+
+
+_fake: Optional[FakeEEBackend] = None
+_fake_lock = Lock()
+
+
+def fake() -> Optional[FakeEEBackend]:
+    """The active fake backend, or None when talking to live Earth Engine."""
+
+    global _fake
+    if _fake is not None:
+        return _fake
+    if backend_name() != "fake":
+        return None
+    with _fake_lock:
+        if _fake is None:
+            _fake = _from_env()
+        return _fake
+
+
+def use_fake(backend: Optional[FakeEEBackend]) -> None:
+    """Install (or with None, remove) a fake backend programmatically."""
+
+    global _fake
+    with _fake_lock:
+        _fake = backend
+
+
+def current() -> "LiveEEBackend | FakeEEBackend":
+    return fake() or _LIVE
+
+
+def region_stats(
+    dataset: str,
+    collection_id: str,
+    beach_id: str,
+    start_date: str,
+    end_date: str,
+    bands: Sequence[str],
+    query: Callable[[], Optional[Dict[str, Any]]],
+) -> Optional[Dict[str, Optional[float]]]:
+    """Per-band means for a beach over [start_date, end_date); None if there is no image.
+
+    The one place where services reach Earth Engine or the fake. `query` is
+    the live version (its round-trips go through `ee_calls.get_info`); the
+    fake answers from its synthetic or recorded data instead.
+    """
+
+    return current().region_stats(dataset, collection_id, beach_id, start_date, end_date, bands, query)
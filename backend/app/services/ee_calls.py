@@ -0,0 +1,191 @@
+"""
+Earth Engine round-trip accounting and admission.
+
+Every `getInfo()` in the services goes through `get_info`. It:
+
+- counts requests per dataset, for metrics and the backfill budget;
+- enforces the per-request deadline, so work nobody waits for stops early;
+- admits calls in priority order (see `ee_priority`);
+- rate limits, retries and circuit-breaks live calls, surfacing throttling
+  and outages as `EEUnavailable` instead of missing data (see `ee_resilience`).
+
+Calls served by the fake backend use no EE quota and skip the rate limiter.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, Iterator, Optional
+
+from app.services import ee_priority, ee_resilience, telemetry
+from app.services.timing import stage
+
+
+class EECallError(Exception):
+    """EE call failed for an operational reason; must not be treated as "no data"."""
+
+
+class DeadlineExceeded(EECallError):
+    """The request's EE deadline passed before the call could be made."""
+
+
+class EEUnavailable(EECallError):
+    """EE is throttling or down (retries exhausted or circuit open)."""
+
+
+class BudgetExhausted(EECallError):
+    """The request budget the caller runs under (see `spend_from`) is spent."""
+
+
+class CallBudget:
+    """A fixed number of EE round-trips, shared by every call made under `spend_from`."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(0, limit)
+        self._used = 0
+        self._lock = Lock()
+
+    def charge(self) -> bool:
+        with self._lock:
+            if self._used >= self.limit:
+                return False
+            self._used += 1
+            return True
+
+    def used(self) -> int:
+        with self._lock:
+            return self._used
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            return self._used >= self.limit
+
+
+_lock = Lock()
+_calls: Dict[str, int] = {}
+
+# Absolute time.monotonic() deadline for EE calls in the current context.
+_deadline: ContextVar[Optional[float]] = ContextVar("ee_deadline", default=None)
+_budget: ContextVar[Optional[CallBudget]] = ContextVar("ee_budget", default=None)
+
+
+@contextmanager
+def deadline(timeout_s: Optional[float]) -> Iterator[None]:
+    """Apply a deadline to every `get_info` made inside the block (None = no limit)."""
+
+    token = _deadline.set(None if timeout_s is None else time.monotonic() + timeout_s)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def spend_from(budget: Optional[CallBudget]) -> Iterator[None]:
+    """Charge every round-trip made inside the block (retries included) to `budget`."""
+
+    token = _budget.set(budget)
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+def remaining_s() -> Optional[float]:
+    d = _deadline.get()
+    return None if d is None else d - time.monotonic()
+
+
+def _check_deadline(dataset: str) -> Optional[float]:
+    left = remaining_s()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"EE deadline exceeded before {dataset} request")
+    return left
+
+
+def _call_once(obj: Any, dataset: str) -> Any:
+    left = _check_deadline(dataset)
+    budget = _budget.get()
+    if budget is not None and not budget.charge():
+        raise BudgetExhausted(f"EE request budget of {budget.limit} spent before {dataset} request")
+
+    cls = ee_priority.current()
+    gate = ee_priority.gate()
+    with stage("ee_wait"):
+        acquired = gate.acquire(cls, timeout=left)
+    if not acquired:
+        raise DeadlineExceeded(f"EE deadline exceeded while queued for {dataset} request")
+
+    try:
+        if getattr(obj, "uses_ee_quota", True):
+            with stage("ee_wait"):
+                allowed = ee_resilience.bucket().take(timeout=remaining_s())
+            if not allowed:
+                raise DeadlineExceeded(f"EE deadline exceeded waiting for rate limit ({dataset})")
+        with _lock:
+            _calls[dataset] = _calls.get(dataset, 0) + 1
+        t0 = time.monotonic()
+        try:
+            with stage("ee"):
+                return obj.getInfo()
+        finally:
+            telemetry.EE_REQUEST_SECONDS.observe(time.monotonic() - t0, dataset=dataset)
+    finally:
+        gate.release(cls)
+
+
+def get_info(obj: Any, *, dataset: str) -> Any:
+    """Evaluate an EE object (one round-trip) and count it under `dataset`.
+
+    Transient failures are retried with jittered backoff. Raises EEUnavailable
+    when retries run out or the circuit is open; other EE errors (bad bands,
+    empty regions...) propagate unchanged, as before.
+    """
+
+    breaker = ee_resilience.breaker()
+    attempt = 0
+    while True:
+        _check_deadline(dataset)
+        if not breaker.allow():
+            telemetry.EE_REQUESTS.inc(dataset=dataset, outcome="circuit_open")
+            raise EEUnavailable(f"EE circuit open; skipping {dataset} request")
+
+        try:
+            result = _call_once(obj, dataset)
+        except EECallError as e:
+            breaker.abandon()
+            telemetry.EE_REQUESTS.inc(dataset=dataset, outcome="budget" if isinstance(e, BudgetExhausted) else "deadline")
+            raise
+        except Exception as e:
+            if not ee_resilience.is_transient(e):
+                # EE answered; the request itself was bad / had no data.
+                breaker.record_success()
+                telemetry.EE_REQUESTS.inc(dataset=dataset, outcome="error")
+                raise
+
+            breaker.record_failure()
+            telemetry.EE_REQUESTS.inc(dataset=dataset, outcome="transient")
+            attempt += 1
+            delay = ee_resilience.backoff_s(attempt)
+            left = remaining_s()
+            if attempt > ee_resilience.max_retries() or (left is not None and left <= delay):
+                raise EEUnavailable(f"EE {dataset} request failed after {attempt} attempt(s): {e}") from e
+            time.sleep(delay)
+            continue
+
+        breaker.record_success()
+        telemetry.EE_REQUESTS.inc(dataset=dataset, outcome="ok")
+        return result
+
+
+def call_count() -> int:
+    with _lock:
+        return sum(_calls.values())
+
+
+def call_counts() -> Dict[str, int]:
+    with _lock:
+        return dict(_calls)
@@ -0,0 +1,131 @@
+"""
+Dedicated, bounded executor for Earth Engine work.
+
+EE `getInfo()` calls block for seconds. Running them on Starlette's shared
+threadpool lets a burst of cold metric requests starve cheap routes (health,
+static files, forms), so endpoints hand EE work to this executor instead and
+await it. Each submission carries a deadline that `ee_calls.get_info` checks
+before every round-trip, so work whose caller gave up stops early.
+
+Background jobs (refresh, backfill) run on a separate, smaller pool so they
+never occupy the workers that serve visitors; their individual round-trips
+are then ordered behind interactive ones by `ee_priority`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import Context, copy_context
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, Optional, TypeVar
+
+from app.config.env import env_int
+from app.services import ee_calls, ee_priority, profiling
+from app.services.ee_calls import DeadlineExceeded
+
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_batch_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def default_timeout_s() -> float:
+    try:
+        return max(0.1, float(os.getenv("EE_REQUEST_TIMEOUT_S", "25")))
+    except ValueError:
+        return 25.0
+
+
+def _get_executor(priority: str) -> ThreadPoolExecutor:
+    global _executor, _batch_executor
+    with _executor_lock:
+        if priority != ee_priority.INTERACTIVE:
+            if _batch_executor is None:
+                _batch_executor = ThreadPoolExecutor(
+                    max_workers=env_int("EE_BATCH_CONCURRENCY", 2, minimum=1),
+                    thread_name_prefix="ee-batch",
+                )
+            return _batch_executor
+
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=env_int("EE_MAX_CONCURRENCY", 4, minimum=1),
+                thread_name_prefix="ee",
+            )
+        return _executor
+
+
+def _run_with_deadline(deadline_at: Optional[float], priority: str, fn: Callable[..., T]) -> T:
+    # The deadline counts from submission, so time spent queued is included.
+    with ee_calls.deadline(None if deadline_at is None else deadline_at - time.monotonic()):
+        with ee_priority.priority(priority):
+            return profiling.run_profiled(fn)
+
+
+async def run_ee(
+    fn: Callable[..., T],
+    *args: Any,
+    timeout_s: Optional[float] = None,
+    priority: str = ee_priority.INTERACTIVE,
+    **kwargs: Any,
+) -> T:
+    """Run blocking EE work on the EE executor and await the result.
+
+    `timeout_s` bounds the whole call (queueing included); None means no
+    deadline (background jobs). Raises DeadlineExceeded on expiry: a job that
+    has not started is cancelled, a running one stops at its next getInfo.
+    `priority` is one of the `ee_priority` classes.
+    """
+
+    loop = asyncio.get_running_loop()
+    deadline_at = None if timeout_s is None else time.monotonic() + timeout_s
+    ctx = copy_context()
+    fut = loop.run_in_executor(
+        _get_executor(priority),
+        ctx.run,
+        _run_with_deadline,
+        deadline_at,
+        priority,
+        partial(fn, *args, **kwargs),
+    )
+    try:
+        return await asyncio.wait_for(fut, timeout=timeout_s)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"EE work exceeded {timeout_s:.1f}s deadline") from None
+
+
+def submit(
+    fn: Callable[..., T],
+    *args: Any,
+    priority: str = ee_priority.INTERACTIVE,
+    **kwargs: Any,
+) -> Future:
+    """Fire-and-forget EE work (no deadline), usable from sync code.
+
+    Runs in a fresh context: the caller's request state (timings, profiling
+    session, deadline) does not follow work that outlives the request.
+    """
+
+    return _get_executor(priority).submit(
+        Context().run,
+        _run_with_deadline,
+        None,
+        priority,
+        partial(fn, *args, **kwargs),
+    )
+
+
+def shutdown() -> None:
+    global _executor, _batch_executor
+    with _executor_lock:
+        for pool in (_executor, _batch_executor):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _batch_executor = None
@@ -0,0 +1,136 @@
+"""
+Priority scheduling for Earth Engine round-trips.
+
+All EE calls share one quota, so `ee_calls.get_info` takes a slot from a
+priority gate before each request. Waiters are served by class first
+(interactive < refresh < backfill) and FIFO within a class, so a visitor's
+cache miss jumps ahead of queued batch work. A few slots are reserved for
+interactive calls so a long refresh cannot occupy every slot.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Condition
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.config.env import env_int
+from app.services import telemetry
+
+
+INTERACTIVE = "interactive"
+REFRESH = "refresh"
+BACKFILL = "backfill"
+
+CLASSES = (INTERACTIVE, REFRESH, BACKFILL)
+_ORDER = {cls: i for i, cls in enumerate(CLASSES)}
+
+# Untagged work is treated as user-facing.
+_current: ContextVar[str] = ContextVar("ee_priority", default=INTERACTIVE)
+
+
+def current() -> str:
+    return _current.get()
+
+
+@contextmanager
+def priority(cls: str) -> Iterator[None]:
+    """Tag every EE call made inside the block with a priority class."""
+
+    if cls not in _ORDER:
+        raise ValueError(f"Unknown EE priority class: {cls}")
+    token = _current.set(cls)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class PriorityGate:
+    """Counting semaphore whose waiters are woken in priority order."""
+
+    def __init__(self, slots: int, interactive_reserved: int = 0) -> None:
+        self._cond = Condition()
+        self._slots = max(1, slots)
+        # Batch classes may only use slots beyond the interactive reserve.
+        self._batch_slots = max(1, self._slots - max(0, interactive_reserved))
+        self._in_use = 0
+        self._heap: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._waiting: Dict[str, int] = {cls: 0 for cls in CLASSES}
+        self._running: Dict[str, int] = {cls: 0 for cls in CLASSES}
+
+    def _can_run(self, cls: str, entry: Tuple[int, int]) -> bool:
+        limit = self._slots if cls == INTERACTIVE else self._batch_slots
+        return self._heap[0] == entry and self._in_use < limit
+
+    def acquire(self, cls: str, timeout: Optional[float] = None) -> bool:
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            entry = (_ORDER[cls], next(self._seq))
+            heapq.heappush(self._heap, entry)
+            self._waiting[cls] += 1
+            try:
+                while not self._can_run(cls, entry):
+                    left = None if end is None else end - time.monotonic()
+                    if left is not None and left <= 0:
+                        self._heap.remove(entry)
+                        heapq.heapify(self._heap)
+                        self._cond.notify_all()
+                        return False
+                    self._cond.wait(left)
+
+                heapq.heappop(self._heap)
+                self._in_use += 1
+                self._running[cls] += 1
+                # The next waiter may be able to run too.
+                self._cond.notify_all()
+                return True
+            finally:
+                self._waiting[cls] -= 1
+
+    def release(self, cls: str) -> None:
+        with self._cond:
+            self._in_use -= 1
+            self._running[cls] -= 1
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            return {
+                cls: {"queued": self._waiting[cls], "running": self._running[cls]}
+                for cls in CLASSES
+            }
+
+
+_gate = PriorityGate(
+    slots=env_int("EE_MAX_INFLIGHT", 4, minimum=1),
+    interactive_reserved=env_int("EE_INTERACTIVE_RESERVED", 1, minimum=0),
+)
+
+
+def gate() -> PriorityGate:
+    return _gate
+
+
+def queue_depths() -> Dict[str, Dict[str, int]]:
+    """Queued and running EE calls per priority class."""
+
+    return _gate.snapshot()
+
+
+def _collect_queue_gauge() -> Dict[Tuple[str, ...], float]:
+    return {
+        (cls, state): float(n)
+        for cls, counts in queue_depths().items()
+        for state, n in counts.items()
+    }
+
+
+telemetry.register(
+    telemetry.Gauge("ee_queue_depth", "EE calls per priority class and state.", ["priority", "state"], _collect_queue_gauge)
+)
@@ -0,0 +1,189 @@
+"""
+Rate limiting, retry and circuit breaking for Earth Engine calls.
+
+Used by `ee_calls.get_info`. The token bucket keeps us under EE's request
+quota, transient errors (429, 5xx, timeouts) are retried with jittered
+exponential backoff, and after repeated transient failures the breaker opens
+so callers fail fast with "EE unavailable" instead of hammering EE or writing
+degraded "missing"/"imputed" rows into the day store.
+"""
+
+from __future__ import annotations
+
+import random
+import socket
+import time
+from threading import Condition, Lock
+from typing import Dict, Optional, Tuple
+
+from app.config.env import env_float
+from app.services import telemetry
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `take` blocks until a token is available."""
+
+    def __init__(self, rate_per_s: float, burst: float) -> None:
+        self.rate = max(0.001, rate_per_s)
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, timeout: Optional[float] = None) -> bool:
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait_s = (1.0 - self._tokens) / self.rate
+                if end is not None:
+                    left = end - time.monotonic()
+                    if left <= 0 or left < wait_s:
+                        return False
+                self._cond.wait(wait_s)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown_s: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_s = cooldown_s
+        self._lock = Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown_s:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown_s:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # Half-open: let one probe through.
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def abandon(self) -> None:
+        """Called when an allowed call never reached EE (e.g. deadline hit while queued)."""
+
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+_TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+_TRANSIENT_MARKERS = (
+    "429",
+    "too many requests",
+    "too many concurrent",
+    "rate limit",
+    "quota exceeded",
+    "resource_exhausted",
+    "503",
+    "service unavailable",
+    "502",
+    "bad gateway",
+    "500 internal",
+    "internal error",
+    "deadline exceeded",
+    "timed out",
+    "connection reset",
+    "connection aborted",
+)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for throttling / server / network errors worth retrying."""
+
+    if isinstance(exc, (TimeoutError, ConnectionError, socket.timeout)):
+        return True
+
+    # googleapiclient.errors.HttpError and friends carry the HTTP status.
+    status = getattr(getattr(exc, "resp", None), "status", None) or getattr(exc, "status_code", None)
+    try:
+        if status is not None and int(status) in _TRANSIENT_STATUS:
+            return True
+    except (TypeError, ValueError):
+        pass
+
+    msg = str(exc).lower()
+    return any(marker in msg for marker in _TRANSIENT_MARKERS)
+
+
+def max_retries() -> int:
+    return int(env_float("EE_MAX_RETRIES", 3))
+
+
+def backoff_s(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (1-based)."""
+
+    base = env_float("EE_RETRY_BASE_S", 0.5)
+    cap = env_float("EE_RETRY_MAX_S", 8.0)
+    return random.uniform(0.0, min(cap, base * (2 ** (attempt - 1))))
+
+
+_bucket = TokenBucket(
+    rate_per_s=env_float("EE_RATE_PER_S", 10.0, minimum=0.001),
+    burst=env_float("EE_RATE_BURST", 20.0, minimum=1.0),
+)
+_breaker = CircuitBreaker(
+    failure_threshold=int(env_float("EE_BREAKER_FAILURES", 5, minimum=1)),
+    cooldown_s=env_float("EE_BREAKER_COOLDOWN_S", 30.0),
+)
+
+
+def bucket() -> TokenBucket:
+    return _bucket
+
+
+def breaker() -> CircuitBreaker:
+    return _breaker
+
+
+def _collect_breaker_gauge() -> Dict[Tuple[str, ...], float]:
+    current = _breaker.state
+    return {(s,): 1.0 if s == current else 0.0 for s in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN)}
+
+
+telemetry.register(
+    telemetry.Gauge("ee_circuit_state", "EE circuit breaker state (1 = current).", ["state"], _collect_breaker_gauge)
+)
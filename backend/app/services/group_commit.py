@@ -0,0 +1,220 @@
+"""
+Group commit: batch many small writes into one storage commit.
+
+Callers `submit()` an item and get a concurrent.futures.Future. A single
+writer thread takes the first pending item, keeps collecting for up to
+`window_s` (or until `max_batch` items), then hands the whole batch to
+`flush(items)`, which must commit it durably and return one result per
+item. Every future in the batch is resolved only after that commit has
+returned, so an acknowledgement means the write is stored. Futures
+cancelled before their batch starts are skipped; once started they can no
+longer be cancelled.
+
+When a commit raises, `is_item_error(e)` decides what happens:
+- An item error (e.g. a constraint violation) means one item is bad: the
+  items are committed one by one so only the bad one gets the exception.
+- Anything else (a locked database, a network error) is retried once for the
+  whole batch after `retry_backoff_s`; if it fails again, every item of the
+  batch fails with that error instead of paying one more round-trip each.
+
+Under a burst this turns N commits (and N fsyncs / round-trips) into
+N / batch-size, at the cost of at most `window_s` extra latency when idle.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.services import telemetry
+
+
+logger = logging.getLogger("uvicorn.error")
+
+_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+BATCH_SIZE = telemetry.register(
+    telemetry.Histogram("group_commit_batch_size", "Items per group commit.", ["queue"], _BATCH_BUCKETS)
+)
+COMMIT_SECONDS = telemetry.register(
+    telemetry.Histogram("group_commit_seconds", "Duration of one group commit.", ["queue"])
+)
+
+_STOP = object()
+
+
+class QueueFull(Exception):
+    """More writes are pending than the queue accepts."""
+
+
+class GroupCommitQueue:
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[List[Any]], Sequence[Any]],
+        *,
+        window_s: float = 0.005,
+        max_batch: int = 256,
+        max_pending: int = 10000,
+        retry_backoff_s: float = 0.05,
+        is_item_error: Optional[Callable[[BaseException], bool]] = None,
+    ) -> None:
+        self.name = name
+        self._flush = flush
+        self.retry_backoff_s = max(0.0, retry_backoff_s)
+        self._is_item_error = is_item_error or (lambda e: False)
+        self.window_s = max(0.0, window_s)
+        self.max_batch = max(1, max_batch)
+        self._pending: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._batches = 0
+        self._items = 0
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} queue is closed")
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name=f"group-commit-{self.name}")
+                self._thread.start()
+
+    def submit(self, item: Any) -> "Future[Any]":
+        """Queue `item`; the future resolves once its batch is committed."""
+
+        self._ensure_thread()
+        future: "Future[Any]" = Future()
+        try:
+            self._pending.put_nowait((item, future))
+        except queue.Full:
+            raise QueueFull(f"{self.name} write queue is full") from None
+        return future
+
+    def _collect(self, first: Tuple[Any, "Future[Any]"]) -> Tuple[List[Tuple[Any, "Future[Any]"]], bool]:
+        batch = [first]
+        stop = False
+        deadline = time.monotonic() + self.window_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._pending.get(timeout=remaining) if remaining > 0 else self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                stop = True
+                break
+            batch.append(entry)
+        return batch, stop
+
+    def _flush_checked(self, items: List[Any]) -> List[Any]:
+        results = list(self._flush(items))
+        if len(results) != len(items):
+            raise RuntimeError(f"{self.name} flush returned {len(results)} results for {len(items)} items")
+        return results
+
+    @staticmethod
+    def _resolve(future: "Future[Any]", result: Any = None, error: Optional[BaseException] = None) -> None:
+        # Started futures can't be cancelled, but stay defensive: a second set_* would raise.
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _fail(self, batch: List[Tuple[Any, "Future[Any]"]], error: BaseException) -> None:
+        for _, future in batch:
+            self._resolve(future, error=error)
+
+    def _commit_one_by_one(self, batch: List[Tuple[Any, "Future[Any]"]], error: BaseException) -> None:
+        if len(batch) == 1:
+            logger.warning("Group commit %s failed: %s", self.name, error)
+            self._resolve(batch[0][1], error=error)
+            return
+        # One bad item must not fail its batch-mates.
+        logger.warning("Group commit %s failed for %d items, retrying one by one: %s", self.name, len(batch), error)
+        for i, (item, future) in enumerate(batch):
+            try:
+                self._resolve(future, result=self._flush_checked([item])[0])
+            except Exception as item_error:
+                self._resolve(future, error=item_error)
+                if not self._is_item_error(item_error):
+                    # The storage itself is failing: don't try the rest one by one.
+                    self._fail(batch[i + 1:], item_error)
+                    return
+
+    def _commit(self, batch: List[Tuple[Any, "Future[Any]"]]) -> None:
+        # Drop items whose caller already gave up; the rest can no longer be cancelled.
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        items = [item for item, _ in batch]
+        t0 = time.perf_counter()
+        try:
+            try:
+                results = self._flush_checked(items)
+            except Exception as e:
+                if self._is_item_error(e):
+                    self._commit_one_by_one(batch, e)
+                    return
+                logger.warning("Group commit %s failed for %d items, retrying the batch: %s", self.name, len(items), e)
+                time.sleep(self.retry_backoff_s)
+                try:
+                    results = self._flush_checked(items)
+                except Exception as retry_error:
+                    if self._is_item_error(retry_error):
+                        self._commit_one_by_one(batch, retry_error)
+                    else:
+                        logger.warning("Group commit %s failed again: %s", self.name, retry_error)
+                        self._fail(batch, retry_error)
+                    return
+        finally:
+            COMMIT_SECONDS.observe(time.perf_counter() - t0, queue=self.name)
+            BATCH_SIZE.observe(len(items), queue=self.name)
+            with self._lock:
+                self._batches += 1
+                self._items += len(items)
+
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, result=result)
+
+    def _run(self) -> None:
+        while True:
+            first = self._pending.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            try:
+                self._commit(batch)
+            except Exception as e:  # the writer thread must survive anything
+                logger.exception("Group commit %s: unexpected error", self.name)
+                self._fail(batch, e)
+            if stop:
+                return
+
+    def close(self, timeout_s: float = 5.0) -> None:
+        """Commit what is already queued, then stop the writer thread."""
+
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._pending.put(_STOP)
+        thread.join(timeout_s)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            batches, items = self._batches, self._items
+        return {
+            "pending": self._pending.qsize(),
+            "batches": batches,
+            "items": items,
+            "avg_batch": round(items / batches, 2) if batches else 0.0,
+        }
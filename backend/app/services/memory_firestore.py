@@ -0,0 +1,289 @@
+"""
+In-memory stand-in for the subset of `google.cloud.firestore.Client` the app
+uses (day store, leases, form submissions).
+
+Selected with `FIRESTORE_BACKEND=memory` (or installed programmatically via
+`beach_day_store.use_client`) for benchmarks, load tests and offline runs.
+Data lives in the process and is lost on restart. Every call that would be a
+Firestore round-trip is counted, and an optional latency can be injected.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import time
+import uuid
+from threading import RLock
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.config.env import env_float
+
+
+def selected() -> bool:
+    return (os.getenv("FIRESTORE_BACKEND") or "").strip().lower() == "memory"
+
+
+class AlreadyExists(Exception):
+    def __init__(self, path: str) -> None:
+        super().__init__(f"409 AlreadyExists: Document already exists: {path}")
+
+
+class DocumentSnapshot:
+    def __init__(self, doc_id: str, data: Optional[Dict[str, Any]]) -> None:
+        self.id = doc_id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return None if self._data is None else copy.deepcopy(self._data)
+
+
+class DocumentReference:
+    def __init__(self, client: "Client", collection: str, doc_id: str) -> None:
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return f"{self._collection}/{self.id}"
+
+    def get(self, transaction: Any = None) -> DocumentSnapshot:
+        self._client._round_trip("read", 1)
+        return self._client._snapshot(self._collection, self.id)
+
+    def set(self, data: Dict[str, Any], merge: bool = False) -> None:
+        self._client._round_trip("write", 1)
+        self._client._write(self._collection, self.id, data, merge)
+
+    def create(self, data: Dict[str, Any]) -> None:
+        self._client._round_trip("write", 1)
+        with self._client._lock:
+            if self.id in self._client._docs(self._collection):
+                raise AlreadyExists(self.path)
+            self._client._write(self._collection, self.id, data, False)
+
+
+class Query:
+    """Equality filters, ordering by fields or `__name__`, start_after and limit."""
+
+    def __init__(
+        self,
+        client: "Client",
+        collection: str,
+        filters: tuple = (),
+        order: tuple = (),
+        after: Optional[tuple] = None,
+        limit_n: Optional[int] = None,
+    ) -> None:
+        self._client = client
+        self._collection = collection
+        self._filters = filters
+        self._order = order
+        self._after = after
+        self._limit = limit_n
+
+    def _copy(self, **changes: Any) -> "Query":
+        fields = {
+            "filters": self._filters,
+            "order": self._order,
+            "after": self._after,
+            "limit_n": self._limit,
+        }
+        fields.update(changes)
+        return Query(self._client, self._collection, **fields)
+
+    def where(self, field: Optional[str] = None, op: Optional[str] = None, value: Any = None, *, filter: Any = None) -> "Query":
+        if filter is not None:
+            # A FieldFilter, as with the real client.
+            field, op, value = filter.field_path, filter.op_string, filter.value
+        if op != "==":
+            raise NotImplementedError(f"memory_firestore supports only '==' filters, not {op!r}")
+        return self._copy(filters=self._filters + ((field, value),))
+
+    def order_by(self, field: str) -> "Query":
+        return self._copy(order=self._order + (field,))
+
+    def start_after(self, snapshot: "DocumentSnapshot") -> "Query":
+        return self._copy(after=self._sort_key(snapshot.id, snapshot.to_dict() or {}))
+
+    def limit(self, n: int) -> "Query":
+        return self._copy(limit_n=n)
+
+    def _sort_key(self, doc_id: str, data: Dict[str, Any]) -> tuple:
+        return tuple(doc_id if f == "__name__" else data.get(f) for f in self._order) + (doc_id,)
+
+    def stream(self) -> Iterator[DocumentSnapshot]:
+        with self._client._lock:
+            items = [
+                (doc_id, copy.deepcopy(data))
+                for doc_id, data in self._client._docs(self._collection).items()
+                if all(data.get(f) == v for f, v in self._filters)
+            ]
+        items.sort(key=lambda kv: self._sort_key(kv[0], kv[1]))
+        if self._after is not None:
+            items = [kv for kv in items if self._sort_key(kv[0], kv[1]) > self._after]
+        if self._limit is not None:
+            items = items[: self._limit]
+        self._client._round_trip("read", len(items))
+        for doc_id, data in items:
+            yield DocumentSnapshot(doc_id, data)
+
+
+class CollectionReference:
+    def __init__(self, client: "Client", name: str) -> None:
+        self._client = client
+        self.name = name
+
+    def _query(self) -> Query:
+        return Query(self._client, self.name)
+
+    def where(self, field: Optional[str] = None, op: Optional[str] = None, value: Any = None, *, filter: Any = None) -> Query:
+        return self._query().where(field, op, value, filter=filter)
+
+    def order_by(self, field: str) -> Query:
+        return self._query().order_by(field)
+
+    def limit(self, n: int) -> Query:
+        return self._query().limit(n)
+
+    def document(self, doc_id: Optional[str] = None) -> DocumentReference:
+        return DocumentReference(self._client, self.name, doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data: Dict[str, Any]) -> tuple:
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+    def stream(self) -> Iterator[DocumentSnapshot]:
+        with self._client._lock:
+            items = sorted(self._client._docs(self.name).items())
+        self._client._round_trip("read", len(items))
+        for doc_id, data in items:
+            yield DocumentSnapshot(doc_id, copy.deepcopy(data))
+
+
+class WriteBatch:
+    def __init__(self, client: "Client") -> None:
+        self._client = client
+        self._writes: List[tuple] = []
+
+    def set(self, ref: DocumentReference, data: Dict[str, Any], merge: bool = False) -> None:
+        self._writes.append((ref, data, merge, False))
+
+    def create(self, ref: DocumentReference, data: Dict[str, Any]) -> None:
+        self._writes.append((ref, data, False, True))
+
+    def commit(self) -> None:
+        self._client._round_trip("write", len(self._writes))
+        with self._client._lock:
+            # Atomic like Firestore: a create() on an existing document fails the whole batch.
+            for ref, _, _, create in self._writes:
+                if create and ref.id in self._client._docs(ref._collection):
+                    raise AlreadyExists(ref.path)
+            for ref, data, merge, _ in self._writes:
+                self._client._write(ref._collection, ref.id, data, merge)
+        self._writes = []
+
+
+class Transaction:
+    """Serializes the block on the client lock; writes apply immediately."""
+
+    def __init__(self, client: "Client") -> None:
+        self._client = client
+
+    def __enter__(self) -> "Transaction":
+        self._client._lock.acquire()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._client._lock.release()
+
+    def set(self, ref: DocumentReference, data: Dict[str, Any], merge: bool = False) -> None:
+        ref.set(data, merge=merge)
+
+
+class Client:
+    def __init__(self, *, latency_s: float = 0.0) -> None:
+        self.latency_s = latency_s
+        self._lock = RLock()
+        self._data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._ops: Dict[str, int] = {}
+        self._documents: Dict[str, int] = {}
+
+    # -- accounting -------------------------------------------------------
+
+    def _round_trip(self, kind: str, docs: int) -> None:
+        with self._lock:
+            self._ops[kind] = self._ops.get(kind, 0) + 1
+            self._documents[kind] = self._documents.get(kind, 0) + docs
+        if self.latency_s > 0:
+            time.sleep(self.latency_s)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Round-trips and documents per kind ("read" / "write")."""
+
+        with self._lock:
+            return {"ops": dict(self._ops), "documents": dict(self._documents)}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._ops.clear()
+            self._documents.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    # -- storage ----------------------------------------------------------
+
+    def _docs(self, collection: str) -> Dict[str, Dict[str, Any]]:
+        return self._data.setdefault(collection, {})
+
+    def _snapshot(self, collection: str, doc_id: str) -> DocumentSnapshot:
+        with self._lock:
+            data = self._docs(collection).get(doc_id)
+            return DocumentSnapshot(doc_id, None if data is None else copy.deepcopy(data))
+
+    def _write(self, collection: str, doc_id: str, data: Dict[str, Any], merge: bool) -> None:
+        with self._lock:
+            docs = self._docs(collection)
+            if merge and doc_id in docs:
+                docs[doc_id].update(copy.deepcopy(data))
+            else:
+                docs[doc_id] = copy.deepcopy(data)
+
+    # -- firestore.Client surface -----------------------------------------
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self, name)
+
+    def get_all(self, refs: Iterable[DocumentReference]) -> Iterator[DocumentSnapshot]:
+        ref_list = list(refs)
+        self._round_trip("read", len(ref_list))
+        for ref in ref_list:
+            yield self._snapshot(ref._collection, ref.id)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def transaction(self) -> Transaction:
+        return Transaction(self)
+
+
+_shared: Optional[Client] = None
+_shared_lock = RLock()
+
+
+def shared() -> Client:
+    """Process-wide instance, so the day store and the forms API see the same data."""
+
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = Client(latency_s=env_float("FIRESTORE_MEMORY_LATENCY_S", 0.0))
+        return _shared
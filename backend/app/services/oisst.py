@@ -8,7 +8,10 @@ Bu servis:
 
 import ee
 from datetime import date, timedelta
+from functools import partial
 from typing import Optional
+from app.services import ee_backend
+from app.services.ee_calls import EECallError, get_info
 from app.utils.geo import get_beach_buffer
 
 
@@ -25,13 +28,7 @@ def _get_date_range(days: int):
     return start.isoformat(), end.isoformat()
 
 
-def get_sst_for_beach_in_range(
-    beach_id: str,
-    start_date: str,
-    end_date: str,
-) -> Optional[float]:
-    """Returns mean sea surface temperature (°C) for an explicit date range."""
-
+def _query_sst(beach_id: str, start_date: str, end_date: str) -> Optional[dict]:
     # OISST'in çözünürlüğü ~25km olduğu için 3km'lik buffer bazı sahillerde
     # (özellikle kıyı/dağ-karışımı piksellerde) "no valid pixels" döndürebilir.
     # SST için daha büyük bir buffer kullanıyoruz.
@@ -43,7 +40,7 @@ def get_sst_for_beach_in_range(
         .select("sst")
     )
 
-    if collection.size().getInfo() == 0:
+    if get_info(collection.size(), dataset="OISST") == 0:
         return None
 
     mean_image = collection.mean()
@@ -56,10 +53,25 @@ def get_sst_for_beach_in_range(
     )
 
     try:
-        stats_dict = stats.getInfo()
+        return get_info(stats, dataset="OISST")
+    except EECallError:
+        raise
     except Exception:
         return None
 
+
+def get_sst_for_beach_in_range(
+    beach_id: str,
+    start_date: str,
+    end_date: str,
+) -> Optional[float]:
+    """Returns mean sea surface temperature (°C) for an explicit date range."""
+
+    stats_dict = ee_backend.region_stats(
+        "OISST", OISST_COLLECTION, beach_id, start_date, end_date, ["sst"],
+        query=partial(_query_sst, beach_id, start_date, end_date),
+    )
+
     sst_raw = (stats_dict or {}).get("sst")
     if sst_raw is None:
         return None
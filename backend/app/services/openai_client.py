@@ -0,0 +1,72 @@
+"""
+Application-scoped HTTP client for the OpenAI API.
+
+One pooled `httpx.AsyncClient` is created at startup and closed at shutdown,
+so AI reports reuse keep-alive connections (and HTTP/2 when the `h2` package
+is installed) instead of paying a TCP + TLS handshake per request.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+from app.config.env import env_float, env_int
+
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _http2_requested() -> bool:
+    return os.getenv("OPENAI_HTTP2", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def timeout_s() -> float:
+    return env_float("OPENAI_TIMEOUT_S", 20.0)
+
+
+def _create() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=env_int("OPENAI_MAX_CONNECTIONS", 20, minimum=1),
+        max_keepalive_connections=env_int("OPENAI_MAX_KEEPALIVE", 10, minimum=0),
+        keepalive_expiry=env_float("OPENAI_KEEPALIVE_EXPIRY_S", 30.0),
+    )
+    http2 = _http2_requested()
+    if http2 and not _http2_available():
+        logger.warning("OPENAI_HTTP2 is on but the 'h2' package is missing; using HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(timeout_s()), http2=http2)
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client; created on first use if startup() has not run."""
+
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create()
+    return _client
+
+
+async def startup() -> None:
+    get_client()
+
+
+async def shutdown() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
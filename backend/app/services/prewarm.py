@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 from app.data.beaches import BEACHES
+from app.services import ee_priority
+from app.services.ee_executor import run_ee
 from app.services.summary_cache import CacheEntry, current_window, make_key, set as cache_set
 from app.services.timeseries import get_beach_summary
 
@@ -52,9 +54,9 @@ async def prewarm_once(days: int = 7) -> None:
 
     for beach_id in BEACHES.keys():
         try:
-            # Earth Engine calls are blocking; run them in a worker thread so we
+            # Earth Engine calls are blocking; run them on the EE executor so we
             # don't block the asyncio loop (which would cause proxy connect timeouts).
-            value = await asyncio.to_thread(get_beach_summary, beach_id=beach_id, days=days)
+            value = await run_ee(get_beach_summary, beach_id=beach_id, days=days, priority=ee_priority.REFRESH)
             entry = CacheEntry(
                 value=value,
                 window_start=window_start,
@@ -0,0 +1,99 @@
+"""
+On-demand profiling of EE-backed request work.
+
+An admin request opens a `session()`; every job the request hands to the EE
+executor then runs under cProfile in its worker thread (see
+`ee_executor._run_with_deadline`). The merged stats are written to
+PROFILE_DIR as a `.prof` file (loadable with pstats / snakeviz) and a
+cumulative-time text summary is returned to the caller.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+def _profile_dir() -> str:
+    return os.getenv("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "sbt-profiles")
+
+
+def _top_n() -> int:
+    try:
+        return max(5, int(os.getenv("PROFILE_TOP", "40")))
+    except ValueError:
+        return 40
+
+
+class Session:
+    def __init__(self) -> None:
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.started = time.perf_counter()
+        self._lock = Lock()
+        self._profiles: List[cProfile.Profile] = []
+
+    def add(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def report(self) -> Dict[str, Any]:
+        wall_ms = round((time.perf_counter() - self.started) * 1000.0, 2)
+        with self._lock:
+            profiles = list(self._profiles)
+
+        if not profiles:
+            return {"id": self.id, "wall_ms": wall_ms, "path": None, "stats": "no EE work was profiled"}
+
+        stats = pstats.Stats(profiles[0])
+        for p in profiles[1:]:
+            stats.add(p)
+
+        os.makedirs(_profile_dir(), exist_ok=True)
+        path = os.path.join(_profile_dir(), f"{self.id}.prof")
+        stats.dump_stats(path)
+
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(_top_n())
+        return {"id": self.id, "wall_ms": wall_ms, "path": path, "stats": out.getvalue()}
+
+
+_current: ContextVar[Optional[Session]] = ContextVar("profile_session", default=None)
+
+
+@contextmanager
+def session() -> Iterator[Session]:
+    s = Session()
+    token = _current.set(s)
+    try:
+        yield s
+    finally:
+        _current.reset(token)
+
+
+def run_profiled(fn: Callable[[], T]) -> T:
+    """Run `fn`, under cProfile if the current context has an open session."""
+
+    s = _current.get()
+    if s is None:
+        return fn()
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        return fn()
+    finally:
+        profile.disable()
+        s.add(profile)
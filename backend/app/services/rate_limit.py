@@ -0,0 +1,104 @@
+"""
+In-memory abuse guards for cheap, pre-storage rejection.
+
+- SlidingWindowLimiter: at most `limit` hits per `window_s` per key, using
+  the sliding-window-counter approximation (the previous fixed window's
+  count weighted by its remaining overlap plus the current one), so a key
+  costs two ints and a float regardless of traffic.
+- RecentKeys: an LRU set with a TTL, for "seen this recently" checks.
+
+Both hold at most `max_keys` entries (least recently used are dropped) and
+are per process; with several instances each enforces its own share.
+Keys derived from personal data should go through `hash_key` first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+
+
+def hash_key(value: str) -> str:
+    """Compact, non-reversible key for e.g. an email address."""
+
+    return hashlib.blake2b(value.strip().lower().encode("utf-8"), digest_size=12).hexdigest()
+
+
+class SlidingWindowLimiter:
+    def __init__(self, limit: int, window_s: float, *, max_keys: int = 100_000) -> None:
+        self.limit = max(1, limit)
+        self.window_s = max(1e-3, window_s)
+        self.max_keys = max(1, max_keys)
+        self._lock = Lock()
+        # key -> [window_start, previous_count, current_count]
+        self._windows: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def hit(self, key: str, now: Optional[float] = None) -> float:
+        """Record a hit; 0.0 if allowed, else seconds until one would be.
+
+        Rejected hits are not counted, so a client that backs off recovers.
+        """
+
+        now = time.monotonic() if now is None else now
+        window = self.window_s
+        with self._lock:
+            state = self._windows.get(key)
+            start = now - (now % window)
+            if state is None:
+                state = [start, 0.0, 0.0]
+                self._windows[key] = state
+                while len(self._windows) > self.max_keys:
+                    self._windows.popitem(last=False)
+            else:
+                self._windows.move_to_end(key)
+                if start > state[0]:
+                    # Roll forward; more than one window back means the previous count is stale.
+                    state[1] = state[2] if start - state[0] < window * 1.5 else 0.0
+                    state[2] = 0.0
+                    state[0] = start
+
+            elapsed = now - start
+            estimate = state[1] * (1.0 - elapsed / window) + state[2]
+            if estimate + 1 > self.limit:
+                # Rough hint: the end of the current fixed window.
+                return max(window - elapsed, 1e-3)
+
+            state[2] += 1
+            return 0.0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"keys": len(self._windows), "limit": self.limit, "window_s": self.window_s}
+
+
+class RecentKeys:
+    def __init__(self, ttl_s: float, *, max_keys: int = 100_000) -> None:
+        self.ttl_s = max(0.0, ttl_s)
+        self.max_keys = max(1, max_keys)
+        self._lock = Lock()
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            added = self._seen.get(key)
+            if added is None:
+                return False
+            if now - added > self.ttl_s:
+                del self._seen[key]
+                return False
+            return True
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            self._seen[key] = time.monotonic()
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._seen)
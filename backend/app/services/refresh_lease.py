@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from app.services import beach_day_store
+
+
+# One id per process; Cloud Run sets K_REVISION, locally we fall back to the hostname.
+_INSTANCE_ID = f"{os.getenv('K_REVISION') or socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def instance_id() -> str:
+    return _INSTANCE_ID
+
+
+def _local_db_path() -> str:
+    # Local stand-in used when the Firestore day store is disabled.
+    default_path = os.path.join(os.path.dirname(__file__), "..", "..", "data", "app.db")
+    return os.getenv("LEASE_DB_PATH") or os.getenv("DB_PATH", default_path)
+
+
+def _connect_local() -> sqlite3.Connection:
+    db_path = _local_db_path()
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS refresh_leases (
+          name TEXT PRIMARY KEY,
+          holder TEXT NOT NULL,
+          expires_at TEXT NOT NULL,
+          completed INTEGER NOT NULL DEFAULT 0,
+          token TEXT
+        )
+        """
+    )
+    # Tables created before leases carried a token.
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(refresh_leases)")}
+    if "token" not in columns:
+        conn.execute("ALTER TABLE refresh_leases ADD COLUMN token TEXT")
+    return conn
+
+
+def _acquire_local(name: str, holder: str, ttl_s: float) -> Optional[str]:
+    now = datetime.now(timezone.utc)
+    conn = _connect_local()
+    try:
+        # BEGIN IMMEDIATE takes the write lock up front so two processes on the
+        # same host cannot both see the lease as free.
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT holder, expires_at, completed FROM refresh_leases WHERE name = ?",
+            (name,),
+        ).fetchone()
+        if row is not None:
+            row_holder, expires_at, completed = row
+            if completed:
+                conn.execute("ROLLBACK")
+                return None
+            if row_holder != holder and datetime.fromisoformat(expires_at) > now:
+                conn.execute("ROLLBACK")
+                return None
+
+        token = uuid.uuid4().hex
+        conn.execute(
+            """
+            INSERT INTO refresh_leases (name, holder, expires_at, completed, token) VALUES (?, ?, ?, 0, ?)
+            ON CONFLICT(name) DO UPDATE SET
+              holder = excluded.holder, expires_at = excluded.expires_at, completed = 0, token = excluded.token
+            """,
+            (name, holder, (now + timedelta(seconds=ttl_s)).isoformat(), token),
+        )
+        conn.execute("COMMIT")
+        return token
+    finally:
+        conn.close()
+
+
+def _complete_local(name: str, holder: str, token: str) -> bool:
+    conn = _connect_local()
+    try:
+        cur = conn.execute(
+            "UPDATE refresh_leases SET completed = 1 WHERE name = ? AND holder = ? AND token = ? AND completed = 0",
+            (name, holder, token),
+        )
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def _release_local(name: str, holder: str, token: str) -> bool:
+    conn = _connect_local()
+    try:
+        cur = conn.execute(
+            "UPDATE refresh_leases SET expires_at = ? WHERE name = ? AND holder = ? AND token = ? AND completed = 0",
+            (datetime.now(timezone.utc).isoformat(), name, holder, token),
+        )
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+def acquire(name: str, ttl_s: float) -> Optional[str]:
+    """Take the named lease for this instance; returns its token, or None.
+
+    Uses the Firestore day store when enabled, otherwise a local SQLite table.
+    An unfinished lease expires after `ttl_s` so another instance can retry if
+    the holder died mid-refresh. Each acquisition gets a fresh token, which
+    `complete` and `release` must present.
+    """
+
+    if beach_day_store.enabled():
+        return beach_day_store.acquire_lease(name, instance_id(), ttl_s)
+    return _acquire_local(name, instance_id(), ttl_s)
+
+
+def complete(name: str, token: str) -> bool:
+    """Mark the work done; False if the lease has expired and been taken over meanwhile."""
+
+    if beach_day_store.enabled():
+        return beach_day_store.complete_lease(name, instance_id(), token)
+    return _complete_local(name, instance_id(), token)
+
+
+def release(name: str, token: str) -> bool:
+    """Give up an unfinished lease (e.g. after a failed run) so it can be retaken at once."""
+
+    if beach_day_store.enabled():
+        return beach_day_store.release_lease(name, instance_id(), token)
+    return _release_local(name, instance_id(), token)
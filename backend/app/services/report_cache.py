@@ -0,0 +1,254 @@
+"""
+Content-addressed cache for AI beach reports.
+
+The key is a hash of the normalized request payload plus the model and the
+prompt version, so the same beach data always maps to the same report and a
+prompt or model change never serves an old one. Entries expire at the next
+TR-midnight refresh, when the underlying data changes.
+
+Reports are kept in memory (LRU, AI_REPORT_CACHE_MAX_ENTRIES). With
+AI_REPORT_CACHE_TIER=sqlite or firestore they are also written to a shared
+tier, so other instances and restarts reuse them. Lookups are counted in
+`cache_lookups_total{cache="ai_report"}`, once per request after every place a
+report can come from was checked; `stats()` reports the hit rate.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from app.config.env import env_int
+from app.services import beach_day_store, telemetry
+from app.services.tr_time import next_tr_midnight_utc
+
+
+logger = logging.getLogger("uvicorn.error")
+
+_CACHE = "ai_report"
+
+
+def _enabled() -> bool:
+    return os.getenv("AI_REPORT_CACHE_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _tier() -> str:
+    # "" (memory only) | "sqlite" | "firestore"
+    return (os.getenv("AI_REPORT_CACHE_TIER") or "").strip().lower()
+
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, float):
+        # Float noise from re-computation must not change the key.
+        return float(f"{value:.6g}")
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def cache_key(payload: Dict[str, Any], *, model: str, prompt_version: str) -> str:
+    canonical = json.dumps(_normalize(payload), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    digest = hashlib.sha256()
+    digest.update(f"{model}\n{prompt_version}\n".encode("utf-8"))
+    digest.update(canonical.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _expires_at() -> float:
+    return next_tr_midnight_utc(datetime.now(timezone.utc)).timestamp()
+
+
+# ---------------------------------------------------------------------------
+# Memory tier
+# ---------------------------------------------------------------------------
+
+_lock = Lock()
+_memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+_hits = 0
+_misses = 0
+
+
+def _memory_get(key: str) -> Optional[str]:
+    now = time.time()
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        report, expires_at = entry
+        if expires_at <= now:
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return report
+
+
+def _memory_put(key: str, report: str, expires_at: float) -> None:
+    max_entries = env_int("AI_REPORT_CACHE_MAX_ENTRIES", 1000, minimum=1)
+    with _lock:
+        _memory[key] = (report, expires_at)
+        _memory.move_to_end(key)
+        while len(_memory) > max_entries:
+            _memory.popitem(last=False)
+
+
+# ---------------------------------------------------------------------------
+# Shared tier (SQLite / Firestore)
+# ---------------------------------------------------------------------------
+
+
+def _sqlite_path() -> str:
+    default_path = os.path.join(os.path.dirname(__file__), "..", "..", "data", "app.db")
+    return os.getenv("AI_REPORT_CACHE_DB_PATH") or os.getenv("DB_PATH", default_path)
+
+
+def _sqlite_connect() -> sqlite3.Connection:
+    path = _sqlite_path()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ai_report_cache (
+          key TEXT PRIMARY KEY,
+          report TEXT NOT NULL,
+          expires_at REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def _firestore_collection():
+    name = os.getenv("AI_REPORT_CACHE_COLLECTION", "ai_report_cache").strip() or "ai_report_cache"
+    return beach_day_store.client().collection(name)
+
+
+def _tier_get(key: str) -> Optional[Tuple[str, float]]:
+    tier = _tier()
+    if tier == "sqlite":
+        conn = _sqlite_connect()
+        try:
+            row = conn.execute("SELECT report, expires_at FROM ai_report_cache WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else (row[0], float(row[1]))
+    if tier == "firestore":
+        doc = _firestore_collection().document(key).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict() or {}
+        return str(data.get("report") or ""), float(data.get("expires_at") or 0.0)
+    return None
+
+
+def _tier_put(key: str, report: str, expires_at: float) -> None:
+    tier = _tier()
+    if tier == "sqlite":
+        conn = _sqlite_connect()
+        try:
+            # Drop expired rows while we hold the connection anyway.
+            conn.execute("DELETE FROM ai_report_cache WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_report_cache (key, report, expires_at) VALUES (?, ?, ?)",
+                (key, report, expires_at),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    elif tier == "firestore":
+        _firestore_collection().document(key).set({"report": report, "expires_at": expires_at})
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+
+def record_lookup(hit: bool) -> None:
+    """Count one cache lookup; callers that check more than this cache count the combined result."""
+
+    global _hits, _misses
+    with _lock:
+        if hit:
+            _hits += 1
+        else:
+            _misses += 1
+    telemetry.CACHE_LOOKUPS.inc(cache=_CACHE, result="hit" if hit else "miss")
+
+
+async def get(key: str, *, record: bool = True) -> Optional[str]:
+    """Cached report for `key`. With record=False the lookup is not counted (see record_lookup)."""
+
+    if not _enabled():
+        return None
+
+    report = _memory_get(key)
+    if report is None and _tier():
+        try:
+            entry = await asyncio.to_thread(_tier_get, key)
+        except Exception as e:
+            logger.warning("AI report cache read failed (%s): %s", _tier(), e)
+            entry = None
+        if entry is not None and entry[0] and entry[1] > time.time():
+            report = entry[0]
+            _memory_put(key, report, entry[1])
+
+    if record:
+        record_lookup(report is not None)
+    return report
+
+
+async def put(key: str, report: str) -> None:
+    if not _enabled() or not report:
+        return
+
+    expires_at = _expires_at()
+    _memory_put(key, report, expires_at)
+    if _tier():
+        try:
+            await asyncio.to_thread(_tier_put, key, report, expires_at)
+        except Exception as e:
+            logger.warning("AI report cache write failed (%s): %s", _tier(), e)
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        hits, misses, entries = _hits, _misses, len(_memory)
+    total = hits + misses
+    return {
+        "entries": entries,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": None if total == 0 else round(hits / total, 4),
+        "tier": _tier() or "memory",
+    }
+
+
+def _collect_hit_ratio() -> Dict[Tuple[str, ...], float]:
+    s = stats()
+    return {(): float(s["hit_rate"] or 0.0)}
+
+
+telemetry.register(
+    telemetry.Gauge("ai_report_cache_hit_ratio", "AI report cache hits / lookups since start.", [], _collect_hit_ratio)
+)
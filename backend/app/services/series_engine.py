@@ -0,0 +1,160 @@
+"""
+Columnar engine for the derived parts of a beach series.
+
+Given the per-day base values (SST, turbidity, chlorophyll, NO2, waste risk)
+as columns, it fills gaps from the previous IMPUTE_LOOKBACK_DAYS filled
+values, scores WQI (`wqi.calculate_wqi_from_components`), classifies NO2
+(`air_quality.classify_no2`) and averages the result, one column at a time.
+Only gap days are visited one by one (an imputed value feeds the lookback of
+the next gap, so that part is inherently sequential). The numbers are the
+same as the original per-day loop in `timeseries`.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from app.services.air_quality import classify_no2
+from app.services.wqi import calculate_wqi_from_components
+
+
+BASE_FIELDS = ("sst_celsius", "turbidity_ndti", "chlorophyll", "no2_mol_m2", "waste_risk_percent")
+
+# Higher is better / more "real"; WQI quality follows its least reliable component.
+_RANK = {"missing": 0, "imputed": 1, "window_avg": 2, "daily": 3}
+_RANK_NAMES = ("missing", "imputed", "window_avg", "daily")
+
+# Rounding of the averages (None = as is).
+_AVERAGE_DIGITS = {
+    "sst_celsius": 2,
+    "turbidity_ndti": 4,
+    "chlorophyll": 4,
+    "no2_mol_m2": None,
+    "wqi": 1,
+    "waste_risk_percent": 1,
+}
+
+
+def _is_number(v: Any) -> bool:
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return False
+    return not (isinstance(v, float) and math.isnan(v))
+
+
+# ---------------------------------------------------------------------------
+# Column kernels
+# ---------------------------------------------------------------------------
+
+
+def _impute(raw: Sequence[Optional[float]], lookback: int) -> List[Optional[float]]:
+    filled: List[Optional[float]] = []
+    for i, v in enumerate(raw):
+        if v is None:
+            # lookback 0 means "all earlier days", like list[-0:].
+            start = max(0, i - lookback) if lookback > 0 else 0
+            window = [x for x in filled[start:i] if x is not None]
+            v = sum(window) / len(window) if window else None
+        filled.append(v)
+    return filled
+
+
+def _wqi(sst: Sequence[Optional[float]], chl: Sequence[Optional[float]], turb: Sequence[Optional[float]]) -> List[Optional[float]]:
+    out: List[Optional[float]] = []
+    for s, c, t in zip(sst, chl, turb):
+        if s is None and c is None and t is None:
+            out.append(None)
+            continue
+        out.append(calculate_wqi_from_components(sst=s, chl=c, turb=t)["wqi"])
+    return out
+
+
+def _mean(values: Sequence[Any]) -> Optional[float]:
+    nums = [v for v in values if _is_number(v)]
+    return None if not nums else sum(nums) / len(nums)
+
+
+def _rounded(v: Optional[float], digits: Optional[int]) -> Optional[float]:
+    if v is None:
+        return None
+    return float(v) if digits is None else round(float(v), digits)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def derive_series(
+    dates: Sequence[str],
+    base: Mapping[str, Sequence[Optional[float]]],
+    sources: Mapping[str, Sequence[Optional[str]]],
+    air_quality: Sequence[Optional[str]],
+    *,
+    lookback_days: int,
+    impute: bool,
+) -> List[Dict[str, Any]]:
+    """Series rows from base-value columns.
+
+    `base[field]` holds the fetched value per day (None = no data) and
+    `sources[field]` how it was fetched ("daily", "window_avg" or None).
+    `air_quality` is the class reported with the fetched NO2 value, used
+    on days where NO2 stays missing after imputation.
+    """
+
+    n = len(dates)
+
+    values: Dict[str, List[Optional[float]]] = {}
+    for field in BASE_FIELDS:
+        raw = base[field]
+        values[field] = _impute(raw, lookback_days) if impute else list(raw)
+
+    wqi = _wqi(values["sst_celsius"], values["chlorophyll"], values["turbidity_ndti"])
+    no2_classes = [classify_no2(v) for v in values["no2_mol_m2"]]
+
+    # Fetched source, else "imputed" if a value was filled in, else "missing".
+    labels: Dict[str, List[str]] = {}
+    for field in BASE_FIELDS:
+        labels[field] = [
+            src or ("imputed" if v is not None else "missing") for src, v in zip(sources[field], values[field])
+        ]
+    wqi_ranks = [
+        min(_RANK.get(a, 0), _RANK.get(b, 0), _RANK.get(c, 0))
+        for a, b, c in zip(labels["sst_celsius"], labels["chlorophyll"], labels["turbidity_ndti"])
+    ]
+
+    rows: List[Dict[str, Any]] = []
+    for i in range(n):
+        no2_source = labels["no2_mol_m2"][i]
+        rows.append(
+            {
+                "date": dates[i],
+                "sst_celsius": _rounded(values["sst_celsius"][i], 2),
+                "turbidity_ndti": _rounded(values["turbidity_ndti"][i], 4),
+                "chlorophyll": _rounded(values["chlorophyll"][i], 4),
+                "no2_mol_m2": _rounded(values["no2_mol_m2"][i], None),
+                "air_quality": air_quality[i] if values["no2_mol_m2"][i] is None else no2_classes[i],
+                "wqi": _rounded(wqi[i], None),
+                "waste_risk_percent": _rounded(values["waste_risk_percent"][i], None),
+                "sources": {
+                    "sst_celsius": labels["sst_celsius"][i],
+                    "turbidity_ndti": labels["turbidity_ndti"][i],
+                    "chlorophyll": labels["chlorophyll"][i],
+                    "no2_mol_m2": no2_source,
+                    "air_quality": no2_source,
+                    "waste_risk_percent": labels["waste_risk_percent"][i],
+                    "wqi": "missing" if wqi[i] is None else _RANK_NAMES[wqi_ranks[i]],
+                },
+            }
+        )
+    return rows
+
+
+def series_averages(series: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Mean of each metric over the rows (non-numbers skipped), rounded like the API."""
+
+    out: Dict[str, Any] = {}
+    for field, digits in _AVERAGE_DIGITS.items():
+        v = _mean([r.get(field) for r in series])
+        out[field] = v if v is None or digits is None else round(v, digits)
+    return out
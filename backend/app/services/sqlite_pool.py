@@ -0,0 +1,148 @@
+"""
+Small thread-safe SQLite connection pool.
+
+Connections are opened lazily (up to `size`), get their pragmas once when
+they are created and are then handed out and returned in LIFO order, so a
+request pays neither the open nor the WAL negotiation. sqlite3 keeps a
+per-connection cache of prepared statements keyed by SQL text; callers that
+pass the same module-level SQL strings reuse those statements for as long as
+the connection lives.
+
+A connection that raised something other than an IntegrityError is rolled
+back before it is returned, and dropped if even that fails.
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence
+
+
+_DEFAULT_PRAGMAS = (
+    # WAL improves concurrent read/write behaviour.
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No connection was returned to the pool in time."""
+
+
+class SQLitePool:
+    def __init__(
+        self,
+        path: str,
+        size: int = 4,
+        *,
+        pragmas: Sequence[str] = _DEFAULT_PRAGMAS,
+        timeout_s: float = 30.0,
+        cached_statements: int = 64,
+    ) -> None:
+        self.path = path
+        self.size = max(1, size)
+        self.pragmas = tuple(pragmas)
+        self.timeout_s = timeout_s
+        self.cached_statements = cached_statements
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # timeout helps avoid 'database is locked' on brief concurrent writes.
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            timeout=self.timeout_s,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("SQLite pool is closed")
+            grow = self._opened < self.size
+            if grow:
+                self._opened += 1
+        if grow:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout_s)
+        except queue.Empty:
+            raise PoolTimeout(f"No SQLite connection free within {self.timeout_s:.0f}s") from None
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            closed = self._closed
+        if closed:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; any open transaction is rolled back on error."""
+
+        conn = self._acquire()
+        try:
+            yield conn
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            self._release(conn)
+            raise
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                self._discard(conn)
+                raise
+            self._release(conn)
+            raise
+        else:
+            self._release(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        idle: List[sqlite3.Connection] = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": self.size, "open": self._opened, "idle": self._idle.qsize()}
@@ -0,0 +1,190 @@
+"""
+Minimal Prometheus-compatible metrics registry.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format by `render()` (served at `/metrics`). Kept dependency-free;
+everything is in-process and resets when the instance restarts.
+"""
+
+from __future__ import annotations
+
+import bisect
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; covers fast store reads up to slow cold EE computations.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Exposition lines for this metric, header included."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at render time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self._collect = collect
+
+    def render(self) -> List[str]:
+        values = self._collect() if self._collect else {}
+        return self._header() + [
+            f"{self.name}{_fmt_labels(self.labels, k)} {_fmt_value(v)}" for k, v in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, +Inf count, sum)
+        self._values: Dict[LabelValues, Tuple[List[int], int, float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, s = self._values.get(key) or ([0] * len(self.buckets), 0, 0.0)
+            if idx < len(counts):
+                counts[idx] += 1
+            self._values[key] = (counts, total + 1, s + value)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), t, s)) for k, (c, t, s) in self._values.items())
+        lines = self._header()
+        for key, (counts, total, s) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, ('le', _fmt_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, ('le', '+Inf'))} {total}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {_fmt_value(s)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {total}")
+        return lines
+
+
+_registry: List[_Metric] = []
+_registry_lock = Lock()
+
+
+def register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = list(_registry)
+    lines: List[str] = []
+    for m in metrics:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route.", ["method", "route", "status"])
+)
+
+EE_REQUESTS = register(
+    Counter("ee_requests_total", "Earth Engine getInfo calls by dataset and outcome.", ["dataset", "outcome"])
+)
+EE_REQUEST_SECONDS = register(
+    Histogram("ee_request_duration_seconds", "Earth Engine getInfo latency by dataset.", ["dataset"])
+)
+
+STORE_OPERATIONS = register(
+    Counter("store_operations_total", "Beach day store operations.", ["op", "outcome"])
+)
+STORE_DOCUMENTS = register(
+    Counter("store_documents_total", "Beach day store documents read or written.", ["op"])
+)
+
+CACHE_LOOKUPS = register(
+    Counter("cache_lookups_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"])
+)
+
+REFRESH_SECONDS = register(
+    Histogram("refresh_duration_seconds", "Duration of refresh jobs.", ["job"])
+)
@@ -0,0 +1,74 @@
+"""
+Per-request timing breakdown.
+
+The HTTP middleware in `main.py` opens a `RequestTimings` for each request;
+code on the request path wraps interesting work in `stage("name")`. Worker
+threads (EE executor, `asyncio.to_thread`) inherit the context, so their
+stages are attributed to the request that scheduled them. Outside a request
+`stage` is a no-op.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Iterator, List, Optional
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self._lock = Lock()
+        self._stages: Dict[str, List[float]] = {}  # name -> [count, total_ms]
+        self._closed = False
+
+    def record(self, name: str, ms: float) -> None:
+        with self._lock:
+            # Background work scheduled by the request may outlive it; ignore it.
+            if self._closed:
+                return
+            entry = self._stages.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += ms
+
+    def close(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            self._closed = True
+            return {
+                name: {"count": int(count), "ms": round(total, 2)}
+                for name, (count, total) in self._stages.items()
+            }
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.record(name, (time.perf_counter() - t0) * 1000.0)
+
+
+def server_timing_header(stages: Dict[str, Dict[str, float]], total_ms: float) -> str:
+    parts = [f'{name};dur={s["ms"]:.1f};desc="n={s["count"]}"' for name, s in stages.items()]
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
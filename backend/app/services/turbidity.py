@@ -1,6 +1,9 @@
 import ee
 import os
 from datetime import datetime, timedelta
+from functools import partial
+from app.services import ee_backend
+from app.services.ee_calls import get_info
 from app.utils.geo import get_beach_buffer
 
 
@@ -23,7 +26,44 @@ def _date_range(days: int):
     return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
 
 
+def _widened_window(start_date: str, end_date: str):
+    """±1 day around a daily window, or None if the window isn't daily / can't be parsed."""
+
+    try:
+        start = _parse_ymd(start_date)
+        end = _parse_ymd(end_date)
+    except Exception:
+        return None
+
+    # Only try once for the original daily window.
+    if (end - start) <= timedelta(days=1):
+        return _fmt_ymd(start - timedelta(days=1)), _fmt_ymd(end + timedelta(days=1))
+    return None
+
+
 def get_turbidity_for_beach_in_range(beach_id: str, start_date: str, end_date: str):
+    value = _ndti_for_range(beach_id, start_date, end_date)
+    if value is None:
+        # No image in the window, or masks removed all pixels. Optionally widen
+        # the window slightly to reduce "no image in day" gaps.
+        if _FILL_GAPS_ENABLED:
+            widened = _widened_window(start_date, end_date)
+            if widened is not None:
+                return get_turbidity_for_beach_in_range(beach_id, *widened)
+        return None
+
+    return float(value)
+
+
+def _ndti_for_range(beach_id: str, start_date: str, end_date: str):
+    stats = ee_backend.region_stats(
+        "S2", S2_COLLECTION, beach_id, start_date, end_date, ["NDTI"],
+        query=partial(_query_ndti, beach_id, start_date, end_date),
+    )
+    return None if stats is None else stats.get("NDTI")
+
+
+def _query_ndti(beach_id: str, start_date: str, end_date: str):
     geometry = get_beach_buffer(beach_id)
 
     col = (
@@ -38,20 +78,7 @@ def get_turbidity_for_beach_in_range(beach_id: str, start_date: str, end_date: s
     )
 
     size = col.size()
-    if size.getInfo() == 0:
-        # Optionally widen the window slightly to reduce "no image in day" gaps.
-        if _FILL_GAPS_ENABLED:
-            try:
-                start = _parse_ymd(start_date)
-                end = _parse_ymd(end_date)
-            except Exception:
-                return None
-
-            # Only try once for the original daily window.
-            if (end - start) <= timedelta(days=1):
-                widened_start = _fmt_ymd(start - timedelta(days=1))
-                widened_end = _fmt_ymd(end + timedelta(days=1))
-                return get_turbidity_for_beach_in_range(beach_id, widened_start, widened_end)
+    if get_info(size, dataset="S2") == 0:
         return None
 
     img = col.median()
@@ -59,31 +86,16 @@ def get_turbidity_for_beach_in_range(beach_id: str, start_date: str, end_date: s
     # NDTI = (Red - Green) / (Red + Green)
     ndti = img.normalizedDifference(["B4", "B3"]).rename("NDTI")
 
-    stats = ndti.reduceRegion(
-        reducer=ee.Reducer.mean(),
-        geometry=geometry,
-        scale=20,
-        maxPixels=1e9,
-        bestEffort=True,
-    ).getInfo()
-
-    value = stats.get("NDTI")
-    if value is None:
-        if _FILL_GAPS_ENABLED:
-            # If masks remove all pixels, try a slightly widened window once.
-            try:
-                start = _parse_ymd(start_date)
-                end = _parse_ymd(end_date)
-            except Exception:
-                return None
-
-            if (end - start) <= timedelta(days=1):
-                widened_start = _fmt_ymd(start - timedelta(days=1))
-                widened_end = _fmt_ymd(end + timedelta(days=1))
-                return get_turbidity_for_beach_in_range(beach_id, widened_start, widened_end)
-        return None
-
-    return float(value)
+    return get_info(
+        ndti.reduceRegion(
+            reducer=ee.Reducer.mean(),
+            geometry=geometry,
+            scale=20,
+            maxPixels=1e9,
+            bestEffort=True,
+        ),
+        dataset="S2",
+    )
 
 
 def _mask_s2_sr(image: ee.Image) -> ee.Image:
@@ -1,9 +1,12 @@
 import os
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Optional, Tuple
 
 import ee
 
+from app.services import ee_backend
+from app.services.ee_calls import get_info
 from app.utils.geo import get_beach_buffer
 
 
@@ -77,7 +80,24 @@ def _mask_landsat_l2(image: ee.Image) -> ee.Image:
     return image.updateMask(mask)
 
 
-def _s2_indices_for_range(geometry: ee.Geometry, start_date: str, end_date: str) -> tuple[Optional[float], Optional[float]]:
+def _indices(dataset: str, collection_id: str, beach_id: str, start_date: str, end_date: str, query) -> tuple[Optional[float], Optional[float]]:
+    stats = ee_backend.region_stats(dataset, collection_id, beach_id, start_date, end_date, ["NDVI", "MNDWI"], query=query)
+    if stats is None:
+        return None, None
+    ndvi_v = stats.get("NDVI")
+    mndwi_v = stats.get("MNDWI")
+    return (None if ndvi_v is None else float(ndvi_v), None if mndwi_v is None else float(mndwi_v))
+
+
+def _s2_indices_for_range(beach_id: str, start_date: str, end_date: str) -> tuple[Optional[float], Optional[float]]:
+    return _indices(
+        "S2", _S2_COLLECTION, beach_id, start_date, end_date,
+        query=partial(_query_s2_indices, beach_id, start_date, end_date),
+    )
+
+
+def _query_s2_indices(beach_id: str, start_date: str, end_date: str) -> Optional[dict]:
+    geometry = get_beach_buffer(beach_id)
     col = (
         ee.ImageCollection(_S2_COLLECTION)
         .filterBounds(geometry)
@@ -87,28 +107,34 @@ def _s2_indices_for_range(geometry: ee.Geometry, start_date: str, end_date: str)
         .select(["B8", "B4", "B3", "B11"])  # NIR, Red, Green, SWIR
     )
 
-    if col.size().getInfo() == 0:
-        return None, None
+    if get_info(col.size(), dataset="S2") == 0:
+        return None
 
     img = col.median()
     ndvi = img.normalizedDifference(["B8", "B4"]).rename("NDVI")
     mndwi = img.normalizedDifference(["B3", "B11"]).rename("MNDWI")
 
-    stats = ndvi.addBands(mndwi).reduceRegion(
-        reducer=ee.Reducer.mean(),
-        geometry=geometry,
-        scale=20,
-        maxPixels=1e9,
-        bestEffort=True,
-    ).getInfo()
+    return get_info(
+        ndvi.addBands(mndwi).reduceRegion(
+            reducer=ee.Reducer.mean(),
+            geometry=geometry,
+            scale=20,
+            maxPixels=1e9,
+            bestEffort=True,
+        ),
+        dataset="S2",
+    )
 
-    ndvi_v = stats.get("NDVI")
-    mndwi_v = stats.get("MNDWI")
 
-    return (None if ndvi_v is None else float(ndvi_v), None if mndwi_v is None else float(mndwi_v))
+def _landsat_indices_for_range(beach_id: str, start_date: str, end_date: str) -> tuple[Optional[float], Optional[float]]:
+    return _indices(
+        "LANDSAT", _L8_COLLECTION, beach_id, start_date, end_date,
+        query=partial(_query_landsat_indices, beach_id, start_date, end_date),
+    )
 
 
-def _landsat_indices_for_range(geometry: ee.Geometry, start_date: str, end_date: str) -> tuple[Optional[float], Optional[float]]:
+def _query_landsat_indices(beach_id: str, start_date: str, end_date: str) -> Optional[dict]:
+    geometry = get_beach_buffer(beach_id)
     col = (
         ee.ImageCollection(_L8_COLLECTION)
         .merge(ee.ImageCollection(_L9_COLLECTION))
@@ -119,25 +145,23 @@ def _landsat_indices_for_range(geometry: ee.Geometry, start_date: str, end_date:
         .select(["SR_B5", "SR_B4", "SR_B3", "SR_B6"])  # NIR, Red, Green, SWIR1
     )
 
-    if col.size().getInfo() == 0:
-        return None, None
+    if get_info(col.size(), dataset="LANDSAT") == 0:
+        return None
 
     img = col.median()
     ndvi = img.normalizedDifference(["SR_B5", "SR_B4"]).rename("NDVI")
     mndwi = img.normalizedDifference(["SR_B3", "SR_B6"]).rename("MNDWI")
 
-    stats = ndvi.addBands(mndwi).reduceRegion(
-        reducer=ee.Reducer.mean(),
-        geometry=geometry,
-        scale=30,
-        maxPixels=1e9,
-        bestEffort=True,
-    ).getInfo()
-
-    ndvi_v = stats.get("NDVI")
-    mndwi_v = stats.get("MNDWI")
-
-    return (None if ndvi_v is None else float(ndvi_v), None if mndwi_v is None else float(mndwi_v))
+    return get_info(
+        ndvi.addBands(mndwi).reduceRegion(
+            reducer=ee.Reducer.mean(),
+            geometry=geometry,
+            scale=30,
+            maxPixels=1e9,
+            bestEffort=True,
+        ),
+        dataset="LANDSAT",
+    )
 
 
 def get_waste_risk_for_beach_in_range(beach_id: str, start_date: str, end_date: str) -> Optional[dict]:
@@ -153,13 +177,11 @@ def get_waste_risk_for_beach_in_range(beach_id: str, start_date: str, end_date:
     Falls back to Landsat 8/9 L2 if Sentinel-2 returns no usable pixels.
     """
 
-    geometry = get_beach_buffer(beach_id)
-
-    ndvi, mndwi = _s2_indices_for_range(geometry, start_date=start_date, end_date=end_date)
+    ndvi, mndwi = _s2_indices_for_range(beach_id, start_date=start_date, end_date=end_date)
     source = "sentinel-2"
 
     if (ndvi is None or mndwi is None) and _FILL_GAPS_ENABLED:
-        ndvi2, mndwi2 = _landsat_indices_for_range(geometry, start_date=start_date, end_date=end_date)
+        ndvi2, mndwi2 = _landsat_indices_for_range(beach_id, start_date=start_date, end_date=end_date)
         if ndvi is None:
             ndvi = ndvi2
         if mndwi is None:
@@ -178,11 +200,11 @@ def get_waste_risk_for_beach_in_range(beach_id: str, start_date: str, end_date:
         if start is not None and end is not None and (end - start) <= timedelta(days=1):
             widened_start = _fmt_ymd(start - timedelta(days=1))
             widened_end = _fmt_ymd(end + timedelta(days=1))
-            ndvi, mndwi = _s2_indices_for_range(geometry, start_date=widened_start, end_date=widened_end)
+            ndvi, mndwi = _s2_indices_for_range(beach_id, start_date=widened_start, end_date=widened_end)
             source = "sentinel-2"
 
             if (ndvi is None or mndwi is None):
-                ndvi2, mndwi2 = _landsat_indices_for_range(geometry, start_date=widened_start, end_date=widened_end)
+                ndvi2, mndwi2 = _landsat_indices_for_range(beach_id, start_date=widened_start, end_date=widened_end)
                 if ndvi is None:
                     ndvi = ndvi2
                 if mndwi is None:
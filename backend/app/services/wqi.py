@@ -1,6 +1,14 @@
 from app.services.oisst import get_sst_for_beach
 from app.services.chlorophyll import get_chlorophyll_for_beach
 from app.services.turbidity import get_turbidity_for_beach
+from app.services.timing import stage
+
+# Component weights and (good, bad) calibration points; shared with series_engine.
+WQI_WEIGHTS = {"sst": 0.25, "chlorophyll": 0.35, "turbidity": 0.40}
+SST_GOOD_BAD = (20.0, 30.0)
+CHLOROPHYLL_GOOD_BAD = (2.0, 250.0)
+TURBIDITY_GOOD_BAD = (-0.05, 0.40)
+
 
 def clamp(value: float, min_val: float = 0.0, max_val: float = 1.0) -> float:
     return max(min_val, min(value, max_val))
@@ -20,7 +28,7 @@ def normalize_sst(sst: float) -> float:
     30°C = çok kötü
     """
     # Calibrated to avoid over-penalizing typical seasonal sea temperatures.
-    return normalize_linear(sst, good=20.0, bad=30.0)
+    return normalize_linear(sst, *SST_GOOD_BAD)
 
 
 def normalize_chlorophyll(chl: float) -> float:
@@ -31,7 +39,7 @@ def normalize_chlorophyll(chl: float) -> float:
     # Calibrated so moderate chlorophyll doesn't immediately tank WQI.
     # NOTE: In this dataset chlorophyll values can be very large (>> 20).
     # Using a higher "bad" threshold avoids saturating at 1.0 for most days.
-    return normalize_linear(chl, good=2.0, bad=250.0)
+    return normalize_linear(chl, *CHLOROPHYLL_GOOD_BAD)
 
 
 def normalize_turbidity(ndti: float) -> float:
@@ -39,7 +47,7 @@ def normalize_turbidity(ndti: float) -> float:
     NDTI: lower is better
     """
     # Calibrated around typical coastal NDTI ranges so small negatives are treated as clean.
-    return normalize_linear(ndti, good=-0.05, bad=0.40)
+    return normalize_linear(ndti, *TURBIDITY_GOOD_BAD)
 
 
 def calculate_wqi_from_components(sst: float, chl: float, turb: float) -> dict:
@@ -49,14 +57,19 @@ def calculate_wqi_from_components(sst: float, chl: float, turb: float) -> dict:
     Returns same shape as calculate_wqi(). Raises ValueError if no components.
     """
 
+    with stage("wqi"):
+        return _calculate_wqi_from_components(sst=sst, chl=chl, turb=turb)
+
+
+def _calculate_wqi_from_components(sst: float, chl: float, turb: float) -> dict:
     parts: list[tuple[str, float, float]] = []  # (name, weight, normalized)
 
     if sst is not None:
-        parts.append(("sst", 0.25, normalize_sst(sst)))
+        parts.append(("sst", WQI_WEIGHTS["sst"], normalize_sst(sst)))
     if chl is not None:
-        parts.append(("chlorophyll", 0.35, normalize_chlorophyll(chl)))
+        parts.append(("chlorophyll", WQI_WEIGHTS["chlorophyll"], normalize_chlorophyll(chl)))
     if turb is not None:
-        parts.append(("turbidity", 0.40, normalize_turbidity(turb)))
+        parts.append(("turbidity", WQI_WEIGHTS["turbidity"], normalize_turbidity(turb)))
 
     if not parts:
         raise ValueError("Insufficient data for WQI calculation")
@@ -0,0 +1,201 @@
+"""
+Historical backfill for the beach day store.
+
+Usage (from backend/):
+    python -m app.tools.backfill --from 2024-01-01 --to 2025-12-31 --beaches konyaalti,belek
+
+The range is split into per-beach date chunks which are computed in parallel
+and written with batched store writes. Finished chunks are recorded in a
+checkpoint file, so re-running the same command resumes where it stopped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Set
+
+from app.data.beaches import BEACHES
+from app.services import ee_calls, ee_priority
+from app.services.daily_refresh import store_series
+from app.services.timeseries import get_beach_summary
+
+
+@dataclass(frozen=True)
+class Chunk:
+    beach_id: str
+    start: date
+    end: date  # inclusive
+
+    @property
+    def key(self) -> str:
+        return f"{self.beach_id}:{self.start.isoformat()}:{self.end.isoformat()}"
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+
+def build_chunks(beach_ids: List[str], start: date, end: date, chunk_days: int) -> List[Chunk]:
+    chunks: List[Chunk] = []
+    for beach_id in beach_ids:
+        cur = start
+        while cur <= end:
+            chunk_end = min(end, cur + timedelta(days=chunk_days - 1))
+            chunks.append(Chunk(beach_id=beach_id, start=cur, end=chunk_end))
+            cur = chunk_end + timedelta(days=1)
+    return chunks
+
+
+class Checkpoint:
+    """Set of finished chunk keys persisted as JSON (written atomically)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = Lock()
+        self.done: Set[str] = set()
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8") or "{}")
+            self.done = set(data.get("done") or [])
+
+    def mark_done(self, key: str) -> None:
+        with self._lock:
+            self.done.add(key)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps({"done": sorted(self.done)}, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+def run_chunk(chunk: Chunk, budget: Optional[ee_calls.CallBudget] = None) -> Dict[str, int]:
+    # Backfill yields to visitors and the daily refresh when sharing EE quota.
+    with ee_priority.priority(ee_priority.BACKFILL), ee_calls.spend_from(budget):
+        summary = get_beach_summary(beach_id=chunk.beach_id, days=chunk.days, end_day=chunk.end)
+    created, updated = store_series(chunk.beach_id, summary.get("series") or [])
+    return {"created": created, "updated": updated}
+
+
+def backfill(
+    chunks: List[Chunk],
+    checkpoint: Checkpoint,
+    *,
+    workers: int = 4,
+    ee_budget: Optional[int] = None,
+) -> int:
+    """Run pending chunks; returns the number of chunks that failed or were skipped.
+
+    `ee_budget` is a hard cap: every EE round-trip is charged to it, and
+    chunks still running when it is spent stop at their next request and are
+    left for the next run (nothing of theirs is stored).
+    """
+
+    pending = [c for c in chunks if c.key not in checkpoint.done]
+    print(f"[backfill] {len(chunks)} chunks, {len(chunks) - len(pending)} already done, {len(pending)} to run")
+
+    ee_start = ee_calls.call_count()
+    budget = None if ee_budget is None else ee_calls.CallBudget(ee_budget)
+    failed = 0
+    stopped = 0
+    in_flight: Dict[Future, Chunk] = {}
+
+    def _budget_left() -> bool:
+        return budget is None or not budget.exhausted()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill") as pool:
+        queue = list(pending)
+        while queue or in_flight:
+            # Keep at most `workers` chunks in flight, and stop scheduling once
+            # the EE budget is spent.
+            while queue and len(in_flight) < workers and _budget_left():
+                chunk = queue.pop(0)
+                in_flight[pool.submit(run_chunk, chunk, budget)] = chunk
+
+            if not in_flight:
+                break
+
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                chunk = in_flight.pop(fut)
+                try:
+                    result = fut.result()
+                except ee_calls.BudgetExhausted:
+                    stopped += 1
+                    continue
+                except Exception as e:
+                    failed += 1
+                    print(f"[backfill] FAILED {chunk.key}: {e}", file=sys.stderr)
+                    continue
+                checkpoint.mark_done(chunk.key)
+                print(
+                    f"[backfill] done {chunk.key} created={result['created']} updated={result['updated']} "
+                    f"ee_calls={ee_calls.call_count() - ee_start}"
+                )
+
+        if queue or stopped:
+            failed += len(queue) + stopped
+            print(
+                f"[backfill] EE budget of {ee_budget} requests reached; {len(queue) + stopped} chunks left for the next run",
+                file=sys.stderr,
+            )
+
+    print(f"[backfill] EE requests by dataset: {ee_calls.call_counts()}")
+    return failed
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.backfill", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--from", dest="start", required=True, type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", required=True, type=date.fromisoformat, help="Last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--beaches", default="", help="Comma-separated beach ids (default: all)")
+    parser.add_argument("--chunk-days", type=int, default=30, help="Days per chunk (default: 30)")
+    parser.add_argument("--workers", type=int, default=4, help="Chunks computed in parallel (default: 4)")
+    parser.add_argument("--ee-budget", type=int, default=None, help="Max Earth Engine requests for this run (hard cap; unfinished chunks resume next run)")
+    parser.add_argument(
+        "--checkpoint",
+        default=os.path.join(os.path.dirname(__file__), "..", "..", "data", "backfill_checkpoint.json"),
+        help="Checkpoint file used to resume (default: backend/data/backfill_checkpoint.json)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    if args.end < args.start:
+        print("--to must not be before --from", file=sys.stderr)
+        return 2
+    if args.chunk_days < 1:
+        print("--chunk-days must be >= 1", file=sys.stderr)
+        return 2
+
+    beach_ids = [b.strip() for b in args.beaches.split(",") if b.strip()] or list(BEACHES.keys())
+    unknown = [b for b in beach_ids if b not in BEACHES]
+    if unknown:
+        print(f"Unknown beach ids: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", "..", ".env"), override=False)
+    except Exception:
+        pass
+
+    from app.config.ee import initialize_earth_engine
+
+    initialize_earth_engine()
+
+    chunks = build_chunks(beach_ids, args.start, args.end, args.chunk_days)
+    failed = backfill(chunks, Checkpoint(Path(args.checkpoint)), workers=args.workers, ee_budget=args.ee_budget)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Benchmark suite for the EE-backed hot paths.
+
+Usage (from backend/):
+    python -m app.tools.bench                   # run and compare with the baseline
+    python -m app.tools.bench --update-baseline # record a new baseline
+
+Runs against the fake Earth Engine backend (EE_BACKEND=fake) and the
+in-memory Firestore stand-in, so results are repeatable and need no
+credentials. For each case it records wall time (median of --repeat runs),
+EE round-trips, store reads and peak allocations (tracemalloc). EE calls,
+store reads and allocations are compared with the stored baseline and the
+run fails if any grows by more than --threshold; wall time is compared with
+the looser --time-threshold since it depends on the machine.
+"""
+
+from __future__ import annotations
+
+import os
+
+# Must be set before the app modules read their configuration.
+os.environ.setdefault("EE_BACKEND", "fake")
+os.environ.setdefault("FIRESTORE_BACKEND", "memory")
+os.environ["FIRESTORE_ENABLED"] = "1"
+os.environ.setdefault("TIMING_LOG_ENABLED", "0")
+
+import argparse
+import gc
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services import beach_day_store, ee_backend, memory_firestore, series_engine
+
+
+# Fixed dates keep the fake data (and so the EE fallback paths) identical between runs.
+_END_DAY = date(2025, 7, 15)
+_BEACH_ID = "konyaalti"
+
+_DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+
+# Metrics that must not regress beyond --threshold (wall_ms uses --time-threshold).
+_COUNTED = ("ee_calls", "store_reads", "alloc_peak_kib")
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], Any]
+    setup: Optional[Callable[[], None]] = None
+
+
+def _store() -> memory_firestore.Client:
+    client = beach_day_store._get_client()
+    assert isinstance(client, memory_firestore.Client), "bench needs FIRESTORE_BACKEND=memory"
+    return client
+
+
+def _clear_store() -> None:
+    _store().clear()
+
+
+def _warm_store() -> None:
+    from app.api.metrics import _compute_missing_days
+
+    _clear_store()
+    _compute_missing_days(_BEACH_ID, 7, _END_DAY)
+
+
+def _history_columns(days: int, missing_rate: float = 0.3) -> Dict[str, Any]:
+    """Synthetic stored base values for `days` days (fixed seed), ~missing_rate gaps."""
+
+    rng = random.Random(7)
+    ranges = {
+        "sst_celsius": (16.0, 29.0),
+        "turbidity_ndti": (-0.1, 0.3),
+        "chlorophyll": (0.5, 40.0),
+        "no2_mol_m2": (0.00001, 0.00009),
+        "waste_risk_percent": (0.0, 60.0),
+    }
+    base = {f: [None if rng.random() < missing_rate else rng.uniform(*r) for _ in range(days)] for f, r in ranges.items()}
+    return {
+        "dates": [(_END_DAY - timedelta(days=days - 1 - i)).isoformat() for i in range(days)],
+        "base": base,
+        "sources": {f: ["daily" if v is not None else None for v in col] for f, col in base.items()},
+        "air_quality": ["unknown"] * days,
+    }
+
+
+def _derive_history(columns: Dict[str, Any]) -> Any:
+    rows = series_engine.derive_series(
+        columns["dates"], columns["base"], columns["sources"], columns["air_quality"], lookback_days=5, impute=True
+    )
+    return series_engine.series_averages(rows)
+
+
+def _route(client: Any, path: str) -> Callable[[], Any]:
+    def _get() -> Any:
+        resp = client.get(path)
+        if resp.status_code != 200:
+            raise RuntimeError(f"GET {path} -> {resp.status_code}: {resp.text[:200]}")
+        return resp
+
+    return _get
+
+
+def build_cases(client: Any) -> List[Case]:
+    from app.api.metrics import _assemble_series_from_store
+    from app.services.daily_refresh import refresh_all
+    from app.services.timeseries import get_beach_summary
+
+    cases = [
+        Case("get_beach_summary_7d", lambda: get_beach_summary(_BEACH_ID, days=7, end_day=_END_DAY)),
+        Case("get_beach_summary_30d", lambda: get_beach_summary(_BEACH_ID, days=30, end_day=_END_DAY)),
+        Case("refresh_all", lambda: refresh_all(as_of_day=_END_DAY, days=7, revise_days=5), setup=_clear_store),
+        Case(
+            "assemble_series_hot",
+            lambda: _assemble_series_from_store(_BEACH_ID, 7, _END_DAY),
+            setup=_warm_store,
+        ),
+        Case(
+            "assemble_series_cold",
+            lambda: _assemble_series_from_store(_BEACH_ID, 7, _END_DAY),
+            setup=_clear_store,
+        ),
+    ]
+    history = _history_columns(3 * 365)
+    cases.append(Case("derive_series_3y", lambda: _derive_history(history)))
+    for metric in ("sst", "chlorophyll", "turbidity", "wqi", "air-quality", "waste-risk"):
+        cases.append(Case(f"route_{metric}", _route(client, f"/api/metrics/{metric}?beach_id={_BEACH_ID}")))
+    return cases
+
+
+def measure(case: Case, repeat: int) -> Dict[str, Any]:
+    fake = ee_backend.fake()
+    store = _store()
+
+    walls: List[float] = []
+    ee_calls = store_reads = 0
+    for _ in range(max(1, repeat)):
+        if case.setup:
+            case.setup()
+        fake.reset()
+        store.reset_stats()
+        t0 = time.perf_counter()
+        case.run()
+        walls.append((time.perf_counter() - t0) * 1000.0)
+        # Counts are deterministic; keep the last run's.
+        ee_calls = fake.total_round_trips()
+        store_reads = store.stats()["ops"].get("read", 0)
+
+    # Separate run for allocations; tracemalloc would distort the timings.
+    if case.setup:
+        case.setup()
+    # Collect first so garbage left by earlier cases doesn't land in this peak.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(walls), 2),
+        "ee_calls": ee_calls,
+        "store_reads": store_reads,
+        "alloc_peak_kib": round(peak / 1024.0, 1),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+    time_threshold: float,
+) -> List[str]:
+    """Human-readable regressions of `results` against `baseline`."""
+
+    regressions: List[str] = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in _COUNTED + ("wall_ms",):
+            limit = time_threshold if key == "wall_ms" else threshold
+            old, new = base.get(key), current.get(key)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            # Small absolute slack so near-zero baselines don't flap.
+            slack = 1.0 if key != "alloc_peak_kib" else 16.0
+            if new > old * (1.0 + limit) + slack:
+                regressions.append(f"{name}.{key}: {old} -> {new} (+{(new - old) / max(old, 1e-9):.0%}, limit +{limit:.0%})")
+    return regressions
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.bench", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (default: 5)")
+    parser.add_argument("--only", default="", help="Comma-separated case names (default: all)")
+    parser.add_argument("--baseline", default=_DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed growth of EE calls/store reads/allocations (default: 0.10)")
+    parser.add_argument("--time-threshold", type=float, default=0.50, help="Allowed growth of wall time (default: 0.50)")
+    parser.add_argument("--ee-latency-ms", type=float, default=0.0, help="Fake EE latency per round-trip (default: 0)")
+    parser.add_argument("--json", dest="json_out", default="", help="Also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    if ee_backend.fake() is None:
+        print("bench needs EE_BACKEND=fake", file=sys.stderr)
+        return 2
+    ee_backend.fake().latency_s = args.ee_latency_ms / 1000.0
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with TestClient(app) as client:
+        cases = build_cases(client)
+        only = {c.strip() for c in args.only.split(",") if c.strip()}
+        for case in cases:
+            if only and case.name not in only:
+                continue
+            results[case.name] = measure(case, args.repeat)
+            r = results[case.name]
+            print(
+                f"[bench] {case.name:<24} wall={r['wall_ms']:>9.2f}ms ee_calls={r['ee_calls']:>4} "
+                f"store_reads={r['store_reads']:>3} alloc_peak={r['alloc_peak_kib']:>8.1f}KiB"
+            )
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        merged: Dict[str, Any] = {}
+        if baseline_path.exists() and only:
+            merged = json.loads(baseline_path.read_text(encoding="utf-8") or "{}")
+        merged.update(results)
+        baseline_path.write_text(json.dumps(merged, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"[bench] baseline written to {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"[bench] no baseline at {baseline_path}; run with --update-baseline", file=sys.stderr)
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8") or "{}")
+    regressions = compare(results, baseline, args.threshold, args.time_threshold)
+    for line in regressions:
+        print(f"[bench] REGRESSION {line}", file=sys.stderr)
+    if not regressions:
+        print("[bench] no regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""
+Load generator for the API with stand-in dependencies.
+
+Usage (from backend/):
+    python -m app.tools.loadtest --concurrency 50 --duration 60
+    python -m app.tools.loadtest --url http://127.0.0.1:8000 --concurrency 200
+
+Without --url the app is driven in-process with Earth Engine, Firestore and
+OpenAI replaced by local fakes (EE_BACKEND=fake, FIRESTORE_BACKEND=memory,
+a stub Responses API on a local port). With --url it drives a running server;
+start that one with the same environment to test several uvicorn workers or
+instances, e.g.:
+
+    EE_BACKEND=fake FIRESTORE_BACKEND=memory FORMS_STORAGE=firestore \\
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8787/v1 \\
+    uvicorn app.main:app --workers 4
+
+Each virtual user repeatedly picks a scenario by weight:
+  dashboard  beach-summary for every beach, fetched concurrently (home page)
+  detail     beach-summary for one beach (data center page)
+  ai         beach-summary for one beach, then an AI report for it
+  ai-stream  the same with the streaming (SSE) AI report endpoint
+  form       volunteer or newsletter form post
+and the tool reports throughput, p50/p95/p99 latency and error rate per route.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.data.beaches import BEACHES
+
+
+# Stand-ins used when driving the app in-process.
+_IN_PROCESS_ENV = {
+    "EE_BACKEND": "fake",
+    "FIRESTORE_BACKEND": "memory",
+    "FIRESTORE_ENABLED": "1",
+    "FORMS_STORAGE": "firestore",
+    # Every in-process request comes from one client address.
+    "FORMS_RATE_LIMIT_ENABLED": "0",
+    "OPENAI_API_KEY": "loadtest",
+    "TIMING_LOG_ENABLED": "0",
+}
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def add(self, route: str, seconds: float, status: Optional[int]) -> None:
+        self.latencies[route].append(seconds)
+        if status is None or status >= 400:
+            self.errors[route] += 1
+        self.statuses[route][status or 0] += 1
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+async def _request(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    route: str,
+    method: str,
+    path: str,
+    **kwargs: Any,
+) -> Optional[httpx.Response]:
+    t0 = time.perf_counter()
+    try:
+        resp = await client.request(method, path, **kwargs)
+    except httpx.HTTPError:
+        recorder.add(route, time.perf_counter() - t0, None)
+        return None
+    recorder.add(route, time.perf_counter() - t0, resp.status_code)
+    return resp
+
+
+def _summary_path(beach_id: str, days: int) -> str:
+    return f"/api/metrics/beach-summary?beach_id={beach_id}&days={days}"
+
+
+async def _dashboard(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random) -> None:
+    await asyncio.gather(
+        *[_request(client, recorder, "GET /api/metrics/beach-summary", "GET", _summary_path(b, 7)) for b in BEACHES]
+    )
+
+
+async def _detail(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random) -> None:
+    days = 30 if rng.random() < 0.2 else 7
+    await _request(client, recorder, "GET /api/metrics/beach-summary", "GET", _summary_path(rng.choice(list(BEACHES)), days))
+
+
+async def _report_payload(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random) -> Optional[Dict[str, Any]]:
+    beach_id = rng.choice(list(BEACHES))
+    resp = await _request(client, recorder, "GET /api/metrics/beach-summary", "GET", _summary_path(beach_id, 7))
+    if resp is None or resp.status_code != 200:
+        return None
+    summary = resp.json()
+    # Roughly what the frontend posts: beach info plus its recent history.
+    return {**summary.get("beach", {}), "history": summary.get("series", []), "currentStats": summary.get("averages", {})}
+
+
+async def _ai(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random) -> None:
+    beach = await _report_payload(client, recorder, rng)
+    if beach is None:
+        return
+    await _request(client, recorder, "POST /api/ai/beach-report", "POST", "/api/ai/beach-report", json={"beach": beach})
+
+
+async def _ai_stream(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random) -> None:
+    beach = await _report_payload(client, recorder, rng)
+    if beach is None:
+        return
+    route = "POST /api/ai/beach-report/stream"
+    t0 = time.perf_counter()
+    status: Optional[int] = None
+    try:
+        async with client.stream("POST", "/api/ai/beach-report/stream", json={"beach": beach}) as resp:
+            status = resp.status_code
+            async for line in resp.aiter_lines():
+                # An error event arrives with a 200 status; count it as a failed report.
+                if line.strip() == "event: error":
+                    status = 502
+    except httpx.HTTPError:
+        status = None
+    # Latency here is the whole stream, not time to first delta.
+    recorder.add(route, time.perf_counter() - t0, status)
+
+
+async def _form(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random) -> None:
+    email = f"lt-{uuid.uuid4().hex[:12]}@example.com"
+    if rng.random() < 0.5:
+        await _request(client, recorder, "POST /api/forms/newsletter", "POST", "/api/forms/newsletter", json={"email": email})
+        return
+    await _request(
+        client,
+        recorder,
+        "POST /api/forms/volunteer",
+        "POST",
+        "/api/forms/volunteer",
+        json={
+            "name": "Yük Testi",
+            "email": email,
+            "phone": "+90 555 000 0000",
+            "beachId": rng.choice(list(BEACHES)),
+            "date": "2025-08-01",
+            "message": None,
+        },
+    )
+
+
+SCENARIOS = {"dashboard": _dashboard, "detail": _detail, "ai": _ai, "ai-stream": _ai_stream, "form": _form}
+
+
+def _parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix: List[Tuple[str, float]] = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+async def _user(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    mix: List[Tuple[str, float]],
+    deadline: float,
+    think_s: float,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    names = [n for n, _ in mix]
+    weights = [w for _, w in mix]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        await SCENARIOS[name](client, recorder, rng)
+        if think_s > 0:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think_s)
+
+
+def report(recorder: Recorder, elapsed_s: float) -> str:
+    lines = [
+        f"{'route':<34} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}",
+    ]
+    total = errors = 0
+    for route in sorted(recorder.latencies):
+        values = sorted(recorder.latencies[route])
+        n = len(values)
+        total += n
+        errors += recorder.errors[route]
+        lines.append(
+            f"{route:<34} {n:>7} {n / elapsed_s:>8.1f} {_percentile(values, 0.50) * 1000:>8.1f} "
+            f"{_percentile(values, 0.95) * 1000:>8.1f} {_percentile(values, 0.99) * 1000:>8.1f} "
+            f"{values[-1] * 1000:>8.1f} {recorder.errors[route] / n:>7.1%}"
+        )
+        bad = {s: c for s, c in recorder.statuses[route].items() if s == 0 or s >= 400}
+        if bad:
+            lines.append(f"{'':<34} statuses: " + ", ".join(f"{s or 'conn'}={c}" for s, c in sorted(bad.items())))
+    lines.append(
+        f"total: {total} requests in {elapsed_s:.1f}s = {total / max(elapsed_s, 1e-9):.1f} req/s, "
+        f"errors {errors / max(total, 1):.1%}"
+    )
+    return "\n".join(lines)
+
+
+async def run(
+    client: httpx.AsyncClient,
+    *,
+    concurrency: int,
+    duration_s: float,
+    mix: List[Tuple[str, float]],
+    think_s: float,
+    seed: int,
+) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    t0 = time.perf_counter()
+    deadline = t0 + duration_s
+    await asyncio.gather(*[_user(client, recorder, mix, deadline, think_s, seed + i) for i in range(concurrency)])
+    return recorder, time.perf_counter() - t0
+
+
+async def _warm_store() -> None:
+    """Fill the in-memory day store the way the daily refresh would."""
+
+    from app.services import ee_priority
+    from app.services.daily_refresh import refresh_all
+    from app.services.ee_executor import run_ee
+    from app.services.tr_time import tr_today
+
+    await run_ee(refresh_all, as_of_day=tr_today(), days=7, revise_days=7, priority=ee_priority.REFRESH)
+
+
+async def _main_async(args: argparse.Namespace) -> int:
+    mix = _parse_mix(args.mix)
+    limits = httpx.Limits(max_connections=args.concurrency * len(BEACHES), max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url.rstrip("/"), limits=limits, timeout=timeout) as client:
+            recorder, elapsed = await run(
+                client, concurrency=args.concurrency, duration_s=args.duration, mix=mix, think_s=args.think_ms / 1000.0, seed=args.seed
+            )
+        print(report(recorder, elapsed))
+        return 0
+
+    from app.tools.openai_stub import create_app, serve_in_thread
+
+    stub = create_app(
+        latency_s=args.openai_latency_ms / 1000.0,
+        token_rate=args.openai_token_rate,
+        error_rate=args.openai_error_rate,
+        seed=args.seed,
+    )
+    stub_server, stub_url = serve_in_thread(stub)
+    os.environ.setdefault("OPENAI_BASE_URL", stub_url)
+
+    from app.main import app
+
+    await app.router.startup()
+    try:
+        if not args.cold:
+            print("[loadtest] warming the day store ...")
+            await _warm_store()
+        transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits, timeout=timeout) as client:
+            print(f"[loadtest] {args.concurrency} users for {args.duration:.0f}s, mix {args.mix}")
+            recorder, elapsed = await run(
+                client, concurrency=args.concurrency, duration_s=args.duration, mix=mix, think_s=args.think_ms / 1000.0, seed=args.seed
+            )
+    finally:
+        await app.router.shutdown()
+        stub_server.should_exit = True
+
+    print(report(recorder, elapsed))
+    print(f"[loadtest] stub OpenAI: {stub.state.requests} requests, {stub.state.streams} streams, {stub.state.errors} errors")
+    return 0
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.loadtest",
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", default="", help="Target a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users (default: 20)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run (default: 30)")
+    parser.add_argument(
+        "--mix",
+        default="dashboard=4,detail=3,ai=1,form=2",
+        help="Scenario weights (default: dashboard=4,detail=3,ai=1,form=2)",
+    )
+    parser.add_argument("--think-ms", type=float, default=500.0, help="Mean pause between a user's actions (default: 500)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Client timeout per request in seconds (default: 60)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cold", action="store_true", help="In-process: start with an empty day store")
+    parser.add_argument("--ee-latency-ms", type=float, default=300.0, help="In-process: fake EE round-trip latency (default: 300)")
+    parser.add_argument("--store-latency-ms", type=float, default=15.0, help="In-process: fake Firestore latency (default: 15)")
+    parser.add_argument("--openai-latency-ms", type=float, default=1500.0, help="In-process: stub OpenAI latency (default: 1500)")
+    parser.add_argument(
+        "--openai-token-rate",
+        type=float,
+        default=0.0,
+        help="In-process: stub OpenAI output tokens/s; 0 = no pacing (default: 0)",
+    )
+    parser.add_argument(
+        "--openai-error-rate",
+        type=float,
+        default=0.0,
+        help="In-process: fraction of stub OpenAI requests that fail (default: 0)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.concurrency < 1 or args.duration <= 0:
+        print("--concurrency must be >= 1 and --duration > 0", file=sys.stderr)
+        return 2
+
+    if not args.url:
+        # Must be set before the app modules read their configuration.
+        for name, value in _IN_PROCESS_ENV.items():
+            os.environ.setdefault(name, value)
+        os.environ.setdefault("EE_FAKE_LATENCY_S", str(args.ee_latency_ms / 1000.0))
+        os.environ.setdefault("FIRESTORE_MEMORY_LATENCY_S", str(args.store_latency_ms / 1000.0))
+
+    try:
+        return asyncio.run(_main_async(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
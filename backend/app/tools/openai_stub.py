@@ -0,0 +1,279 @@
+"""
+Local stand-in for the OpenAI Responses API.
+
+Usage (from backend/):
+    python -m app.tools.openai_stub --port 8787 --latency-ms 1500
+    python -m app.tools.openai_stub --token-rate 40 --error-rate 0.05 --error-status 429
+    OPENAI_BASE_URL=http://127.0.0.1:8787/v1 uvicorn app.main:app
+
+Answers `POST /v1/responses` with a canned Turkish report, so the AI report
+endpoints (caching, connection pooling, concurrency limits) can be exercised
+and benchmarked without network access, an API key or cost.
+
+- `--latency-ms` is the delay before the first byte (time to first token).
+- `--token-rate` paces the report at that many tokens (words) per second:
+  streamed as `response.output_text.delta` events with `"stream": true`,
+  or added to the delay of a plain response. 0 sends everything at once.
+- `--error-rate` answers that fraction of requests with `--error-status` and
+  an OpenAI-style error body; `--stream-error-rate` ends that fraction of
+  streams with a `response.failed` event halfway through the text.
+
+`GET /stub/stats` returns request / stream / error counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+_REPORT = (
+    "Deniz suyu sıcaklığı yüzmek için rahat görünüyor ve su kalitesi verileri genel olarak olumlu. "
+    "Hava kalitesi orta seviyede; hassas ziyaretçiler gün ortasında dikkatli olabilir. "
+    "Kıyıda atık riski sınırlı, yine de çöp kutularını kullanmak fark yaratır. "
+    "Öneri: serin saatlerde denize girip öğle sıcağında gölgede dinlenin."
+)
+
+# One "token" per word plus its trailing whitespace; close enough for pacing.
+_TOKENS = re.findall(r"\S+\s*", _REPORT)
+
+_ERROR_TYPES = {
+    400: "invalid_request_error",
+    401: "invalid_request_error",
+    429: "rate_limit_error",
+}
+
+
+def _error_body(status: int) -> Dict[str, Any]:
+    return {
+        "error": {
+            "message": f"Injected stub error ({status})",
+            "type": _ERROR_TYPES.get(status, "server_error"),
+            "param": None,
+            "code": None,
+        }
+    }
+
+
+def _input_tokens(body: Dict[str, Any]) -> int:
+    text = json.dumps(body.get("input") or "", ensure_ascii=False)
+    return max(1, len(text) // 4)
+
+
+def _response(response_id: str, model: str, status: str, text: str, input_tokens: int) -> Dict[str, Any]:
+    output: List[Dict[str, Any]] = []
+    if text:
+        output.append(
+            {
+                "id": f"msg_{response_id[5:]}",
+                "type": "message",
+                "status": status,
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        )
+    output_tokens = len(re.findall(r"\S+\s*", text))
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": status,
+        "output": output,
+        "output_text": text,
+        "usage": {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def create_app(
+    latency_s: float = 1.5,
+    *,
+    token_rate: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 500,
+    stream_error_rate: float = 0.0,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    stub = FastAPI(title="OpenAI Responses stub")
+    # Settings live on app.state so tests and tools can change them while it runs.
+    stub.state.latency_s = latency_s
+    stub.state.token_rate = token_rate
+    stub.state.error_rate = error_rate
+    stub.state.error_status = error_status
+    stub.state.stream_error_rate = stream_error_rate
+    stub.state.rng = random.Random(seed)
+    stub.state.requests = 0
+    stub.state.streams = 0
+    stub.state.errors = 0
+
+    def _token_delay() -> float:
+        rate = stub.state.token_rate
+        return 1.0 / rate if rate > 0 else 0.0
+
+    async def _events(response_id: str, model: str, input_tokens: int, fail: bool) -> AsyncIterator[str]:
+        seq = 0
+
+        def _event(kind: str, **fields: Any) -> str:
+            nonlocal seq
+            seq += 1
+            return _sse({"type": kind, "sequence_number": seq, **fields})
+
+        item_id = f"msg_{response_id[5:]}"
+        yield _event("response.created", response=_response(response_id, model, "in_progress", "", input_tokens))
+        yield _event("response.in_progress", response=_response(response_id, model, "in_progress", "", input_tokens))
+        yield _event(
+            "response.output_item.added",
+            output_index=0,
+            item={"id": item_id, "type": "message", "status": "in_progress", "role": "assistant", "content": []},
+        )
+        yield _event(
+            "response.content_part.added",
+            item_id=item_id,
+            output_index=0,
+            content_index=0,
+            part={"type": "output_text", "text": "", "annotations": []},
+        )
+
+        fail_at = len(_TOKENS) // 2 if fail else -1
+        sent: List[str] = []
+        for i, token in enumerate(_TOKENS):
+            if i == fail_at:
+                stub.state.errors += 1
+                failed = _response(response_id, model, "failed", "".join(sent), input_tokens)
+                failed["error"] = {"code": "server_error", "message": "Injected stub stream failure"}
+                yield _event("response.failed", response=failed)
+                return
+            delay = _token_delay()
+            if delay:
+                await asyncio.sleep(delay)
+            sent.append(token)
+            yield _event("response.output_text.delta", item_id=item_id, output_index=0, content_index=0, delta=token)
+
+        text = "".join(sent)
+        yield _event("response.output_text.done", item_id=item_id, output_index=0, content_index=0, text=text)
+        yield _event(
+            "response.content_part.done",
+            item_id=item_id,
+            output_index=0,
+            content_index=0,
+            part={"type": "output_text", "text": text, "annotations": []},
+        )
+        completed = _response(response_id, model, "completed", text, input_tokens)
+        yield _event("response.output_item.done", output_index=0, item=completed["output"][0])
+        yield _event("response.completed", response=completed)
+
+    @stub.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        stub.state.requests += 1
+        await asyncio.sleep(stub.state.latency_s)
+
+        rng = stub.state.rng
+        if stub.state.error_rate > 0 and rng.random() < stub.state.error_rate:
+            stub.state.errors += 1
+            status = stub.state.error_status
+            headers = {"Retry-After": "1"} if status == 429 else None
+            return JSONResponse(_error_body(status), status_code=status, headers=headers)
+
+        response_id = f"resp_{uuid.uuid4().hex}"
+        model = body.get("model") or "stub"
+        input_tokens = _input_tokens(body)
+
+        if body.get("stream"):
+            stub.state.streams += 1
+            fail = stub.state.stream_error_rate > 0 and rng.random() < stub.state.stream_error_rate
+            return StreamingResponse(
+                _events(response_id, model, input_tokens, fail),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"},
+            )
+
+        delay = _token_delay() * len(_TOKENS)
+        if delay:
+            await asyncio.sleep(delay)
+        return _response(response_id, model, "completed", _REPORT, input_tokens)
+
+    @stub.get("/stub/stats")
+    def stats() -> Dict[str, Any]:
+        return {"requests": stub.state.requests, "streams": stub.state.streams, "errors": stub.state.errors}
+
+    return stub
+
+
+def serve_in_thread(app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+    """Start `app` with uvicorn on a daemon thread; returns (server, base_url)."""
+
+    import socket
+
+    import uvicorn
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind((host, port))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True, name="openai-stub")
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://{host}:{sock.getsockname()[1]}/v1"
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.openai_stub",
+        description=__doc__.strip().splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=1500.0, help="Delay before the first byte (default: 1500)")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Output tokens per second; 0 = no pacing (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error (default: 0)")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected errors (default: 500)")
+    parser.add_argument(
+        "--stream-error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of streams ending in response.failed (default: 0)",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed for error injection")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    import uvicorn
+
+    app = create_app(
+        latency_s=args.latency_ms / 1000.0,
+        token_rate=args.token_rate,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        stream_error_rate=args.stream_error_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
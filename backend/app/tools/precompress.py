@@ -0,0 +1,85 @@
+"""
+Write precompressed variants of the built frontend.
+
+Usage (from backend/):
+    python -m app.tools.precompress static
+
+For every compressible file of at least --min-bytes, writes `<file>.gz` and
+`<file>.br` at maximum compression (--no-brotli writes only `.gz`). A variant
+is only kept when it is smaller than the original. The static file handler in
+`main.py` picks them up at startup and serves them by Accept-Encoding.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import mimetypes
+import os
+import sys
+from typing import List, Optional
+
+import brotli
+
+
+_COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest", ".ico"}
+
+
+def _compressible(name: str) -> bool:
+    ext = os.path.splitext(name)[1].lower()
+    if ext in _COMPRESSIBLE_EXTENSIONS:
+        return True
+    media_type = mimetypes.guess_type(name)[0] or ""
+    return media_type.startswith("text/")
+
+
+def precompress(root: str, min_bytes: int = 512, use_brotli: bool = True) -> int:
+    """Returns the number of variant files written."""
+
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith((".gz", ".br")) or not _compressible(name):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < min_bytes:
+                continue
+
+            variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+            if use_brotli:
+                variants[".br"] = brotli.compress(data, quality=11)
+
+            for suffix, body in variants.items():
+                if len(body) >= len(data):
+                    continue
+                tmp = path + suffix + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, path + suffix)
+                written += 1
+    return written
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.tools.precompress", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("root", help="Static directory (e.g. static)")
+    parser.add_argument("--min-bytes", type=int, default=512, help="Skip smaller files (default: 512)")
+    parser.add_argument("--no-brotli", action="store_true", help="Write only .gz variants")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    if not os.path.isdir(args.root):
+        print(f"Not a directory: {args.root}", file=sys.stderr)
+        return 2
+    use_brotli = not args.no_brotli
+    written = precompress(args.root, min_bytes=args.min_bytes, use_brotli=use_brotli)
+    print(f"[precompress] wrote {written} files under {args.root} (brotli: {'yes' if use_brotli else 'no'})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
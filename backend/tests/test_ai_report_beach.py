@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import ai_report, beach_day_store, memory_firestore, report_cache
+from app.services.tr_time import tr_today
+
+
+@pytest.fixture
+def generated(monkeypatch: pytest.MonkeyPatch) -> Iterator[List[Dict[str, Any]]]:
+    """Payloads sent to OpenAI; every call answers with a fixed report."""
+
+    payloads: List[Dict[str, Any]] = []
+
+    async def generate_coalesced(key: str, beach: Dict[str, Any], *, api_key: str, model: str) -> str:
+        payloads.append(beach)
+        return "rapor"
+
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    monkeypatch.setattr(ai_report, "generate_coalesced", generate_coalesced)
+    # Fresh memory cache so every test generates.
+    monkeypatch.setattr(report_cache, "_memory", type(report_cache._memory)())
+    yield payloads
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> Iterator[memory_firestore.Client]:
+    monkeypatch.setenv("FIRESTORE_ENABLED", "1")
+    client = memory_firestore.Client()
+    beach_day_store.use_client(client)
+    yield client
+    beach_day_store.use_client(None)
+
+
+def test_get_without_the_store_builds_the_payload_from_earth_engine(
+    monkeypatch: pytest.MonkeyPatch, generated: List[Dict[str, Any]]
+) -> None:
+    monkeypatch.setenv("FIRESTORE_ENABLED", "0")
+
+    res = TestClient(app).get("/api/ai/beach-report", params={"beach_id": "konyaalti", "days": 3})
+
+    assert res.status_code == 200
+    assert res.json() == {"report": "rapor", "cached": False}
+    assert generated[0]["id"] == "konyaalti"
+    assert generated[0]["averages"]["days"] == 3
+    assert generated[0]["date"] == tr_today().isoformat()
+
+
+def test_get_rejects_unknown_beaches_and_out_of_range_days(generated: List[Dict[str, Any]]) -> None:
+    client = TestClient(app)
+    assert client.get("/api/ai/beach-report", params={"beach_id": "nowhere"}).status_code == 404
+    assert client.get("/api/ai/beach-report", params={"beach_id": "konyaalti", "days": 31}).status_code == 422
+
+
+def test_stored_days_are_used_and_the_default_window_report_is_stored(
+    store: memory_firestore.Client, generated: List[Dict[str, Any]]
+) -> None:
+    day = date(2025, 7, 15)
+    for d, sst in ((date(2025, 7, 10), 22.0), (day, 24.0)):
+        beach_day_store.upsert_day("konyaalti", d.isoformat(), {"date": d.isoformat(), "sst_celsius": sst, "wqi": 70.0})
+
+    result = asyncio.run(ai_report.report_for_beach("konyaalti", day, api_key="k", model="m"))
+
+    assert result is not None and result["report"] == "rapor" and not result["cached"]
+    assert generated[0]["latest"]["sst_celsius"] == 24.0
+    assert generated[0]["averages"]["sst_celsius"] == 23.0
+    assert ai_report.stored_report("konyaalti", day.isoformat())["key"] == result["key"]
+
+    # Another window is computed from the stored days too, but not stored over the day's report.
+    other = asyncio.run(ai_report.report_for_beach("konyaalti", day, days=3, api_key="k", model="m"))
+    assert other is not None and other["key"] != result["key"]
+    assert ai_report.stored_report("konyaalti", day.isoformat())["key"] == result["key"]
+
+
+def test_pregeneration_does_not_compute_missing_days(
+    store: memory_firestore.Client, generated: List[Dict[str, Any]]
+) -> None:
+    result = asyncio.run(
+        ai_report.report_for_beach("konyaalti", date(2025, 7, 15), api_key="k", model="m", compute_missing=False)
+    )
+
+    assert result is None
+    assert generated == []
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from app.services import ai_report
+from app.services.ai_report import OpenAIBusy, OpenAIError
+
+
+class _Upstream:
+    """Stand-in for `generate`: records calls and answers when released."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.calls: List[Dict[str, Any]] = []
+        self.fail = fail
+        self.release: "asyncio.Event | None" = None
+
+    async def __call__(self, beach: Dict[str, Any], *, api_key: str, model: str) -> str:
+        self.calls.append(beach)
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise OpenAIError("upstream failed")
+        return f"report for {beach['id']}"
+
+
+@pytest.fixture
+def upstream(monkeypatch: pytest.MonkeyPatch) -> _Upstream:
+    fake = _Upstream()
+    monkeypatch.setattr(ai_report, "generate", fake)
+    monkeypatch.setattr(ai_report, "_limiter", ai_report._Limiter())
+    monkeypatch.setattr(ai_report, "_inflight", {})
+    return fake
+
+
+def _generate(key: str, beach_id: str = "konyaalti"):
+    return ai_report.generate_coalesced(key, {"id": beach_id}, api_key="k", model="m")
+
+
+def test_identical_requests_share_one_upstream_call(upstream: _Upstream) -> None:
+    async def run():
+        upstream.release = asyncio.Event()
+        waiters = [asyncio.ensure_future(_generate("same")) for _ in range(5)]
+        other = asyncio.ensure_future(_generate("other", "belek"))
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+        return await asyncio.gather(*waiters), await other
+
+    same, other = asyncio.run(run())
+
+    assert same == ["report for konyaalti"] * 5
+    assert other == "report for belek"
+    assert len(upstream.calls) == 2
+    assert ai_report._inflight == {}
+
+
+def test_a_cancelled_waiter_does_not_cancel_the_shared_call(upstream: _Upstream) -> None:
+    async def run():
+        upstream.release = asyncio.Event()
+        first = asyncio.ensure_future(_generate("same"))
+        second = asyncio.ensure_future(_generate("same"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        upstream.release.set()
+        return await second, first.cancelled()
+
+    assert asyncio.run(run()) == ("report for konyaalti", True)
+    assert len(upstream.calls) == 1
+
+
+def test_a_failure_reaches_every_waiter_and_is_not_cached(upstream: _Upstream) -> None:
+    upstream.fail = True
+
+    async def run():
+        results = await asyncio.gather(_generate("same"), _generate("same"), return_exceptions=True)
+        upstream.fail = False
+        return results, await _generate("same")
+
+    failed, retried = asyncio.run(run())
+
+    assert all(isinstance(r, OpenAIError) for r in failed)
+    assert retried == "report for konyaalti"
+    assert len(upstream.calls) == 2
+
+
+def test_limiter_rejects_when_the_queue_is_full(upstream: _Upstream, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_MAX_INFLIGHT", "1")
+    monkeypatch.setenv("OPENAI_MAX_QUEUE", "0")
+
+    async def run():
+        upstream.release = asyncio.Event()
+        running = asyncio.ensure_future(_generate("a"))
+        await asyncio.sleep(0.01)
+        assert ai_report.limiter().queue_full()
+        with pytest.raises(OpenAIBusy):
+            await _generate("b", "belek")
+        upstream.release.set()
+        return await running
+
+    assert asyncio.run(run()) == "report for konyaalti"
+    assert len(upstream.calls) == 1
+
+
+def test_limiter_gives_up_after_the_queue_timeout(upstream: _Upstream, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_MAX_INFLIGHT", "1")
+    monkeypatch.setenv("OPENAI_MAX_QUEUE", "1")
+    monkeypatch.setenv("OPENAI_QUEUE_TIMEOUT_S", "0.05")
+
+    async def run():
+        upstream.release = asyncio.Event()
+        running = asyncio.ensure_future(_generate("a"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(OpenAIBusy):
+            await _generate("b", "belek")
+        assert ai_report.limiter().waiting == 0
+        upstream.release.set()
+        return await running
+
+    assert asyncio.run(run()) == "report for konyaalti"
+    assert ai_report.limiter().running == 0
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from app.services import ai_report, openai_client
+
+
+def _client_answering(body: str) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def _collect() -> List[str]:
+    return [delta async for delta in ai_report.stream({"id": "konyaalti"}, api_key="k", model="m")]
+
+
+def test_stream_yields_text_deltas(monkeypatch: pytest.MonkeyPatch) -> None:
+    body = 'data: {"type": "response.output_text.delta", "delta": "Merhaba"}\n\ndata: [DONE]\n\n'
+    monkeypatch.setattr(openai_client, "get_client", lambda: _client_answering(body))
+    assert asyncio.run(_collect()) == ["Merhaba"]
+
+
+def test_malformed_event_raises_openai_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    body = 'data: {"type": "response.output_text.delta", "delta": "Mer\n\n'
+    monkeypatch.setattr(openai_client, "get_client", lambda: _client_answering(body))
+    with pytest.raises(ai_report.OpenAIError):
+        asyncio.run(_collect())
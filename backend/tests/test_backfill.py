@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from app.services import beach_day_store, ee_backend, ee_calls, memory_firestore
+from app.tools import backfill
+
+
+@pytest.fixture(autouse=True)
+def fake_ee(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    if ee_backend.fake() is None:
+        pytest.skip("needs EE_BACKEND=fake")
+    monkeypatch.setenv("FIRESTORE_ENABLED", "1")
+    beach_day_store.use_client(memory_firestore.Client())
+    yield
+    beach_day_store.use_client(None)
+
+
+def _chunks() -> list:
+    return backfill.build_chunks(["konyaalti", "belek"], date(2025, 6, 1), date(2025, 6, 20), chunk_days=5)
+
+
+def test_budget_is_a_hard_cap_and_the_rest_resumes(tmp_path: Path) -> None:
+    chunks = _chunks()
+    checkpoint = backfill.Checkpoint(tmp_path / "checkpoint.json")
+
+    start = ee_calls.call_count()
+    left = backfill.backfill(chunks, checkpoint, workers=2, ee_budget=300)
+    assert ee_calls.call_count() - start <= 300
+    assert 0 < left < len(chunks)
+    assert len(checkpoint.done) == len(chunks) - left
+
+    # Re-running without a budget only computes what is left.
+    resumed = backfill.Checkpoint(tmp_path / "checkpoint.json")
+    assert backfill.backfill(chunks, resumed, workers=4) == 0
+    assert resumed.done == {c.key for c in chunks}
+
+
+def test_chunks_cover_the_range_without_overlap() -> None:
+    chunks = backfill.build_chunks(["konyaalti"], date(2025, 1, 1), date(2025, 1, 12), chunk_days=5)
+    assert [(c.start.day, c.end.day) for c in chunks] == [(1, 5), (6, 10), (11, 12)]
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from app.services import oisst
+from app.tools import bench
+
+
+_BASE = {"case": {"wall_ms": 10.0, "ee_calls": 100, "store_reads": 4, "alloc_peak_kib": 200.0}}
+
+
+def _run(**current):
+    results = {"case": dict(_BASE["case"], **current)}
+    return bench.compare(results, _BASE, threshold=0.10, time_threshold=0.50)
+
+
+def test_compare_passes_within_the_thresholds() -> None:
+    assert _run(ee_calls=110, store_reads=5, alloc_peak_kib=236.0, wall_ms=16.0) == []
+
+
+def test_compare_flags_counted_metrics_beyond_the_threshold() -> None:
+    regressions = _run(ee_calls=112)
+    assert len(regressions) == 1 and regressions[0].startswith("case.ee_calls: 100 -> 112")
+
+
+def test_compare_uses_the_looser_time_threshold_for_wall_time() -> None:
+    assert _run(wall_ms=15.9) == []
+    assert [r.split(":")[0] for r in _run(wall_ms=17.0)] == ["case.wall_ms"]
+
+
+def test_compare_slack_keeps_near_zero_baselines_quiet() -> None:
+    baseline = {"case": {"ee_calls": 0, "store_reads": 0, "alloc_peak_kib": 0.0}}
+    assert bench.compare({"case": {"ee_calls": 1, "store_reads": 1, "alloc_peak_kib": 15.0}}, baseline, 0.10, 0.50) == []
+    regressions = bench.compare({"case": {"ee_calls": 2}}, baseline, 0.10, 0.50)
+    assert len(regressions) == 1 and regressions[0].startswith("case.ee_calls: 0 -> 2")
+
+
+def test_compare_ignores_cases_missing_from_the_baseline() -> None:
+    assert bench.compare({"new_case": {"ee_calls": 10**6}}, _BASE, 0.10, 0.50) == []
+
+
+def test_measure_counts_ee_round_trips_deterministically() -> None:
+    case = bench.Case("sst", lambda: oisst.get_sst_for_beach_in_range(bench._BEACH_ID, "2025-07-08", "2025-07-15"))
+
+    first = bench.measure(case, repeat=2)
+    second = bench.measure(case, repeat=1)
+
+    assert first["ee_calls"] == second["ee_calls"] == 2
+    assert first["store_reads"] == 0
+    assert first["alloc_peak_kib"] > 0
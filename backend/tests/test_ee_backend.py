@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+
+from app.services import ee_backend, oisst, waste_risk
+
+
+@pytest.fixture
+def live(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """No fake installed: services must take their live query path."""
+
+    previous = ee_backend._fake
+    monkeypatch.setenv("EE_BACKEND", "live")
+    ee_backend.use_fake(None)
+    try:
+        yield
+    finally:
+        ee_backend.use_fake(previous)
+
+
+def test_fake_answers_without_running_the_live_query() -> None:
+    fake = ee_backend.FakeEEBackend(seed="7")
+    previous = ee_backend._fake
+    ee_backend.use_fake(fake)
+    try:
+        def boom():
+            raise AssertionError("live query must not run under the fake backend")
+
+        stats = ee_backend.region_stats(
+            "OISST", oisst.OISST_COLLECTION, "belek", "2024-07-01", "2024-07-08", ["sst"], query=boom
+        )
+    finally:
+        ee_backend.use_fake(previous)
+
+    assert stats is not None and isinstance(stats["sst"], float)
+
+
+def test_live_backend_runs_the_service_query(live: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    seen = []
+
+    def query(beach_id, start_date, end_date):
+        seen.append((beach_id, start_date, end_date))
+        return {"sst": 2150}
+
+    monkeypatch.setattr(oisst, "_query_sst", query)
+
+    assert oisst.get_sst_for_beach_in_range("belek", "2024-07-01", "2024-07-08") == pytest.approx(21.5)
+    assert seen == [("belek", "2024-07-01", "2024-07-08")]
+
+
+def test_waste_risk_indices_do_not_need_a_fake(live: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(waste_risk, "_query_s2_indices", lambda *args: None)
+    monkeypatch.setattr(waste_risk, "_query_landsat_indices", lambda *args: {"NDVI": 0.2, "MNDWI": None})
+
+    assert waste_risk._s2_indices_for_range("belek", "2024-07-01", "2024-07-02") == (None, None)
+    assert waste_risk._landsat_indices_for_range("belek", "2024-07-01", "2024-07-02") == (0.2, None)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services import ee_calls, ee_executor, ee_priority
+from app.services.ee_calls import DeadlineExceeded
+
+
+class _Slow:
+    """Stand-in EE object whose getInfo blocks for a while."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.calls = 0
+
+    def getInfo(self) -> int:
+        self.calls += 1
+        time.sleep(self.seconds)
+        return self.calls
+
+
+def test_run_ee_returns_the_result() -> None:
+    assert asyncio.run(ee_executor.run_ee(lambda a, b: a + b, 2, b=3, timeout_s=5)) == 5
+
+
+def test_run_ee_raises_deadline_exceeded_when_the_caller_gives_up() -> None:
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(ee_executor.run_ee(time.sleep, 0.5, timeout_s=0.05))
+
+
+def test_work_stops_at_the_next_getinfo_after_the_deadline() -> None:
+    slow = _Slow(0.05)
+
+    def _job() -> None:
+        for _ in range(20):
+            ee_calls.get_info(slow, dataset="test")
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(ee_executor.run_ee(_job, timeout_s=0.12))
+    time.sleep(0.2)
+    # The job stopped after the deadline instead of making all 20 calls.
+    assert slow.calls < 6
+
+
+def test_background_jobs_use_their_own_pool() -> None:
+    names = {}
+
+    def _thread_name(key: str) -> None:
+        names[key] = threading.current_thread().name
+
+    async def _scenario() -> None:
+        await ee_executor.run_ee(_thread_name, "visitor", timeout_s=5)
+        await ee_executor.run_ee(_thread_name, "refresh", priority=ee_priority.REFRESH)
+
+    asyncio.run(_scenario())
+    assert names["visitor"].startswith("ee_")
+    assert names["refresh"].startswith("ee-batch")
+    assert ee_priority.current() == ee_priority.INTERACTIVE
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List
+
+import pytest
+
+from app.services import ee_priority
+from app.services.ee_priority import BACKFILL, INTERACTIVE, REFRESH, PriorityGate
+
+
+def _waiter(gate: PriorityGate, cls: str, order: List[str], hold_s: float = 0.0) -> threading.Thread:
+    def _run() -> None:
+        assert gate.acquire(cls, timeout=5)
+        order.append(cls)
+        time.sleep(hold_s)
+        gate.release(cls)
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    return thread
+
+
+def _wait_queued(gate: PriorityGate, cls: str, n: int) -> None:
+    deadline = time.monotonic() + 5
+    while gate.snapshot()[cls]["queued"] < n:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_waiters_are_served_by_class_then_fifo() -> None:
+    gate = PriorityGate(slots=1)
+    assert gate.acquire(INTERACTIVE)
+    order: List[str] = []
+
+    threads = [_waiter(gate, BACKFILL, order)]
+    _wait_queued(gate, BACKFILL, 1)
+    threads.append(_waiter(gate, REFRESH, order))
+    _wait_queued(gate, REFRESH, 1)
+    threads.append(_waiter(gate, INTERACTIVE, order))
+    _wait_queued(gate, INTERACTIVE, 1)
+
+    gate.release(INTERACTIVE)
+    for thread in threads:
+        thread.join(5)
+    assert order == [INTERACTIVE, REFRESH, BACKFILL]
+
+
+def test_batch_work_cannot_take_the_reserved_slot() -> None:
+    gate = PriorityGate(slots=2, interactive_reserved=1)
+    assert gate.acquire(REFRESH, timeout=0.1)
+    assert not gate.acquire(BACKFILL, timeout=0.05)
+    assert gate.acquire(INTERACTIVE, timeout=0.1)
+    assert gate.snapshot()[REFRESH] == {"queued": 0, "running": 1}
+
+
+def test_timed_out_waiter_leaves_the_queue() -> None:
+    gate = PriorityGate(slots=1)
+    assert gate.acquire(BACKFILL)
+    assert not gate.acquire(INTERACTIVE, timeout=0.05)
+    gate.release(BACKFILL)
+    # The abandoned entry must not block later callers.
+    assert gate.acquire(REFRESH, timeout=0.1)
+    assert gate.snapshot()[INTERACTIVE]["queued"] == 0
+
+
+def test_priority_context_tags_calls() -> None:
+    assert ee_priority.current() == INTERACTIVE
+    with ee_priority.priority(BACKFILL):
+        assert ee_priority.current() == BACKFILL
+    assert ee_priority.current() == INTERACTIVE
+    with pytest.raises(ValueError):
+        with ee_priority.priority("urgent"):
+            pass
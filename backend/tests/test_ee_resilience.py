@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.services import ee_calls, ee_resilience
+from app.services.ee_resilience import CircuitBreaker, TokenBucket
+
+
+class _Computed:
+    def __init__(self, *results) -> None:
+        self.results = list(results)
+        self.calls = 0
+
+    def getInfo(self):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+class _Local(_Computed):
+    uses_ee_quota = False
+
+
+@pytest.fixture(autouse=True)
+def fresh_resilience(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ee_resilience, "_bucket", TokenBucket(rate_per_s=1.0, burst=1.0))
+    monkeypatch.setattr(ee_resilience, "_breaker", CircuitBreaker(failure_threshold=2, cooldown_s=60.0))
+    monkeypatch.setenv("EE_RETRY_BASE_S", "0")
+
+
+def test_token_bucket_allows_the_burst_then_waits() -> None:
+    bucket = TokenBucket(rate_per_s=20.0, burst=2.0)
+    assert bucket.take(timeout=0) and bucket.take(timeout=0)
+    assert not bucket.take(timeout=0.01)
+    t0 = time.monotonic()
+    assert bucket.take(timeout=1.0)
+    assert time.monotonic() - t0 >= 0.03
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, cooldown_s=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # the half-open probe
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_transient_errors_are_retried() -> None:
+    obj = _Local(TimeoutError("timed out"), 42)
+    assert ee_calls.get_info(obj, dataset="test") == 42
+    assert obj.calls == 2
+
+
+def test_other_errors_propagate_unchanged() -> None:
+    with pytest.raises(KeyError):
+        ee_calls.get_info(_Local(KeyError("band")), dataset="test")
+    assert ee_resilience.breaker().state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_fails_fast() -> None:
+    obj = _Local(*[TimeoutError("timed out")] * 10)
+    with pytest.raises(ee_calls.EEUnavailable):
+        ee_calls.get_info(obj, dataset="test")
+    calls = obj.calls
+    with pytest.raises(ee_calls.EEUnavailable):
+        ee_calls.get_info(obj, dataset="test")
+    assert obj.calls == calls
+
+
+def test_local_calls_skip_the_rate_limit() -> None:
+    # The bucket holds one token and refills once a second.
+    t0 = time.monotonic()
+    for _ in range(20):
+        ee_calls.get_info(_Local(1), dataset="test")
+    assert time.monotonic() - t0 < 0.5
+
+
+def test_ee_calls_are_rate_limited() -> None:
+    ee_calls.get_info(_Computed(1), dataset="test")
+    with ee_calls.deadline(0.2):
+        with pytest.raises(ee_calls.DeadlineExceeded):
+            ee_calls.get_info(_Computed(1), dataset="test")
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import pytest
+
+from app.config.env import env_float, env_int
+
+
+def test_env_int_clamps_and_falls_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("TEST_ENV_VALUE", raising=False)
+    assert env_int("TEST_ENV_VALUE", 4, minimum=1) == 4
+    monkeypatch.setenv("TEST_ENV_VALUE", "0")
+    assert env_int("TEST_ENV_VALUE", 4, minimum=1) == 1
+    monkeypatch.setenv("TEST_ENV_VALUE", "99")
+    assert env_int("TEST_ENV_VALUE", 4, 0, 11) == 11
+    monkeypatch.setenv("TEST_ENV_VALUE", "many")
+    assert env_int("TEST_ENV_VALUE", 4, minimum=1) == 4
+
+
+def test_env_float_is_never_negative_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TEST_ENV_VALUE", "-2.5")
+    assert env_float("TEST_ENV_VALUE", 1.0) == 0.0
+    monkeypatch.setenv("TEST_ENV_VALUE", "0.25")
+    assert env_float("TEST_ENV_VALUE", 1.0) == 0.25
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import form_exports, forms
+from app.api.forms import _Signup
+from app.main import app
+from app.services import memory_firestore
+
+
+def _volunteer(i: int, beach_id: str, name: str = "") -> _Signup:
+    doc = {f: f"{f}-{i}" for f in forms._VOLUNTEER_FIELDS}
+    doc.update(beach_id=beach_id, preferred_date="2025-08-01", name=name or f"name-{i}")
+    return _Signup(kind="volunteer", doc_id=f"v{i:03d}", doc=doc)
+
+
+@pytest.fixture(params=["sqlite", "firestore"])
+def storage(request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    monkeypatch.setenv("FORMS_STORAGE", request.param)
+    monkeypatch.setenv("EXPORT_TOKEN", "secret")
+    monkeypatch.setenv("EXPORT_PAGE_SIZE", "2")
+    if request.param == "sqlite":
+        monkeypatch.setenv("DB_PATH", str(tmp_path / "forms.db"))
+        forms._init_db()
+        flush = forms._flush_sqlite
+    else:
+        client = memory_firestore.Client()
+        monkeypatch.setattr(forms, "_get_firestore_client", lambda: client)
+        monkeypatch.setattr(form_exports, "_get_firestore_client", lambda: client)
+        flush = forms._flush_firestore
+    flush([_volunteer(i, "konyaalti" if i % 2 else "belek") for i in range(7)])
+    yield request.param
+    forms._close_db()
+
+
+def _get(path: str, **params: str):
+    return TestClient(app).get(path, params=params, headers={"X-Export-Token": "secret"})
+
+
+def test_keyset_pages_cover_every_row_once(storage: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    pages = []
+    original = form_exports._csv_chunks
+
+    def counting(columns, page_iter):
+        def tracked():
+            for rows in page_iter:
+                pages.append(len(rows))
+                yield rows
+        return original(columns, tracked())
+
+    monkeypatch.setattr(form_exports, "_csv_chunks", counting)
+    res = _get("/api/forms/export/volunteers")
+
+    assert res.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert sorted(r["name"] for r in rows) == [f"name-{i}" for i in range(7)]
+    assert pages == [2, 2, 2, 1]
+
+
+def test_filters_apply_across_pages(storage: str) -> None:
+    res = _get("/api/forms/export/volunteers", format="ndjson", beach_id="konyaalti", preferred_date="2025-08-01")
+
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert sorted(r["name"] for r in rows) == ["name-1", "name-3", "name-5"]
+    assert all("ip" not in r for r in rows)
+
+
+def test_csv_cells_that_look_like_formulas_are_quoted(storage: str) -> None:
+    flush = forms._flush_sqlite if storage == "sqlite" else forms._flush_firestore
+    flush([_volunteer(90, "side", name="=HYPERLINK(\"http://x\")"), _volunteer(91, "side", name="@SUM(A1)")])
+
+    res = _get("/api/forms/export/volunteers", beach_id="side")
+
+    names = [r["name"] for r in csv.DictReader(io.StringIO(res.text))]
+    assert sorted(names) == ["'=HYPERLINK(\"http://x\")", "'@SUM(A1)"]
+
+
+def test_export_needs_the_token(storage: str) -> None:
+    assert TestClient(app).get("/api/forms/export/newsletter").status_code == 401
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import pytest
+from starlette.requests import Request
+
+from app.api.forms import _client_ip
+
+
+def _request(forwarded: Optional[str]) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+def test_forwarded_for_ignored_unless_trusted(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("FORMS_TRUST_FORWARDED_FOR", raising=False)
+    assert _client_ip(_request("1.2.3.4")) == "10.0.0.1"
+
+
+def test_spoofed_leftmost_entry_is_not_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("FORMS_TRUST_FORWARDED_FOR", "1")
+    monkeypatch.delenv("FORMS_TRUSTED_PROXY_HOPS", raising=False)
+    assert _client_ip(_request("6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+
+
+def test_trusted_hops_count_from_the_right(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("FORMS_TRUST_FORWARDED_FOR", "1")
+    monkeypatch.setenv("FORMS_TRUSTED_PROXY_HOPS", "2")
+    assert _client_ip(_request("6.6.6.6, 203.0.113.7, 35.191.0.1")) == "203.0.113.7"
+    assert _client_ip(_request("203.0.113.7")) == "203.0.113.7"
+    assert _client_ip(_request(" , ")) == "10.0.0.1"
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from app.api import forms
+from app.api.forms import _Signup
+from app.services import memory_firestore
+
+
+def _newsletter(email: str) -> _Signup:
+    return _Signup(kind="newsletter", doc_id=email, doc={"created_at": "t", "ip": None, "user_agent": None, "email": email})
+
+
+def _volunteer(name: str) -> _Signup:
+    doc = {f: "x" for f in forms._VOLUNTEER_FIELDS}
+    doc["name"] = name
+    return _Signup(kind="volunteer", doc_id=name, doc=doc)
+
+
+@pytest.fixture
+def sqlite_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "forms.db"))
+    forms._init_db()
+    yield
+    forms._close_db()
+
+
+@pytest.fixture
+def firestore(monkeypatch: pytest.MonkeyPatch) -> memory_firestore.Client:
+    client = memory_firestore.Client()
+    monkeypatch.setattr(forms, "_get_firestore_client", lambda: client)
+    return client
+
+
+def test_sqlite_existing_address_is_not_created_and_does_not_fail_the_batch(sqlite_db: None) -> None:
+    assert forms._flush_sqlite([_newsletter("a@x.org")]) == [True]
+
+    items = [_newsletter("a@x.org"), _volunteer("v"), _newsletter("b@x.org"), _newsletter("b@x.org")]
+    assert forms._flush_sqlite(items) == [False, True, True, False]
+
+    with forms._get_pool().connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM newsletter_signups").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM volunteer_signups").fetchone()[0] == 1
+
+
+def test_sqlite_other_constraint_errors_still_raise(sqlite_db: None) -> None:
+    bad = _newsletter("c@x.org")
+    bad.doc["created_at"] = None  # NOT NULL
+    with pytest.raises(forms.sqlite3.IntegrityError):
+        forms._flush_sqlite([bad])
+    assert forms._sqlite_item_error(forms.sqlite3.IntegrityError("x"))
+    assert not forms._sqlite_item_error(forms.sqlite3.OperationalError("database is locked"))
+
+
+def test_firestore_falls_back_per_item_when_an_address_exists(firestore: memory_firestore.Client) -> None:
+    forms._flush_firestore([_newsletter("a@x.org")])
+
+    items = [_newsletter("b@x.org"), _newsletter("a@x.org"), _volunteer("v")]
+    assert forms._flush_firestore(items) == [True, False, True]
+
+    assert firestore.collection("newsletter_signups").document("b@x.org").get().exists
+    assert firestore.collection("volunteer_signups").document("v").get().exists
+
+
+def test_firestore_per_item_retry_checks_existence_before_creating(
+    firestore: memory_firestore.Client, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    forms._flush_firestore([_newsletter("a@x.org")])
+    created = []
+    original = memory_firestore.DocumentReference.create
+
+    def create(self, data):
+        created.append(self.id)
+        return original(self, data)
+
+    monkeypatch.setattr(memory_firestore.DocumentReference, "create", create)
+
+    assert forms._flush_firestore([_newsletter("a@x.org"), _newsletter("b@x.org")]) == [False, True]
+    assert created == ["b@x.org"]
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, List
+
+import pytest
+
+from app.services.group_commit import GroupCommitQueue
+
+
+class _Recorder:
+    """flush() that records batches, can be held open and rejects "bad" items."""
+
+    def __init__(self) -> None:
+        self.batches: List[List[Any]] = []
+        self.release = threading.Event()
+        self.release.set()
+        self.entered = threading.Event()
+
+    def __call__(self, items: List[Any]) -> List[Any]:
+        self.entered.set()
+        self.release.wait(5)
+        if "bad" in items:
+            raise ValueError("bad row")
+        self.batches.append(list(items))
+        return [f"ok:{item}" for item in items]
+
+
+def _queue(flush: Any, **kwargs: Any) -> GroupCommitQueue:
+    kwargs.setdefault("window_s", 0.02)
+    kwargs.setdefault("retry_backoff_s", 0.0)
+    return GroupCommitQueue("test", flush, **kwargs)
+
+
+def test_items_submitted_together_share_a_commit() -> None:
+    flush = _Recorder()
+    q = _queue(flush)
+    futures = [q.submit(i) for i in range(10)]
+    assert [f.result(timeout=5) for f in futures] == [f"ok:{i}" for i in range(10)]
+    assert len(flush.batches) < 10
+    q.close()
+
+
+def test_cancelled_waiter_does_not_break_its_batch() -> None:
+    flush = _Recorder()
+    q = _queue(flush)
+
+    # Hold the writer in a first batch so the next items queue up behind it.
+    flush.release.clear()
+    first = q.submit("first")
+    assert flush.entered.wait(5)
+
+    cancelled = q.submit("gone")
+    kept = q.submit("kept")
+    assert cancelled.cancel()
+    flush.release.set()
+
+    assert first.result(timeout=5) == "ok:first"
+    assert kept.result(timeout=5) == "ok:kept"
+    assert all("gone" not in batch for batch in flush.batches)
+    assert q._thread is not None and q._thread.is_alive()
+    assert q.submit("later").result(timeout=5) == "ok:later"
+    q.close()
+
+
+def test_cancelled_asyncio_waiter_does_not_kill_the_writer() -> None:
+    flush = _Recorder()
+    q = _queue(flush)
+
+    async def _scenario() -> str:
+        flush.release.clear()
+        leaving = asyncio.ensure_future(asyncio.wrap_future(q.submit("leaving")))
+        staying = asyncio.ensure_future(asyncio.wrap_future(q.submit("staying")))
+        await asyncio.sleep(0.05)
+        leaving.cancel()
+        flush.release.set()
+        return await asyncio.wait_for(staying, timeout=5)
+
+    assert asyncio.run(_scenario()) == "ok:staying"
+    assert q._thread is not None and q._thread.is_alive()
+    q.close()
+
+
+def test_bad_item_fails_alone() -> None:
+    flush = _Recorder()
+    flush.release.clear()
+    q = _queue(flush, window_s=0.05, is_item_error=lambda e: isinstance(e, ValueError))
+    futures = {name: q.submit(name) for name in ("a", "bad", "b")}
+    flush.release.set()
+
+    assert futures["a"].result(timeout=5) == "ok:a"
+    assert futures["b"].result(timeout=5) == "ok:b"
+    with pytest.raises(ValueError):
+        futures["bad"].result(timeout=5)
+    q.close()
+
+
+def test_writer_survives_a_broken_flush() -> None:
+    q = _queue(lambda items: [])  # wrong number of results
+    with pytest.raises(RuntimeError):
+        q.submit("x").result(timeout=5)
+    with pytest.raises(RuntimeError):
+        q.submit("y").result(timeout=5)
+    assert q._thread is not None and q._thread.is_alive()
+    q.close()
+
+
+class _Flaky:
+    """flush() that raises the queued errors first, then commits."""
+
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.calls: List[List[Any]] = []
+
+    def __call__(self, items: List[Any]) -> List[Any]:
+        self.calls.append(list(items))
+        if self.errors:
+            raise self.errors.pop(0)
+        return [f"ok:{item}" for item in items]
+
+
+def _submit_together(q: GroupCommitQueue, items: List[Any]) -> List[Any]:
+    # The writer keeps collecting for window_s, so these land in one batch.
+    return [q.submit(item) for item in items]
+
+
+def test_transient_error_retries_the_whole_batch_once() -> None:
+    flush = _Flaky(OSError("database is locked"))
+    q = _queue(flush, window_s=0.2)
+    futures = _submit_together(q, ["a", "b", "c"])
+
+    assert [f.result(timeout=5) for f in futures] == ["ok:a", "ok:b", "ok:c"]
+    assert flush.calls == [["a", "b", "c"], ["a", "b", "c"]]
+    q.close()
+
+
+def test_repeated_operational_error_fails_the_batch_without_per_item_retries() -> None:
+    flush = _Flaky(OSError("disk I/O error"), OSError("disk I/O error again"))
+    q = _queue(flush, window_s=0.2, is_item_error=lambda e: isinstance(e, ValueError))
+    futures = _submit_together(q, ["a", "b", "c"])
+
+    for f in futures:
+        with pytest.raises(OSError, match="again"):
+            f.result(timeout=5)
+    assert len(flush.calls) == 2
+    q.close()
+
+
+def test_per_item_retries_stop_at_an_operational_error() -> None:
+    flush = _Flaky(ValueError("bad row"), OSError("disk full"))
+    q = _queue(flush, window_s=0.2, is_item_error=lambda e: isinstance(e, ValueError))
+    futures = _submit_together(q, ["a", "b", "c"])
+
+    for f in futures:
+        with pytest.raises(OSError):
+            f.result(timeout=5)
+    # The batch, then only the first item on its own.
+    assert flush.calls == [["a", "b", "c"], ["a"]]
+    q.close()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import forms
+from app.main import app
+from app.services.rate_limit import RecentKeys, SlidingWindowLimiter
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    monkeypatch.setenv("FORMS_STORAGE", "sqlite")
+    monkeypatch.setenv("FORMS_RATE_LIMIT_ENABLED", "1")
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "forms.db"))
+    monkeypatch.setattr(forms, "_ip_limiter", SlidingWindowLimiter(100, 60.0))
+    monkeypatch.setattr(forms, "_email_limiter", SlidingWindowLimiter(2, 3600.0))
+    monkeypatch.setattr(forms, "_recent_newsletter", RecentKeys(3600))
+    forms._init_db()
+    yield TestClient(app)
+    forms._close_db()
+
+
+def _signup(client: TestClient, email: str):
+    return client.post("/api/forms/newsletter", json={"email": email})
+
+
+def _stored() -> list:
+    with forms._get_pool().connection() as conn:
+        return [r[0] for r in conn.execute("SELECT email FROM newsletter_signups")]
+
+
+def test_address_is_normalized_before_dedup_and_insert(client: TestClient) -> None:
+    assert _signup(client, " Deniz@Example.org").json() == {"ok": True, "created": True}
+    assert _signup(client, "deniz@example.org").json() == {"ok": True, "created": False}
+    assert _stored() == ["deniz@example.org"]
+
+
+def test_case_variants_are_one_row_even_past_the_dedup_cache(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert _signup(client, "Deniz@Example.org").json()["created"] is True
+    # Another instance (or a restart) doesn't share the in-memory dedup cache.
+    monkeypatch.setattr(forms, "_recent_newsletter", RecentKeys(3600))
+    assert _signup(client, "DENIZ@example.org").json()["created"] is False
+    assert _stored() == ["deniz@example.org"]
+
+
+def test_repeats_are_answered_before_the_rate_limit(client: TestClient) -> None:
+    for _ in range(5):
+        res = _signup(client, "kum@example.org")
+        assert res.status_code == 200
+    assert _stored() == ["kum@example.org"]
+
+
+def test_new_signups_are_still_rate_limited(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(forms, "_ip_limiter", SlidingWindowLimiter(2, 60.0))
+    assert _signup(client, "a@example.org").status_code == 200
+    assert _signup(client, "b@example.org").status_code == 200
+    res = _signup(client, "c@example.org")
+    assert res.status_code == 429 and "Retry-After" in res.headers
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import ee_backend, profiling
+
+
+def _work() -> int:
+    return sum(i * i for i in range(1000))
+
+
+def test_run_profiled_without_a_session_just_runs() -> None:
+    assert profiling.run_profiled(_work) == _work()
+
+
+def test_session_merges_profiles_and_saves_them(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    with profiling.session() as session:
+        profiling.run_profiled(_work)
+        profiling.run_profiled(_work)
+    report = session.report()
+
+    assert report["path"] is not None and os.path.exists(report["path"])
+    assert "_work" in report["stats"]
+
+
+def test_profile_requires_the_refresh_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("REFRESH_TOKEN", "secret")
+    client = TestClient(app)
+    response = client.get("/api/metrics/sst", params={"beach_id": "nowhere", "profile": "1"})
+    assert response.status_code == 401
+
+
+def test_profile_report_is_added_to_the_response(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    if ee_backend.fake() is None:
+        pytest.skip("needs EE_BACKEND=fake")
+    monkeypatch.setenv("REFRESH_TOKEN", "secret")
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    client = TestClient(app)
+    response = client.get(
+        "/api/metrics/sst",
+        params={"beach_id": "konyaalti", "profile": "1"},
+        headers={"X-Refresh-Token": "secret"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["metric"] == "sea_surface_temperature"
+    assert body["profile"]["path"].startswith(str(tmp_path))
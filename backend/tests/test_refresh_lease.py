@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from app.services import beach_day_store, daily_refresh_loop, memory_firestore, refresh_lease
+
+
+@pytest.fixture(params=["sqlite", "firestore"])
+def store(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[str]:
+    if request.param == "sqlite":
+        monkeypatch.setenv("FIRESTORE_ENABLED", "0")
+        monkeypatch.setenv("LEASE_DB_PATH", str(tmp_path / "leases.db"))
+    else:
+        monkeypatch.setenv("FIRESTORE_ENABLED", "1")
+        beach_day_store.use_client(memory_firestore.Client())
+    yield request.param
+    beach_day_store.use_client(None)
+
+
+def _acquire_as(store: str, name: str, holder: str, ttl_s: float):
+    if store == "sqlite":
+        return refresh_lease._acquire_local(name, holder, ttl_s)
+    return beach_day_store.acquire_lease(name, holder, ttl_s)
+
+
+def test_held_lease_is_not_shared(store: str) -> None:
+    assert refresh_lease.acquire("daily", 60) is not None
+    assert _acquire_as(store, "daily", "other-instance", 60) is None
+
+
+def test_completed_lease_is_not_taken_again(store: str) -> None:
+    token = refresh_lease.acquire("daily", 60)
+    assert refresh_lease.complete("daily", token)
+    assert _acquire_as(store, "daily", "other-instance", 60) is None
+
+
+def test_expired_holder_cannot_complete_a_newer_lease(store: str) -> None:
+    stale = refresh_lease.acquire("daily", 0)
+    newer = _acquire_as(store, "daily", "other-instance", 60)
+    assert newer is not None
+
+    assert not refresh_lease.complete("daily", stale)
+    assert not refresh_lease.release("daily", stale)
+    # The newer holder still owns an unfinished lease.
+    assert _acquire_as(store, "daily", "third-instance", 60) is None
+
+
+def test_released_lease_can_be_retaken_at_once(store: str) -> None:
+    token = refresh_lease.acquire("daily", 60)
+    assert refresh_lease.release("daily", token)
+    assert _acquire_as(store, "daily", "other-instance", 60) is not None
+
+
+def test_failed_refresh_releases_the_lease(store: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def _failing_run_ee(*args, **kwargs):
+        raise RuntimeError("EE unavailable")
+
+    monkeypatch.setattr(daily_refresh_loop, "run_ee", _failing_run_ee)
+    with pytest.raises(RuntimeError):
+        asyncio.run(daily_refresh_loop._refresh_once(days=7, revise_days=5))
+
+    lease_name = f"daily-refresh:{daily_refresh_loop.tr_today().isoformat()}"
+    assert _acquire_as(store, lease_name, "other-instance", 60) is not None
+
+
+def test_reports_are_generated_after_the_lease_completes(store: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    events: List[str] = []
+
+    async def _run_ee(*args, **kwargs):
+        events.append("refresh")
+
+    async def _pregenerate(as_of):
+        events.append("reports")
+        return {}
+
+    complete = refresh_lease.complete
+
+    def _complete(name: str, token: str) -> bool:
+        events.append("complete")
+        return complete(name, token)
+
+    monkeypatch.setattr(daily_refresh_loop, "run_ee", _run_ee)
+    monkeypatch.setattr(daily_refresh_loop.ai_report, "pregenerate_all", _pregenerate)
+    monkeypatch.setattr(refresh_lease, "complete", _complete)
+
+    assert asyncio.run(daily_refresh_loop._refresh_once(days=7, revise_days=5))
+    assert events == ["refresh", "complete", "reports"]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.api import ai
+from app.services import report_cache
+
+
+_PAYLOAD = {
+    "id": "konyaalti",
+    "name": "Konyaaltı",
+    "metrics": {"sst": 24.5, "wqi": 71.0, "no2": 0.000033},
+    "series": [{"date": "2025-07-14", "sst": 24.1}, {"date": "2025-07-15", "sst": 24.5}],
+}
+
+
+def _key(payload, model: str = "m", prompt_version: str = "v1") -> str:
+    return report_cache.cache_key(payload, model=model, prompt_version=prompt_version)
+
+
+def test_cache_key_ignores_key_order_whitespace_and_float_noise() -> None:
+    reordered = {
+        "series": [{"sst": 24.1, "date": "2025-07-14"}, {"sst": 24.5 + 1e-12, "date": "2025-07-15"}],
+        "metrics": {"no2": 0.000033, "wqi": 71.0, "sst": 24.5},
+        "name": " Konyaaltı ",
+        "id": "konyaalti",
+    }
+    assert _key(reordered) == _key(_PAYLOAD)
+
+
+def test_cache_key_changes_with_data_model_and_prompt_version() -> None:
+    changed = dict(_PAYLOAD, metrics=dict(_PAYLOAD["metrics"], wqi=72.0))
+    assert _key(changed) != _key(_PAYLOAD)
+    assert _key(_PAYLOAD, model="other") != _key(_PAYLOAD)
+    assert _key(_PAYLOAD, prompt_version="v2") != _key(_PAYLOAD)
+    # Series order is meaningful.
+    assert _key(dict(_PAYLOAD, series=_PAYLOAD["series"][::-1])) != _key(_PAYLOAD)
+
+
+def _counts():
+    s = report_cache.stats()
+    return s["hits"], s["misses"]
+
+
+@pytest.mark.parametrize("stored, expected", [("stored report", (1, 0)), (None, (0, 1))])
+def test_lookup_is_recorded_once_after_memory_and_store(monkeypatch: pytest.MonkeyPatch, stored, expected) -> None:
+    async def stored_for_payload(beach, key):
+        return stored
+
+    monkeypatch.setattr(ai, "_stored_for_payload", stored_for_payload)
+    key = uuid.uuid4().hex
+    hits, misses = _counts()
+
+    assert asyncio.run(ai._cached_report(_PAYLOAD, key)) == stored
+
+    after = _counts()
+    assert (after[0] - hits, after[1] - misses) == expected
+
+
+def test_memory_hit_is_recorded_as_a_single_hit() -> None:
+    key = uuid.uuid4().hex
+    asyncio.run(report_cache.put(key, "cached report"))
+    hits, misses = _counts()
+
+    assert asyncio.run(ai._cached_report(_PAYLOAD, key)) == "cached report"
+
+    assert _counts() == (hits + 1, misses)
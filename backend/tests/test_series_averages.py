@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from app.api.metrics import _series_response, _stale_placeholder
+
+
+def _stored(day: str, sst: float) -> dict:
+    return {
+        "date": day,
+        "sst_celsius": sst,
+        "turbidity_ndti": None,
+        "chlorophyll": None,
+        "no2_mol_m2": None,
+        "air_quality": "unknown",
+        "wqi": None,
+        "waste_risk_percent": None,
+        "sources": {"sst_celsius": "daily", "turbidity_ndti": "missing"},
+    }
+
+
+def test_stale_placeholders_are_not_averaged() -> None:
+    first = _stored("2025-07-01", 20.0)
+    last = _stored("2025-07-02", 24.0)
+    series = [first, last, _stale_placeholder("2025-07-03", last), _stale_placeholder("2025-07-04", last)]
+
+    response = _series_response("konyaalti", 4, series, stale=True)
+
+    assert len(response["series"]) == 4
+    assert response["averages"]["sst_celsius"] == 22.0
+    assert response["cache"]["stale"] is True
+
+
+def test_only_placeholders_give_no_averages() -> None:
+    series = [_stale_placeholder("2025-07-03", _stored("2025-07-02", 24.0))]
+    assert _series_response("konyaalti", 1, series, stale=True)["averages"]["sst_celsius"] is None
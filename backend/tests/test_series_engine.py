@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from app.services import ee_backend, series_engine, timeseries
+
+
+# get_beach_summary output of the original per-day loop in timeseries, for
+# FakeEEBackend(missing_rate=0.3, seed="equivalence"), 30 days to 2025-07-15.
+_BASELINE = Path(__file__).parent / "data" / "series_baseline.json"
+
+
+@pytest.fixture
+def fixed_fake() -> Iterator[None]:
+    previous = ee_backend._fake
+    ee_backend.use_fake(ee_backend.FakeEEBackend(missing_rate=0.3, seed="equivalence"))
+    yield
+    ee_backend.use_fake(previous)
+
+
+@pytest.mark.parametrize("beach_id", ["konyaalti", "belek"])
+def test_summary_matches_the_original_per_day_loop(fixed_fake: None, beach_id: str) -> None:
+    expected = json.loads(_BASELINE.read_text(encoding="utf-8"))[beach_id]
+
+    summary = timeseries.get_beach_summary(beach_id, days=30, end_day=date(2025, 7, 15))
+
+    assert json.loads(json.dumps(summary)) == expected
+
+
+def test_gaps_are_imputed_from_filled_values_and_labelled() -> None:
+    dates = ["d1", "d2", "d3", "d4"]
+    base = {field: [None] * 4 for field in series_engine.BASE_FIELDS}
+    sources = {field: [None] * 4 for field in series_engine.BASE_FIELDS}
+    base["sst_celsius"] = [None, 20.0, None, 24.0]
+    sources["sst_celsius"] = [None, "daily", None, "window_avg"]
+
+    rows = series_engine.derive_series(dates, base, sources, ["unknown"] * 4, lookback_days=2, impute=True)
+
+    assert [r["sst_celsius"] for r in rows] == [None, 20.0, 20.0, 24.0]
+    assert [r["sources"]["sst_celsius"] for r in rows] == ["missing", "daily", "imputed", "window_avg"]
+    assert [r["sources"]["wqi"] for r in rows] == ["missing", "missing", "missing", "missing"]
+    assert rows[0]["wqi"] is None and rows[1]["wqi"] is not None
+    assert [r["air_quality"] for r in rows] == ["unknown"] * 4
+
+
+def test_averages_skip_anything_that_is_not_a_number() -> None:
+    rows = [{"sst_celsius": 20.0}, {"sst_celsius": "30"}, {"sst_celsius": True}, {"sst_celsius": float("nan")}, {"sst_celsius": 22}]
+    assert series_engine.series_averages(rows)["sst_celsius"] == 21.0
+    assert series_engine.series_averages([{"sst_celsius": None}])["sst_celsius"] is None
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date
+from typing import Iterator, List
+
+import pytest
+
+from app.api import metrics
+from app.services import beach_day_store, ee_priority, memory_firestore, profiling, timing
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("FIRESTORE_ENABLED", "1")
+    beach_day_store.use_client(memory_firestore.Client())
+    yield
+    beach_day_store.use_client(None)
+
+
+def test_stale_mode_is_off_by_default(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("SERVE_STALE_ENABLED", raising=False)
+    assert metrics._serve_stale_default() is False
+
+
+def test_revalidation_is_detached_from_the_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    seen = {}
+    ran = threading.Event()
+
+    def _compute(beach_id: str, days: int, end_day: date) -> None:
+        seen["priority"] = ee_priority.current()
+        seen["timings"] = timing._current.get()
+        seen["profile"] = profiling._current.get()
+        ran.set()
+
+    monkeypatch.setattr(metrics, "_compute_missing_days", _compute)
+    timing.start_request()
+    with profiling.session():
+        metrics._revalidate_in_background("konyaalti", 7, date(2025, 7, 15))
+    assert ran.wait(5)
+    assert seen == {"priority": ee_priority.REFRESH, "timings": None, "profile": None}
+
+
+def test_revalidations_are_deduplicated_per_range(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: List[tuple] = []
+    release = threading.Event()
+
+    def _compute(beach_id: str, days: int, end_day: date) -> None:
+        calls.append((beach_id, days))
+        release.wait(5)
+
+    monkeypatch.setattr(metrics, "_compute_missing_days", _compute)
+    for _ in range(3):
+        metrics._revalidate_in_background("konyaalti", 7, date(2025, 7, 15))
+    metrics._revalidate_in_background("konyaalti", 30, date(2025, 7, 15))
+    release.set()
+
+    for _ in range(100):
+        with metrics._revalidating_lock:
+            if not metrics._revalidating:
+                break
+        time.sleep(0.05)
+    assert sorted(calls) == [("konyaalti", 7), ("konyaalti", 30)]
+
+
+def test_stale_response_serves_placeholders_and_revalidates(monkeypatch: pytest.MonkeyPatch) -> None:
+    revalidated = []
+    monkeypatch.setattr(metrics, "_revalidate_in_background", lambda *args: revalidated.append(args))
+
+    end = date(2025, 7, 15)
+    stored = metrics._day_list(2, date(2025, 7, 13))
+    beach_day_store.upsert_days(
+        "konyaalti",
+        {d: {"date": d, "sst_celsius": 24.0, "air_quality": "good", "sources": {"sst_celsius": "daily"}} for d in stored},
+    )
+
+    value = metrics._assemble_series_from_store("konyaalti", 3, end, allow_stale=True)
+    assert value["cache"]["stale"] is True
+    assert [r["sources"]["sst_celsius"] for r in value["series"]] == ["daily", "stale", "stale"]
+    assert revalidated == [("konyaalti", 3, end)]
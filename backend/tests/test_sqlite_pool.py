@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from app.services.sqlite_pool import PoolTimeout, SQLitePool
+
+
+@pytest.fixture
+def pool(tmp_path: Path) -> Iterator[SQLitePool]:
+    p = SQLitePool(str(tmp_path / "data" / "pool.db"), size=2, timeout_s=0.2)
+    with p.connection() as conn:
+        conn.execute("CREATE TABLE t (k TEXT PRIMARY KEY)")
+        conn.commit()
+    yield p
+    p.close()
+
+
+def test_connections_are_reused_lifo_with_pragmas_applied(pool: SQLitePool) -> None:
+    with pool.connection() as first:
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with pool.connection() as again:
+        assert again is first
+    assert pool.stats() == {"size": 2, "open": 1, "idle": 1}
+
+
+def test_pool_grows_to_size_then_times_out(pool: SQLitePool) -> None:
+    with pool.connection() as a, pool.connection() as b:
+        assert a is not b
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+    assert pool.stats()["open"] == 2
+
+
+def test_a_waiter_gets_the_connection_released_by_another_thread(pool: SQLitePool) -> None:
+    got = []
+    with pool.connection():
+        with pool.connection() as held:
+            waiter = threading.Thread(target=lambda: got.append(pool._acquire()))
+            waiter.start()
+            threading.Event().wait(0.05)
+        waiter.join(timeout=1)
+        assert got == [held]
+        pool._release(got[0])
+
+
+def test_errors_roll_back_and_return_the_connection(pool: SQLitePool) -> None:
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO t VALUES ('a')")
+        conn.commit()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO t VALUES ('b')")
+            conn.execute("INSERT INTO t VALUES ('a')")
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO t VALUES ('c')")
+            raise RuntimeError("boom")
+
+    with pool.connection() as conn:
+        assert [r[0] for r in conn.execute("SELECT k FROM t")] == ["a"]
+        assert not conn.in_transaction
+    assert pool.stats()["open"] == 1
+
+
+def test_close_drops_idle_connections_and_refuses_new_ones(pool: SQLitePool) -> None:
+    with pool.connection():
+        pool.close()
+    assert pool.stats() == {"size": 2, "open": 0, "idle": 0}
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.connection():
+            pass
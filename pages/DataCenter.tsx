@@ -30,6 +30,9 @@ function formatMetric(value: number | null | undefined, suffix: string = ''): st
     return `${formatted}${suffix}`;
 }
 
+// Days of history shown (chart, table, CSV) and analysed by the AI report.
+const HISTORY_DAYS = 7;
+
 const DataCenter: React.FC = () => {
   const { search } = useLocation();
   const query = new URLSearchParams(search);
@@ -51,7 +54,7 @@ const DataCenter: React.FC = () => {
         let cancelled = false;
         const run = async () => {
             try {
-                const beachData = await getBeachData(selectedBeachId, 7);
+                const beachData = await getBeachData(selectedBeachId, HISTORY_DAYS);
                 if (!cancelled) setData(beachData);
             } catch (e) {
                 console.error(e);
@@ -69,7 +72,7 @@ const DataCenter: React.FC = () => {
   const handleGenerateReport = async () => {
     if (!data) return;
     setIsGeneratingReport(true);
-    const report = await generateBeachReport(data);
+    const report = await generateBeachReport(selectedBeachId, HISTORY_DAYS);
     setAiReport(report);
     setIsGeneratingReport(false);
   };
@@ -165,7 +168,7 @@ const DataCenter: React.FC = () => {
                     <div className="flex items-center justify-between mb-6">
                         <div className="flex items-center gap-2">
                             <BarChart2 className="text-teal-600" size={20}/>
-                            <h2 className="text-lg font-semibold text-slate-800">7 Günlük {selectedMetric} Eğilimi</h2>
+                            <h2 className="text-lg font-semibold text-slate-800">{HISTORY_DAYS} Günlük {selectedMetric} Eğilimi</h2>
                         </div>
                         <span className="text-xs font-mono text-slate-400 bg-slate-100 px-2 py-1 rounded">
                             <UpdateCountdown showSeconds={true} prefix="Güncelleme" />
@@ -178,7 +181,7 @@ const DataCenter: React.FC = () => {
                 {/* Detail Table */}
                 <div className="bg-white p-6 rounded-2xl shadow-sm border border-slate-100">
                     <div className="flex items-center justify-between mb-4">
-                        <h3 className="text-lg font-semibold text-slate-800">7 Günlük Detay Tablosu</h3>
+                        <h3 className="text-lg font-semibold text-slate-800">{HISTORY_DAYS} Günlük Detay Tablosu</h3>
                         <span className="text-xs text-slate-500">Kaynak: Backend günlük seri</span>
                     </div>
 
@@ -312,7 +315,7 @@ const DataCenter: React.FC = () => {
                 <div className="bg-teal-700 text-white p-6 rounded-2xl shadow-lg relative overflow-hidden">
                      <div className="relative z-10">
                         <h3 className="font-bold text-lg mb-2">Verileri Dışa Aktar</h3>
-                        <p className="text-teal-100 text-sm mb-4">Araştırma amacıyla son 7 günün çevre kayıtlarını indirin.</p>
+                        <p className="text-teal-100 text-sm mb-4">Araştırma amacıyla son {HISTORY_DAYS} günün çevre kayıtlarını indirin.</p>
                         <button
                             onClick={handleDownloadCsv}
                             className="flex items-center gap-2 bg-white text-teal-700 px-4 py-2 rounded-lg text-sm font-bold hover:bg-teal-50 transition-colors w-full justify-center"
@@ -1,5 +1,3 @@
-import { BeachData } from "../types";
-
 const RAW_API_BASE = (import.meta as any)?.env?.VITE_API_BASE_URL;
 // Default to same-origin (Vite proxy handles /api) to avoid CORS issues.
 const API_BASE =
@@ -7,13 +5,13 @@ const API_BASE =
     ? RAW_API_BASE.replace(/\/$/, '')
     : '';
 
-export const generateBeachReport = async (beachData: BeachData): Promise<string> => {
+// The backend builds the report input from its daily data for the same range the page
+// shows, so every visitor of a beach gets the same cached report for the day.
+export const generateBeachReport = async (beachId: string, days: number = 7): Promise<string> => {
   try {
-    const res = await fetch(`${API_BASE}/api/ai/beach-report`, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ beach: beachData }),
-    });
+    const res = await fetch(
+      `${API_BASE}/api/ai/beach-report?beach_id=${encodeURIComponent(beachId)}&days=${days}`
+    );
 
     if (!res.ok) {
       const raw = await res.text().catch(() => '');
@@ -31,6 +29,10 @@ export const generateBeachReport = async (beachData: BeachData): Promise<string>
         return 'AI raporu için backend ayarı eksik: OPENAI_API_KEY.';
       }
 
+      if (res.status === 404) {
+        return 'Bu plaj bulunamadı.';
+      }
+
       return `Şu anda analiz oluşturulamıyor (AI servis hatası${detail ? `: ${detail}` : ''}).`;
     }
 